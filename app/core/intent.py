@@ -0,0 +1,163 @@
+from typing import Dict, List, Any, Optional
+import os
+from functools import lru_cache
+from app.utils.term_matcher import get_term_matcher
+from app.core.intent_classifier import IntentPrediction, get_intent_classifier
+
+# Query intents recognised by the ReasoningAgent, in the order they are tested
+INTENTS = ["factoid", "treatment", "diagnosis", "medication", "guideline", "screening"]
+DEFAULT_INTENT = "general"
+
+# Phrases that signal each intent in a lowercased query
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "treatment": ["treatment", "manage", "therapy", "cure", "how to treat"],
+    "diagnosis": ["diagnose", "test", "signs", "symptoms", "how to diagnose"],
+    "medication": ["drug", "medication", "dose", "side effect", "interaction"],
+    "guideline": ["guideline", "recommendation", "consensus", "protocol", "standard"],
+    "screening": ["screen", "prevent", "risk", "when to get", "how often"],
+    # Single-fact questions: a cause, a number, a name
+    "factoid": [
+        "most likely", "most common", "most appropriate", "which of the following",
+        "what is the name", "how many", "what percentage", "what proportion",
+        "true or false", "stand for", "first-line", "drug of choice", "best initial"
+    ]
+}
+
+# (intent, keyword) pairs in matcher term order
+_KEYWORD_INTENTS = [(intent, term) for intent, terms in INTENT_KEYWORDS.items() for term in terms]
+
+# Generation settings per intent. Output length drives generation time, so
+# short-answer intents get small token limits and tight length rules.
+# "extractions" is the per-search extraction depth used when the intent is
+# known with confidence.
+INTENT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "factoid": {
+        "max_tokens": 120,
+        "extractions": 2,
+        "stop": ["\n\n"],
+        "length_rule": "Answer in 1-2 sentences that state the fact directly"
+    },
+    "treatment": {
+        "max_tokens": 450,
+        "extractions": 3,
+        "stop": None,
+        "length_rule": "Keep your response to 4-7 sentences covering first-line and alternative options"
+    },
+    "diagnosis": {
+        "max_tokens": 400,
+        "extractions": 3,
+        "stop": None,
+        "length_rule": "Keep your response to 3-6 sentences covering the key tests and diagnostic approach"
+    },
+    "medication": {
+        "max_tokens": 350,
+        "extractions": 2,
+        "stop": None,
+        "length_rule": "Keep your response to 3-6 sentences covering indication, dosing and key safety points"
+    },
+    "guideline": {
+        "max_tokens": 600,
+        "extractions": 3,
+        "stop": None,
+        "length_rule": "Summarize the key recommendations in up to 10 bullet points, naming the issuing society where stated"
+    },
+    "screening": {
+        "max_tokens": 350,
+        "extractions": 2,
+        "stop": None,
+        "length_rule": "Keep your response to 3-5 sentences covering who to screen, with which test and how often"
+    },
+    DEFAULT_INTENT: {
+        "max_tokens": 500,
+        "extractions": 3,
+        "stop": None,
+        "length_rule": "Keep your response to 3-7 sentences for straightforward queries"
+    }
+}
+
+
+def intent_flags(query_lower: str) -> Dict[str, bool]:
+    """
+    Test a query for every intent's keywords in one pass
+
+    Keywords match at the start of a word, so "screen" also finds
+    "screening" but "test" does not fire inside "latest".
+
+    Args:
+        query_lower: Lowercased query text
+
+    Returns:
+        Mapping of intent to whether any of its keywords occur
+    """
+    matched = _matched_intents(query_lower)
+    return {intent: intent in matched for intent in INTENT_KEYWORDS}
+
+
+@lru_cache(maxsize=4096)
+def _matched_intents(query_lower: str) -> frozenset:
+    """Intents whose keywords occur in a query, memoized for repeated queries"""
+    matcher = get_term_matcher([term for _, term in _KEYWORD_INTENTS], prefix=True)
+    return frozenset(_KEYWORD_INTENTS[match.term_id][0] for match in matcher.find(query_lower))
+
+
+def classify_intent(query_lower: str, flags: Optional[Dict[str, bool]] = None) -> str:
+    """
+    Pick the primary intent of a query
+
+    Factoid cues win because they decide the answer length; otherwise the
+    first matching intent in INTENTS order is used.
+
+    Args:
+        query_lower: Lowercased query text
+        flags: Result of intent_flags for the query, if already computed
+
+    Returns:
+        One of INTENTS, or DEFAULT_INTENT if nothing matches
+    """
+    flags = flags if flags is not None else intent_flags(query_lower)
+    for intent in INTENTS:
+        if flags[intent]:
+            return intent
+    return DEFAULT_INTENT
+
+
+def detect_intent(query_lower: str, flags: Optional[Dict[str, bool]] = None) -> IntentPrediction:
+    """
+    Detect the primary intent with the learned classifier and the keyword rules
+
+    A matching keyword rule is trusted over the classifier: the classifier's
+    answer is used when it agrees with the keywords, or when no keyword
+    matches and its confidence reaches INTENT_MIN_CONFIDENCE. Otherwise (or
+    without a model) the keyword rules decide and the confidence is reported
+    as 0.
+
+    Args:
+        query_lower: Lowercased query text, worded as the user wrote it (the
+            classifier is trained on raw queries, not canonical text)
+        flags: Result of intent_flags for the query, if already computed
+
+    Returns:
+        Intent and the classifier's confidence in it
+    """
+    keyword_intent = classify_intent(query_lower, flags)
+    classifier = get_intent_classifier()
+    if classifier is not None:
+        prediction = classifier.predict(query_lower)
+        if prediction.intent == keyword_intent or (
+                keyword_intent == DEFAULT_INTENT
+                and prediction.confidence >= float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5"))):
+            return prediction
+    return IntentPrediction(keyword_intent, 0.0)
+
+
+def intent_profile(intent: str) -> Dict[str, Any]:
+    """
+    Get the generation profile for an intent
+
+    Args:
+        intent: Intent label (unknown labels use the default profile)
+
+    Returns:
+        Profile with max_tokens, extractions, stop and length_rule
+    """
+    return INTENT_PROFILES.get(intent, INTENT_PROFILES[DEFAULT_INTENT])
@@ -0,0 +1,241 @@
+from typing import List, Any, Optional, Tuple, NamedTuple, Iterable
+import os
+import json
+import logging
+import threading
+import numpy as np
+from functools import lru_cache
+from dotenv import load_dotenv
+from app.utils.hashing_vectorizer import HashingVectorizer, feature_sign
+
+DEFAULT_TRAINING_DATA = os.path.join(os.path.dirname(__file__), "data", "intent_training.jsonl")
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_model.npz")
+
+logger = logging.getLogger(__name__)
+
+
+class IntentPrediction(NamedTuple):
+    """Predicted intent of a query"""
+    intent: str
+    confidence: float
+
+
+class IntentClassifier:
+    """
+    Linear (softmax regression) intent classifier over hashed text features.
+
+    Trained offline by scripts/train_intent_classifier.py and stored as a
+    small .npz file. Scoring a query is a sparse dot product whose per-word
+    terms are memoized, a few microseconds of NumPy work.
+    """
+
+    def __init__(self,
+                 weights: np.ndarray,
+                 bias: np.ndarray,
+                 classes: List[str],
+                 vectorizer: Optional[HashingVectorizer] = None):
+        """
+        Initialize the classifier
+
+        Args:
+            weights: Matrix of shape (n_features, n_classes)
+            bias: Vector of shape (n_classes,)
+            classes: Intent label of each column
+            vectorizer: Vectorizer the weights were trained with
+        """
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.classes = list(classes)
+        self.vectorizer = vectorizer or HashingVectorizer(n_features=weights.shape[0])
+
+        # Scores are linear in the features, so each word's and word pair's
+        # contribution is computed once and summed per query
+        self._unit_scores = lru_cache(maxsize=65536)(self._score_unit)
+
+    @classmethod
+    def train(cls,
+              texts: List[str],
+              labels: List[str],
+              n_features: int = 2 ** 13,
+              epochs: int = 200,
+              learning_rate: float = 5.0,
+              l2: float = 1e-4,
+              batch_size: int = 512,
+              seed: int = 0) -> "IntentClassifier":
+        """
+        Fit the classifier with mini-batch gradient descent on the cross-entropy loss
+
+        Args:
+            texts: Training queries
+            labels: Intent label of each query
+            n_features: Number of hash buckets
+            epochs: Passes over the training data
+            learning_rate: Gradient step size
+            l2: Weight decay
+            batch_size: Queries per gradient step
+            seed: Seed for shuffling
+
+        Returns:
+            Trained classifier
+        """
+        vectorizer = HashingVectorizer(n_features=n_features)
+        classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(classes)}
+        targets = np.array([class_index[label] for label in labels])
+        features = [vectorizer.transform_one(text) for text in texts]
+
+        rng = np.random.default_rng(seed)
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                x = np.zeros((len(batch), n_features), dtype=np.float32)
+                for row, i in enumerate(batch):
+                    np.add.at(x[row], features[i][0], features[i][1])
+
+                probabilities = _softmax(x @ weights + bias)
+                probabilities[np.arange(len(batch)), targets[batch]] -= 1.0
+                gradient = probabilities / len(batch)
+
+                weights -= learning_rate * (x.T @ gradient + l2 * weights)
+                bias -= learning_rate * gradient.sum(axis=0)
+
+        return cls(weights, bias, classes, vectorizer)
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """
+        Score a query against every intent
+
+        Args:
+            text: Query text
+
+        Returns:
+            Probability of each class, in self.classes order
+        """
+        scores = np.zeros(len(self.classes), dtype=np.float32)
+        count = 0
+        for unit in self.vectorizer.units(text):
+            unit_scores, n = self._unit_scores(unit)
+            scores += unit_scores
+            count += n
+        return _softmax(scores / np.sqrt(max(count, 1)) + self.bias)
+
+    def _score_unit(self, unit: str) -> Tuple[np.ndarray, int]:
+        """Unscaled class scores of one unit's features and the number of features"""
+        hashes = self.vectorizer.unit_hashes(unit)
+        indexes = [h % self.vectorizer.n_features for h in hashes]
+        signs = np.array([feature_sign(h) for h in hashes], dtype=np.float32)
+        return signs @ self.weights[indexes], len(hashes)
+
+    def predict(self, text: str) -> IntentPrediction:
+        """
+        Predict the intent of a query
+
+        Args:
+            text: Query text
+
+        Returns:
+            Most probable intent and its probability
+        """
+        probabilities = self.predict_proba(text)
+        best = int(np.argmax(probabilities))
+        return IntentPrediction(self.classes[best], float(probabilities[best]))
+
+    def save(self, path: str) -> None:
+        """
+        Write the model to an .npz file
+
+        Args:
+            path: Output path
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, weights=self.weights, bias=self.bias,
+                            classes=np.array(self.classes),
+                            config=np.array([self.vectorizer.n_features, self.vectorizer.char_ngram]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        """
+        Read a model written by save
+
+        Args:
+            path: Model path
+
+        Returns:
+            Loaded classifier
+        """
+        with np.load(path) as data:
+            n_features, char_ngram = (int(v) for v in data["config"])
+            return cls(data["weights"], data["bias"], [str(c) for c in data["classes"]],
+                       HashingVectorizer(n_features=n_features, char_ngram=char_ngram))
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    """Softmax over the last axis"""
+    shifted = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+
+def load_training_data(paths: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Read labelled queries from JSONL files with "query" and "intent" fields
+
+    Args:
+        paths: JSONL files
+
+    Returns:
+        Tuple of (queries, intents)
+    """
+    texts, labels = [], []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("query") and record.get("intent"):
+                    texts.append(record["query"])
+                    labels.append(record["intent"])
+    return texts, labels
+
+
+# Shared model; False marks a failed load so it is not retried on every query
+_default_classifier: Any = None
+_default_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """
+    Return the process-wide intent classifier, or None if it is disabled or unavailable
+
+    The model is read from INTENT_MODEL_PATH (defaults to the model shipped
+    with the package, built by scripts/train_intent_classifier.py). It is
+    never trained here: a missing model leaves the keyword rules in charge.
+
+    Returns:
+        The shared IntentClassifier instance or None
+    """
+    global _default_classifier
+
+    load_dotenv()
+    if os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() != "true":
+        return None
+
+    if _default_classifier is None:
+        with _default_classifier_lock:
+            if _default_classifier is None:
+                path = os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH)
+                try:
+                    _default_classifier = IntentClassifier.load(path)
+                except Exception as e:
+                    logger.error(f"Intent classifier unavailable, using keyword rules: {str(e)}. "
+                                 f"Build it with: python scripts/train_intent_classifier.py")
+                    _default_classifier = False
+    return _default_classifier or None
@@ -1,13 +1,67 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import os
+import copy
+import threading
+from collections import Counter
 from dotenv import load_dotenv
 from app.knowledge.dynamic_search import DynamicSearch
+from app.knowledge.corpus_search import CorpusSearch
+from app.knowledge.kb_connector import get_knowledge_base, has_citable_source
+from app.knowledge.url_negative_cache import get_negative_cache
 from app.output.llm_summarizer import LLMSummarizer
+from app.output.token_usage import empty_usage
+from app.utils.ttl_cache import TTLCache
+
+# Retrieval results shared by every router in the process, keyed by query fingerprint
+_retrieval_cache: Optional[TTLCache] = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> Optional[TTLCache]:
+    """
+    Return the process-wide retrieval cache, or None if it is disabled
+
+    Returns:
+        The shared TTLCache instance or None
+    """
+    global _retrieval_cache
+
+    load_dotenv()
+    ttl = float(os.getenv("RETRIEVAL_CACHE_TTL", "3600"))
+    if ttl <= 0:
+        return None
+
+    if _retrieval_cache is None:
+        with _retrieval_cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = TTLCache(
+                    max_entries=int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "1024")), ttl=ttl)
+    return _retrieval_cache
+
+
+# Needs answered by each retrieval tier since the process started
+_tier_counts: Counter = Counter()
+_tier_counts_lock = threading.Lock()
+
+
+def tier_counts() -> Dict[str, int]:
+    """
+    Report how many needs each retrieval tier answered in this process
+    
+    Returns:
+        Mapping of tier ("knowledge_base", "local_corpus" or "web") to count
+    """
+    with _tier_counts_lock:
+        return {tier: _tier_counts[tier] for tier in ("knowledge_base", "local_corpus", "web")}
 
 class KnowledgeRouter:
     """
     Routes information needs to appropriate knowledge sources and processes the results
     using enhanced pipeline: Tavily Search -> Tavily Extract -> LLM Summarizer
+    
+    Each need goes to the first tier that can answer it: the curated
+    knowledge base, then pages extracted by earlier requests (see
+    CorpusSearch), and only then web search.
     """
     
     def __init__(self):
@@ -18,22 +72,61 @@ class KnowledgeRouter:
         # Initialize search components
         self.dynamic_search = DynamicSearch()
         
+        # Curated knowledge base, consulted before any other source (None if
+        # disabled). Off by default: the bundled seed documents are placeholders,
+        # so enable it once a real corpus is loaded with scripts/build_kb_index.py
+        kb_enabled = os.getenv("KB_ROUTING_ENABLED", "false").lower() == "true"
+        self.knowledge_base = get_knowledge_base() if kb_enabled else None
+        # Calibrated with scripts/calibrate_kb_routing.py
+        self.kb_min_score = float(os.getenv("KB_ROUTING_MIN_SCORE", "0.25"))
+        
+        # Local BM25 index over previously extracted pages (None if disabled)
+        corpus_enabled = os.getenv("CORPUS_INDEX_ENABLED", "true").lower() == "true"
+        self.corpus_search = CorpusSearch() if corpus_enabled else None
+        self.corpus_min_sources = int(os.getenv("CORPUS_MIN_SOURCES", "2"))
+        
         # Initialize LLM summarizer
         self.summarizer = LLMSummarizer()
+        
+        # Shared record of URLs that recently failed extraction
+        self.negative_cache = get_negative_cache()
+        
+        # Summarized results of earlier queries with the same fingerprint
+        self.retrieval_cache = get_retrieval_cache()
     
-    def retrieve(self, information_needs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def retrieve(self, information_needs: List[Dict[str, Any]], summarize: bool = True) -> Dict[str, Any]:
         """
         Retrieve information based on the identified needs using the enhanced pipeline
         
+        Every need is answered by the knowledge base when it has a confident
+        match, else by pages indexed from earlier requests, else by search and
+        extraction; "answered_by" records the tier. The extracted contents
+        of all needs are then merged into a single summarization call. The
+        merged summary is attached to need_0, and the other needs point to it
+        with "summarized_in".
+        
+        Summarized results are cached under the query fingerprint set by the
+        QueryProcessor, so paraphrases of an earlier query ("H. pylori" vs
+        "helicobacter") are answered without searching again.
+        
         Args:
             information_needs: List of information needs
+            summarize: Whether to summarize; batch callers pass False and
+                summarize many requests together with LLMSummarizer.summarize_many,
+                using summary_request to build each request
             
         Returns:
             Dictionary containing retrieved and processed knowledge
         """
+        cache_key = self._cache_key(information_needs) if summarize else None
+        if cache_key is not None:
+            cached = self.retrieval_cache.get(cache_key)
+            if cached is not None:
+                return self._cached_results(cached)
+        
         results = {}
         
-        # Process each information need through the enhanced pipeline
+        # Process each information need through search and extraction
         for need in information_needs:
             need_type = need.get("type", "general")
             query = need.get("query", "")
@@ -42,10 +135,31 @@ class KnowledgeRouter:
             need_result = {
                 "query": query,
                 "type": need_type,
+                "priority": need.get("priority", 1.0),
                 "raw_search_results": [],
                 "extracted_contents": [],
-                "summarized_response": None
+                "summarized_response": None,
+                "intent": need.get("intent"),
+                "concepts": need.get("concepts"),
+                "original_query": need.get("original_query"),
+                "fingerprint": need.get("fingerprint"),
+                "answered_by": "web"
             }
+            limit = need.get("max_extractions", 3)
+            
+            # Step 0: Answer from the knowledge base, or from pages extracted by
+            # earlier requests, when they cover the need
+            for tier, lookup in (("knowledge_base", self._search_knowledge_base),
+                                 ("local_corpus", self._search_corpus)):
+                local_contents = lookup(need, limit)
+                if local_contents:
+                    need_result["extracted_contents"] = local_contents
+                    need_result["answered_by"] = tier
+                    break
+            if need_result["answered_by"] != "web":
+                self._record_tier(need_result["answered_by"])
+                results[f"need_{len(results)}"] = need_result
+                continue
             
             # Step 1: Perform the search based on need type
             if need_type == "medical":
@@ -65,52 +179,284 @@ class KnowledgeRouter:
             # Store raw search results
             need_result["raw_search_results"] = result_list
             
-            # Step 2: Extract content from top search results (max 3 for efficiency)
-            extracted_contents = []
-            for i, result in enumerate(result_list[:3]):  # Limit to top 3 results
-                if "url" in result and result["url"]:
-                    try:
-                        # Use Tavily extract for content extraction
-                        extracted_content = self.dynamic_search.extract_content(result["url"], extractor="tavily")
-                        extracted_contents.append(extracted_content)
-                    except Exception as e:
-                        print(f"Error extracting content from {result['url']}: {str(e)}")
-                        # Add basic info without full content
-                        extracted_contents.append({
-                            "title": result.get("title", "Unknown"),
-                            "content": result.get("snippet", "Content extraction failed"),
-                            "source_url": result.get("url", ""),
-                            "extraction_success": False,
-                            "error": str(e)
-                        })
-            
-            # Store extracted contents
-            need_result["extracted_contents"] = extracted_contents
-            
-            # Step 3: Use LLM to summarize with medical-specific prompt
-            if extracted_contents:
+            # Step 2: Extract content from top search results (within the planned budget)
+            need_result["extracted_contents"] = self._extract_top_results(result_list, limit=limit)
+            if self.corpus_search is not None:
+                self.corpus_search.ingest(need_result["extracted_contents"])
+            
+            # Add this processed need to the overall results
+            self._record_tier("web")
+            results[f"need_{len(results)}"] = need_result
+        
+        # Step 3: Summarize the evidence of all needs in one LLM call
+        if summarize and results:
+            request = self.summary_request(results)
+            if request["extracted_contents"]:
                 try:
-                    summary = self.summarizer.summarize(query, extracted_contents)
-                    need_result["summarized_response"] = summary
+                    summary = self.summarizer.summarize(
+                        request["query"], request["extracted_contents"],
+                        concepts=request["concepts"], intent=request["intent"])
                 except Exception as e:
                     print(f"Error in summarization: {str(e)}")
-                    need_result["summarized_response"] = {
+                    summary = {
                         "summary": f"Unable to generate summary: {str(e)}",
                         "sources": [],
                         "error": str(e)
                     }
             else:
-                need_result["summarized_response"] = {
+                summary = {
                     "summary": "No relevant information found for your query.",
                     "sources": [],
                     "error": "No content to summarize"
                 }
+            self.attach_summary(results, summary)
             
-            # Add this processed need to the overall results
-            results[f"need_{len(results)}"] = need_result
+            # Errors and degraded (extractive fallback) answers are not cached,
+            # so the next request gets a full answer once the LLM recovers
+            if cache_key is not None and not summary.get("error") and not summary.get("fallback"):
+                self.retrieval_cache.set(cache_key, copy.deepcopy(results))
+        
+        return results
+    
+    def _cache_key(self, information_needs: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Build the retrieval cache key for a set of needs
+        
+        Args:
+            information_needs: List of information needs
+            
+        Returns:
+            The shared query fingerprint, or None if caching does not apply
+        """
+        if self.retrieval_cache is None or not information_needs:
+            return None
+        fingerprints = {need.get("fingerprint") for need in information_needs}
+        if len(fingerprints) != 1 or None in fingerprints:
+            return None
+        return fingerprints.pop()
+    
+    @staticmethod
+    def _cached_results(cached: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy cached results for a new request
+        
+        The summary is marked as cached and its token usage cleared, since
+        answering from the cache made no LLM call.
         
+        Args:
+            cached: Results stored by an earlier retrieve call
+            
+        Returns:
+            Independent copy of the results
+        """
+        results = copy.deepcopy(cached)
+        for need_result in results.values():
+            summary = need_result.get("summarized_response")
+            if summary:
+                summary["cached"] = True
+                summary["usage"] = {**empty_usage(), "calls": []}
         return results
     
+    @staticmethod
+    def _record_tier(tier: str) -> None:
+        """Count a need answered by a tier"""
+        with _tier_counts_lock:
+            _tier_counts[tier] += 1
+    
+    def _search_knowledge_base(self, need: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        """
+        Look a need up in the curated knowledge base
+        
+        Args:
+            need: Information need
+            limit: Number of documents the need may use
+            
+        Returns:
+            Extracted contents from documents with a citable source that reach
+            KB_ROUTING_MIN_SCORE and cover the need's concepts and intent, or
+            an empty list
+        """
+        if self.knowledge_base is None or limit <= 0:
+            return []
+        query = need.get("original_query") or need.get("query", "")
+        try:
+            results = self.knowledge_base.covering_results(
+                query, need.get("covers") or need.get("concepts") or [], need.get("intent"),
+                top_k=limit, min_score=self.kb_min_score)
+        except Exception as e:
+            print(f"Error querying the knowledge base: {str(e)}")
+            return []
+        # Placeholder documents never answer a need; the next tier does
+        return [{
+            "title": result.get("title") or "",
+            "content": result.get("content") or "",
+            "source_url": result["url"],
+            "extraction_success": True,
+            "score": result["relevance_score"],
+            "source": "knowledge_base",
+            "source_type": result.get("source_type"),
+            "published_date": result.get("publication_date") or ""
+        } for result in results if has_citable_source(result)]
+    
+    def _search_corpus(self, need: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        """
+        Look a need up in the local corpus index
+        
+        Args:
+            need: Information need
+            limit: Number of pages the need may use
+            
+        Returns:
+            Extracted contents from the index, or an empty list if too few
+            indexed pages clear CORPUS_MIN_SCORE and CORPUS_MIN_COVERAGE and
+            cover the need's concepts and intent
+        """
+        if self.corpus_search is None or limit <= 0:
+            return []
+        # The user's own wording matches page text better than the search rewrite
+        query = need.get("original_query") or need.get("query", "")
+        try:
+            contents = self.corpus_search.retrieve(
+                query, limit=limit, concepts=need.get("covers") or need.get("concepts") or [],
+                intent=need.get("intent"))
+        except Exception as e:
+            print(f"Error searching the local corpus: {str(e)}")
+            return []
+        return contents if len(contents) >= min(limit, self.corpus_min_sources) else []
+    
+    def _extract_top_results(self, result_list: List[Dict[str, Any]], limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Extract content from the top search results
+        
+        URLs that failed recently are skipped and the next result is used instead.
+        Only failures of the URL itself (HTTP errors, timeouts) are recorded;
+        provider-side failures such as a bad API key or an outage are not.
+        
+        Args:
+            result_list: Search results in rank order
+            limit: Number of extractions to attempt
+            
+        Returns:
+            List of extracted content dictionaries
+        """
+        extracted_contents = []
+        for result in result_list:
+            if len(extracted_contents) >= limit:
+                break
+            if "url" not in result or not result["url"]:
+                continue
+            if self.negative_cache.is_blocked(result["url"]):
+                print(f"Skipping recently failed URL: {result['url']}")
+                continue
+            try:
+                # Use Tavily extract for content extraction
+                extracted_content = self.dynamic_search.extract_content(result["url"], extractor="tavily")
+                # Carry the search relevance so the summarizer can weight its context budget
+                if "score" in result:
+                    extracted_content.setdefault("score", result["score"])
+                extracted_contents.append(extracted_content)
+                if extracted_content.get("extraction_success", False):
+                    self.negative_cache.record_success(result["url"])
+                elif extracted_content.get("url_error"):
+                    self.negative_cache.record_failure(result["url"], reason=extracted_content["url_error"])
+            except Exception as e:
+                print(f"Error extracting content from {result['url']}: {str(e)}")
+                # Add basic info without full content
+                extracted_contents.append({
+                    "title": result.get("title", "Unknown"),
+                    "content": result.get("snippet", "Content extraction failed"),
+                    "source_url": result.get("url", ""),
+                    "extraction_success": False,
+                    "error": str(e)
+                })
+        return extracted_contents
+    
+    @staticmethod
+    def merge_extracted_contents(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Merge the extracted contents of all needs into one source list
+        
+        Sources are deduplicated by URL (keeping the best copy) and ordered by
+        the priority of the highest-priority need that found them, then by
+        search score. Each merged source lists the needs it came from in "needs".
+        
+        Args:
+            results: Per-need results from retrieve
+            
+        Returns:
+            Merged list of extracted content dictionaries
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        ranks: Dict[str, tuple] = {}
+        
+        for order, (need_key, need_result) in enumerate(results.items()):
+            priority = need_result.get("priority", 1.0)
+            for position, content in enumerate(need_result.get("extracted_contents", [])):
+                url = content.get("source_url") or f"{need_key}#{position}"
+                score = content.get("score")
+                score = float(score) if isinstance(score, (int, float)) else 0.0
+                rank = (-priority, -score, order, position)
+                
+                existing = merged.get(url)
+                if existing is None:
+                    merged[url] = dict(content, needs=[need_key])
+                    ranks[url] = rank
+                    continue
+                
+                existing["needs"].append(need_key)
+                ranks[url] = min(ranks[url], rank)
+                # Prefer a successful extraction over a failed copy of the same page
+                if content.get("extraction_success") and not existing.get("extraction_success"):
+                    merged[url] = dict(content, needs=existing["needs"])
+        
+        return [merged[url] for url in sorted(merged, key=lambda url: ranks[url])]
+    
+    def summary_request(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the single summarization request for a set of need results
+        
+        Args:
+            results: Per-need results from retrieve
+            
+        Returns:
+            Dictionary with query, extracted_contents, concepts and intent, as
+            accepted by LLMSummarizer.summarize_many
+        """
+        needs = list(results.values())
+        primary = max(needs, key=lambda n: n.get("priority", 1.0))
+        
+        # Answer the user's own question; the need queries are search rewrites
+        query = primary.get("original_query") or primary.get("query", "")
+        
+        concepts: List[str] = []
+        for need_result in needs:
+            for concept in need_result.get("concepts") or []:
+                if concept not in concepts:
+                    concepts.append(concept)
+        
+        return {
+            "query": query,
+            "extracted_contents": self.merge_extracted_contents(results),
+            "concepts": concepts,
+            "intent": primary.get("intent")
+        }
+    
+    @staticmethod
+    def attach_summary(results: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        """
+        Attach the merged summary to need_0 and point the other needs to it
+        
+        Args:
+            results: Per-need results from retrieve
+            summary: Summary produced from summary_request
+        """
+        for index, need_result in enumerate(results.values()):
+            if index == 0:
+                need_result["summarized_response"] = summary
+            else:
+                need_result["summarized_response"] = None
+                need_result["summarized_in"] = "need_0"
+    
     def search_extract_summarize(self, query: str, search_type: str = "medical") -> Dict[str, Any]:
         """
         Convenience method to run the full pipeline on a single query
@@ -0,0 +1,195 @@
+from typing import Dict, List, Any, Optional
+import os
+from dotenv import load_dotenv
+from app.core.intent import intent_profile
+
+# Search query templates; {subject} names the concepts covered by the need
+CONDITION_TEMPLATES: Dict[str, str] = {
+    "treatment": "current treatment guidelines for {subject} in gastroenterology",
+    "diagnosis": "diagnosis approach for {subject} in gastroenterology",
+    "medication": "medications for {subject} gastroenterology evidence-based",
+    "guideline": "latest clinical guidelines for {subject} gastroenterology",
+    "screening": "screening and surveillance recommendations for {subject} in gastroenterology",
+    "overview": "{subject} gastroenterology clinical overview"
+}
+PROCEDURE_TEMPLATE = "{subject} in gastroenterology indications techniques evidence-based"
+MEDICATION_TEMPLATE = "{subject} in gastroenterology uses dosing evidence-based"
+SCREENING_TEMPLATE = "gastroenterology screening guidelines {query}"
+GUIDELINE_TEMPLATE = "gastroenterology clinical guidelines {query}"
+FALLBACK_TEMPLATE = "gastroenterology {query} evidence-based"
+
+# Query-type flags in the order they pick the condition template
+_CONDITION_FLAGS = ["treatment", "diagnosis", "medication", "guideline"]
+
+# Templates for queries without lexicon concepts, by confidently detected intent
+_NO_CONCEPT_TEMPLATES = {"screening": SCREENING_TEMPLATE, "guideline": GUIDELINE_TEMPLATE}
+
+
+def join_concepts(concepts: List[str]) -> str:
+    """
+    Join concept names into readable text ("a, b and c")
+
+    Args:
+        concepts: Concept names
+
+    Returns:
+        Joined names
+    """
+    if len(concepts) <= 1:
+        return "".join(concepts)
+    return f"{', '.join(concepts[:-1])} and {concepts[-1]}"
+
+
+class NeedPlanner:
+    """
+    Turns the concepts detected in a query into a small set of search needs.
+
+    Every detected condition, procedure and medication is covered. Concepts
+    are packed into combined queries (conditions first, with the procedures
+    and medications asked about), a need whose concepts are all covered by an
+    earlier one is dropped, and the plan respects a per-request budget of
+    searches and extractions.
+    """
+
+    def __init__(self,
+                 max_searches: Optional[int] = None,
+                 max_extractions: Optional[int] = None,
+                 max_concepts_per_need: int = 3,
+                 max_extractions_per_need: int = 3):
+        """
+        Initialize the planner
+
+        Args:
+            max_searches: Most search calls per request
+            max_extractions: Most content extractions per request, shared by the needs
+            max_concepts_per_need: Most concepts combined into one search query
+            max_extractions_per_need: Most extractions for a single need
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.max_searches = max(1, max_searches or int(os.getenv("MAX_SEARCHES_PER_REQUEST", "3")))
+        self.max_extractions = max(1, max_extractions or int(os.getenv("MAX_EXTRACTIONS_PER_REQUEST", "6")))
+        self.max_concepts_per_need = max_concepts_per_need
+        self.max_extractions_per_need = max_extractions_per_need
+
+    def plan(self,
+             query_text: str,
+             conditions: List[str],
+             procedures: List[str],
+             medications: List[str],
+             flags: Dict[str, bool],
+             intent: Optional[str] = None,
+             confidence: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Plan the information needs for one query
+
+        A confidently classified intent picks the query templates and caps
+        the extraction depth at the intent's profile; otherwise the keyword
+        flags pick the templates and every search gets the full depth.
+
+        Args:
+            query_text: The user query
+            conditions: Conditions found, in lexicon order
+            procedures: Procedures found, in lexicon order
+            medications: Medications found, in lexicon order
+            flags: Query-type flags from intent_flags
+            intent: Intent from detect_intent
+            confidence: Classifier confidence from detect_intent (0 when keyword rules decided)
+
+        Returns:
+            Needs in priority order, each with "type", "query", "priority",
+            "covers" (the concepts its query names) and "max_extractions"
+        """
+        confident = bool(intent) and confidence > 0
+        if confident:
+            kind = intent if intent in CONDITION_TEMPLATES else "overview"
+            depth = min(self.max_extractions_per_need, intent_profile(intent)["extractions"])
+        else:
+            kind = next((flag for flag in _CONDITION_FLAGS if flags.get(flag)), "overview")
+            depth = self.max_extractions_per_need
+
+        groups = self._group(conditions, procedures + medications)
+
+        needs: List[Dict[str, Any]] = []
+        for group in groups:
+            concepts = group["conditions"] + group["interventions"]
+            if any(set(concepts) <= set(need["covers"]) for need in needs):
+                continue
+            needs.append({
+                "type": "medical",
+                "query": self._render(group, procedures, kind),
+                "covers": concepts
+            })
+
+        if not needs:
+            if confident:
+                template = _NO_CONCEPT_TEMPLATES.get(intent, FALLBACK_TEMPLATE)
+            else:
+                template = SCREENING_TEMPLATE if flags.get("screening") else FALLBACK_TEMPLATE
+            needs.append({"type": "medical", "query": template.format(query=query_text), "covers": []})
+
+        # Every planned search gets at least one extraction
+        needs = self._dedupe(needs)[:min(self.max_searches, self.max_extractions)]
+        for rank, need in enumerate(needs):
+            need["priority"] = round(1.0 - 0.1 * rank, 2)
+        self._allocate_extractions(needs, depth)
+        return needs
+
+    def _group(self, conditions: List[str], interventions: List[str]) -> List[Dict[str, List[str]]]:
+        """
+        Pack concepts into groups of at most max_concepts_per_need
+
+        Each condition group carries as many of the interventions as fit, so
+        "infliximab in Crohn's disease with hepatitis B" becomes one query.
+        Interventions that fit nowhere get groups of their own.
+        """
+        size = self.max_concepts_per_need
+        groups = []
+        placed = set()
+
+        for start in range(0, len(conditions), size):
+            chunk = conditions[start:start + size]
+            room = size - len(chunk)
+            group_interventions = interventions[:room]
+            placed.update(group_interventions)
+            groups.append({"conditions": chunk, "interventions": group_interventions})
+
+        remaining = [concept for concept in interventions if concept not in placed]
+        for start in range(0, len(remaining), size):
+            groups.append({"conditions": [], "interventions": remaining[start:start + size]})
+        return groups
+
+    @staticmethod
+    def _render(group: Dict[str, List[str]], procedures: List[str], kind: str) -> str:
+        """Fill the search template for a group of concepts"""
+        if group["conditions"]:
+            subject = join_concepts(group["conditions"])
+            if group["interventions"]:
+                subject = f"{subject} with {join_concepts(group['interventions'])}"
+            return CONDITION_TEMPLATES[kind].format(subject=subject)
+
+        subject = join_concepts(group["interventions"])
+        if any(concept in procedures for concept in group["interventions"]):
+            return PROCEDURE_TEMPLATE.format(subject=subject)
+        return MEDICATION_TEMPLATE.format(subject=subject)
+
+    @staticmethod
+    def _dedupe(needs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop needs whose query words repeat an earlier need's"""
+        kept = []
+        seen = set()
+        for need in needs:
+            key = frozenset(need["query"].lower().split())
+            if key not in seen:
+                seen.add(key)
+                kept.append(need)
+        return kept
+
+    def _allocate_extractions(self, needs: List[Dict[str, Any]], depth: int) -> None:
+        """Share the extraction budget across needs, higher priority first, at most depth each"""
+        budget = self.max_extractions
+        for index, need in enumerate(needs):
+            share = -(-budget // (len(needs) - index))
+            need["max_extractions"] = min(share, depth)
+            budget -= need["max_extractions"]
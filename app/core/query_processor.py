@@ -1,36 +1,161 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Optional, Iterable, Iterator
 import os
+import hashlib
+import unicodedata
 from dotenv import load_dotenv
+from app.core.intent import detect_intent, intent_flags
+from app.knowledge.lexicon import get_lexicon
+from app.utils.batch import map_chunks
+
+# Bumped whenever canonicalization changes, so old fingerprints stop matching
+FINGERPRINT_VERSION = 3
+
+
+def strip_punctuation(text: str) -> str:
+    """
+    Replace every Unicode punctuation and symbol character with a space
+
+    Args:
+        text: Text to clean
+
+    Returns:
+        Text with punctuation removed and whitespace collapsed
+    """
+    cleaned = "".join(" " if unicodedata.category(char)[0] in "PS" else char for char in text)
+    return " ".join(cleaned.split())
+
 
 class QueryProcessor:
     """
     Processes and analyzes user queries to extract key information
     """
-    
+
     def __init__(self):
         """Initialize the query processor"""
         # Load environment variables from .env file
         load_dotenv()
-        
-        # Initialize any required resources
-        pass
-    
+
+        # Medical lexicon used to map synonyms and abbreviations to concept IDs
+        self.lexicon = get_lexicon()
+
+        # Correct misspelled lexicon words before concept matching
+        self.spelling_correction = os.getenv("SPELLING_CORRECTION_ENABLED", "true").lower() == "true"
+
     def process(self, query_text: str) -> Dict[str, Any]:
         """
         Process a user query to extract key information
-        
+
         Args:
             query_text: The raw query text from the user
-            
+
         Returns:
             Dictionary containing processed query information
         """
-        # Basic processing for now
+        normalized_text = query_text.lower().strip()
+        corrected_text, corrections = (self.lexicon.correct(normalized_text) if self.spelling_correction
+                                       else (normalized_text, []))
+        canonical_text, concept_ids = self.canonicalize(corrected_text)
+        # Classify the corrected query as worded; the classifier is trained on raw queries
+        intent, confidence = detect_intent(corrected_text, intent_flags(corrected_text))
+
         processed_query = {
             "original_text": query_text,
-            "normalized_text": query_text.lower().strip(),
+            "normalized_text": normalized_text,
             "word_count": len(query_text.split()),
-            "is_question": query_text.strip().endswith("?")
+            "is_question": query_text.strip().endswith("?"),
+            "corrected_text": corrected_text,
+            "corrections": corrections,
+            "canonical_text": canonical_text,
+            "concept_ids": concept_ids,
+            "intent": intent,
+            "intent_confidence": confidence,
+            "fingerprint": self.fingerprint(canonical_text, concept_ids, intent)
         }
-        
+
         return processed_query
+
+    def process_many(self,
+                     query_texts: Iterable[str],
+                     chunk_size: int = 1000,
+                     workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process a stream of queries, such as a production query log
+
+        Queries are handled in chunks, optionally across worker processes that
+        each map the shared lexicon once, and results are yielded in input
+        order without holding the whole log in memory.
+
+        Args:
+            query_texts: Raw query texts
+            chunk_size: Queries per chunk
+            workers: Worker processes (None or 1 runs in this process, 0 uses every CPU)
+
+        Returns:
+            Iterator over processed query dictionaries
+        """
+        if workers is None or workers == 1:
+            for query_text in query_texts:
+                yield self.process(query_text)
+            return
+        yield from map_chunks(_process_chunk, query_texts, chunk_size, workers)
+
+    def canonicalize(self, query_text: str) -> Tuple[str, List[str]]:
+        """
+        Reduce a query to a canonical form shared by its paraphrases
+
+        The text is NFKC-normalized and casefolded, lexicon terms are replaced
+        by their concept IDs (so "H. pylori", "helicobacter" and "Helicobacter
+        pylori" all become "h_pylori"), and punctuation is stripped.
+        Overlapping terms resolve to the longest match starting first.
+
+        Args:
+            query_text: The raw query text
+
+        Returns:
+            Tuple of (canonical text, sorted unique concept IDs)
+        """
+        text = unicodedata.normalize("NFKC", query_text).casefold()
+
+        matches = sorted(self.lexicon.find(text), key=lambda m: (m.start, -(m.end - m.start)))
+        tokens = []
+        concept_ids = set()
+        position = 0
+        for match in matches:
+            if match.start < position:
+                continue
+            tokens.append(strip_punctuation(text[position:match.start]))
+            tokens.append(match.concept_id)
+            concept_ids.add(match.concept_id)
+            position = match.end
+        tokens.append(strip_punctuation(text[position:]))
+
+        return " ".join(token for token in tokens if token), sorted(concept_ids)
+
+    @staticmethod
+    def fingerprint(canonical_text: str, concept_ids: List[str], intent: str) -> str:
+        """
+        Build the cache key for a canonical query
+
+        Args:
+            canonical_text: Output of canonicalize
+            concept_ids: Sorted concept IDs in the query
+            intent: Primary query intent
+
+        Returns:
+            Hex SHA-256 digest identifying logically identical queries
+        """
+        material = f"{FINGERPRINT_VERSION}|{intent}|{','.join(concept_ids)}|{canonical_text}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# Processor reused by every chunk a worker process handles
+_worker_processor: Optional[QueryProcessor] = None
+
+
+def _process_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+    """Process one chunk of queries in a worker process"""
+    global _worker_processor
+
+    if _worker_processor is None:
+        _worker_processor = QueryProcessor()
+    return [_worker_processor.process(query_text) for query_text in chunk]
@@ -1,7 +1,11 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterable, Iterator
 import os
 from dotenv import load_dotenv
 import re
+from app.core.intent import intent_flags, detect_intent
+from app.core.need_planner import NeedPlanner
+from app.knowledge.lexicon import get_lexicon
+from app.utils.batch import map_chunks
 
 class ReasoningAgent:
     """
@@ -14,40 +18,26 @@ class ReasoningAgent:
         # Load environment variables from .env file
         load_dotenv()
         
-        # Medical term dictionaries for concept recognition
-        self.gi_conditions = [
-            "gerd", "acid reflux", "heartburn", "Barrett's esophagus", 
-            "esophagitis", "peptic ulcer", "gastritis", "H. pylori", "helicobacter",
-            "dyspepsia", "gastroparesis", "ibs", "irritable bowel syndrome", 
-            "Crohn's disease", "ulcerative colitis", "ibd", "inflammatory bowel disease",
-            "celiac disease", "microscopic colitis", "collagenous colitis", "lymphocytic colitis",
-            "diverticulosis", "diverticulitis", "polyps", "colorectal cancer", "colon cancer",
-            "rectal cancer", "anal fissure", "hemorrhoids", "fecal incontinence",
-            "constipation", "diarrhea", "gi bleeding", "pancreatitis", "gallstones",
-            "cholecystitis", "cirrhosis", "hepatitis", "nash", "fatty liver", "jaundice",
-            "ascites", "varices", "dysphagia", "odynophagia", "gastroenteritis"
-        ]
+        # Medical lexicon (conditions, procedures, medications), memory-mapped once per process
+        self.lexicon = get_lexicon()
         
-        self.gi_procedures = [
-            "endoscopy", "colonoscopy", "sigmoidoscopy", "ercp", "eus", "capsule endoscopy",
-            "manometry", "ph monitoring", "breath test", "stool test", "biopsy", "polypectomy",
-            "emr", "esd", "band ligation", "sclerotherapy", "paracentesis", "fibroscan",
-            "liver biopsy", "gastric emptying study"
-        ]
-        
-        self.medications = [
-            "ppi", "proton pump inhibitor", "omeprazole", "esomeprazole", "pantoprazole", 
-            "lansoprazole", "dexlansoprazole", "rabeprazole", "h2 blocker", "famotidine", 
-            "cimetidine", "ranitidine", "antacid", "sucralfate", "misoprostol", 
-            "bismuth", "antibiotic", "metronidazole", "clarithromycin", "amoxicillin",
-            "tetracycline", "levofloxacin", "anti-spasmodic", "dicyclomine", "hyoscyamine",
-            "antidiarrheal", "loperamide", "diphenoxylate", "fiber supplement", 
-            "laxative", "polyethylene glycol", "lactulose", "linaclotide", "lubiprostone",
-            "plecanatide", "senna", "bisacodyl", "probiotics", "rifaximin", "mesalamine",
-            "sulfasalazine", "balsalazide", "olsalazine", "budesonide", "prednisone",
-            "azathioprine", "6-mp", "methotrexate", "infliximab", "adalimumab",
-            "vedolizumab", "ustekinumab", "tofacitinib", "ursodiol", "cholestyramine"
-        ]
+        # Turns detected concepts into search needs within the per-request budget
+        self.planner = NeedPlanner()
+
+    @property
+    def gi_conditions(self) -> List[str]:
+        """Canonical names of the GI conditions in the lexicon"""
+        return self.lexicon.names("condition")
+
+    @property
+    def gi_procedures(self) -> List[str]:
+        """Canonical names of the GI procedures in the lexicon"""
+        return self.lexicon.names("procedure")
+
+    @property
+    def medications(self) -> List[str]:
+        """Canonical names of the medications in the lexicon"""
+        return self.lexicon.names("medication")
     
     def analyze(self, processed_query: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -59,107 +49,80 @@ class ReasoningAgent:
         Returns:
             List of information needs with medical context
         """
-        query_text = processed_query.get("normalized_text", "")
+        # Prefer the spelling-corrected text so misspelled concepts still match
+        query_text = processed_query.get("corrected_text") or processed_query.get("normalized_text", "")
         if not query_text and "text" in processed_query:
             query_text = processed_query["text"]
         
         # Convert to lowercase for matching
         query_lower = query_text.lower()
         
-        # Initial information needs with the original query
-        information_needs = []
-        
-        # Check if query contains GI conditions
-        gi_conditions_found = [term for term in self.gi_conditions if term in query_lower]
-        
-        # Check if query contains GI procedures
-        gi_procedures_found = [term for term in self.gi_procedures if term in query_lower]
-        
-        # Check if query contains medications
-        medications_found = [med for med in self.medications if med in query_lower]
+        # Check if query contains GI conditions, procedures or medications (one scan)
+        found = self.lexicon.found(query_lower)
+        gi_conditions_found = found["condition"]
+        gi_procedures_found = found["procedure"]
+        medications_found = found["medication"]
         
         # Check for question types
-        is_treatment_query = any(term in query_lower for term in ["treatment", "manage", "therapy", "cure", "how to treat"])
-        is_diagnosis_query = any(term in query_lower for term in ["diagnose", "test", "signs", "symptoms", "how to diagnose"])
-        is_screening_query = any(term in query_lower for term in ["screen", "prevent", "risk", "when to get", "how often"])
-        is_medication_query = any(term in query_lower for term in ["drug", "medication", "dose", "side effect", "interaction"])
-        is_guideline_query = any(term in query_lower for term in ["guideline", "recommendation", "consensus", "protocol", "standard"])
+        flags = intent_flags(query_lower)
+        
+        # Primary intent decides how long the final answer should be; the
+        # classifier's confidence also steers templates and extraction depth
+        if processed_query.get("intent"):
+            intent, confidence = processed_query["intent"], processed_query.get("intent_confidence", 0.0)
+        else:
+            intent, confidence = detect_intent(query_lower, flags)
+        
+        # Cover every detected concept with as few searches as the budget allows
+        information_needs = self.planner.plan(
+            query_text, gi_conditions_found, gi_procedures_found, medications_found, flags,
+            intent=intent, confidence=confidence)
+        
+        # Attach the recognised concepts and intent so later stages can focus on them
+        concepts = gi_conditions_found + gi_procedures_found + medications_found
+        for need in information_needs:
+            need["concepts"] = concepts
+            need["intent"] = intent
+            need["intent_confidence"] = confidence
+            # Answer the question as the user worded it; corrections only steer matching
+            need["original_query"] = processed_query.get("original_text") or query_text
+            need["fingerprint"] = processed_query.get("fingerprint")
         
-        # Determine primary query type and build specialized queries
-        if gi_conditions_found:
-            condition = gi_conditions_found[0]  # Use the first condition found
-            
-            if is_treatment_query:
-                information_needs.append({
-                    "type": "medical",
-                    "query": f"current treatment guidelines for {condition} in gastroenterology",
-                    "priority": 1.0
-                })
-            elif is_diagnosis_query:
-                information_needs.append({
-                    "type": "medical",
-                    "query": f"diagnosis approach for {condition} in gastroenterology",
-                    "priority": 1.0
-                })
-            elif is_medication_query:
-                information_needs.append({
-                    "type": "medical",
-                    "query": f"medications for {condition} gastroenterology evidence-based",
-                    "priority": 1.0
-                })
-            elif is_guideline_query:
-                information_needs.append({
-                    "type": "medical",
-                    "query": f"latest clinical guidelines for {condition} gastroenterology",
-                    "priority": 1.0
-                })
-            else:
-                information_needs.append({
-                    "type": "medical",
-                    "query": f"{condition} gastroenterology clinical overview",
-                    "priority": 1.0
-                })
+        return information_needs
+    
+    def analyze_many(self,
+                     processed_queries: Iterable[Dict[str, Any]],
+                     chunk_size: int = 1000,
+                     workers: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Analyze a stream of processed queries, e.g. from QueryProcessor.process_many
         
-        elif gi_procedures_found:
-            procedure = gi_procedures_found[0]  # Use the first procedure found
-            
-            information_needs.append({
-                "type": "medical",
-                "query": f"{procedure} in gastroenterology indications techniques evidence-based",
-                "priority": 1.0
-            })
+        Queries are handled in chunks, optionally across worker processes that
+        each map the shared lexicon once, and results are yielded in input order.
         
-        elif medications_found:
-            medication = medications_found[0]  # Use the first medication found
+        Args:
+            processed_queries: Processed query dictionaries
+            chunk_size: Queries per chunk
+            workers: Worker processes (None or 1 runs in this process, 0 uses every CPU)
             
-            information_needs.append({
-                "type": "medical",
-                "query": f"{medication} in gastroenterology uses dosing evidence-based",
-                "priority": 1.0
-            })
-        
-        elif is_screening_query:
-            # Generic screening query
-            information_needs.append({
-                "type": "medical",
-                "query": f"gastroenterology screening guidelines {query_text}",
-                "priority": 1.0
-            })
-        
-        # If we haven't identified any specific needs, use the original query
-        if not information_needs:
-            # Add medical context to the query
-            information_needs.append({
-                "type": "medical",
-                "query": f"gastroenterology {query_text} evidence-based",
-                "priority": 1.0
-            })
-        
-        # Always add the original query as a backup with lower priority
-        information_needs.append({
-            "type": "medical",
-            "query": query_text,
-            "priority": 0.8
-        })
-        
-        return information_needs
+        Returns:
+            Iterator over the information needs of each query
+        """
+        if workers is None or workers == 1:
+            for processed_query in processed_queries:
+                yield self.analyze(processed_query)
+            return
+        yield from map_chunks(_analyze_chunk, processed_queries, chunk_size, workers)
+
+
+# Agent reused by every chunk a worker process handles
+_worker_agent: Optional[ReasoningAgent] = None
+
+
+def _analyze_chunk(chunk: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Analyze one chunk of processed queries in a worker process"""
+    global _worker_agent
+    
+    if _worker_agent is None:
+        _worker_agent = ReasoningAgent()
+    return [_worker_agent.analyze(processed_query) for processed_query in chunk]
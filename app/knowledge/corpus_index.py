@@ -0,0 +1,757 @@
+from typing import Dict, List, Any, Optional, Tuple, Iterable, NamedTuple
+import os
+import json
+import math
+import mmap
+import time
+import heapq
+import struct
+import atexit
+import logging
+import threading
+import numpy as np
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from dotenv import load_dotenv
+from app.output.passage_selector import tokenize, chunk_text
+
+try:
+    import fcntl
+except ImportError:
+    # Without fcntl (Windows) only one process may write to an index
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Segment file: magic, version, documents, then byte lengths of the term
+# dictionary, postings and stored documents
+_HEADER = struct.Struct("<4sIQQQQ")
+_MAGIC = b"GBM1"
+_VERSION = 1
+
+_MANIFEST = "manifest.json"
+_LOCK = "write.lock"
+
+
+class CorpusHit(NamedTuple):
+    """One BM25 search result"""
+    doc_id: int
+    score: float
+    relevance: float
+    coverage: float
+    document: Dict[str, Any]
+
+
+def _varint_layout(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Encoded bytes of non-negative integers and the byte count of each"""
+    values = np.asarray(values, dtype=np.int64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    for bits in range(7, 63, 7):
+        sizes += values >= (1 << bits)
+    total = int(sizes.sum())
+    starts = np.cumsum(sizes) - sizes
+    shift = np.arange(total) - np.repeat(starts, sizes)
+    encoded = ((np.repeat(values, sizes) >> (7 * shift)) & 0x7F).astype(np.uint8)
+    encoded[shift < np.repeat(sizes, sizes) - 1] |= 0x80
+    return encoded, sizes
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    """
+    Encode non-negative integers as LEB128 varints (7 bits per byte)
+
+    Args:
+        values: Integers to encode
+
+    Returns:
+        Encoded bytes
+    """
+    return _varint_layout(np.fromiter(values, dtype=np.int64))[0].tobytes()
+
+
+def decode_varints(blob: bytes) -> np.ndarray:
+    """
+    Decode LEB128 varints in one vectorized pass
+
+    Args:
+        blob: Bytes written by encode_varints
+
+    Returns:
+        Array of the decoded integers
+    """
+    data = np.frombuffer(blob, dtype=np.uint8)
+    if not len(data):
+        return np.zeros(0, dtype=np.int64)
+    continued = data >= 0x80
+    starts = np.flatnonzero(np.concatenate(([True], ~continued[:-1])))
+    shift = np.arange(len(data)) - np.repeat(starts, np.diff(np.append(starts, len(data))))
+    return np.add.reduceat((data & 0x7F).astype(np.int64) << (7 * shift), starts)
+
+
+def _pad(size: int) -> int:
+    """Bytes needed to align an offset to 8"""
+    return -size % 8
+
+
+def _group_starts(counts: np.ndarray) -> np.ndarray:
+    """Start of each group in a flat array, repeated for every element of the group"""
+    return np.repeat(np.cumsum(counts) - counts, counts)
+
+
+def write_segment(path: str,
+                  doc_ids: np.ndarray,
+                  lengths: np.ndarray,
+                  documents: List[bytes],
+                  terms: List[str],
+                  term_ids: np.ndarray,
+                  positions: np.ndarray,
+                  frequencies: np.ndarray) -> None:
+    """
+    Write an immutable segment file
+
+    Postings are passed flat, sorted by term and then position: posting i
+    says term terms[term_ids[i]] occurs frequencies[i] times in the document
+    at positions[i] (an index into doc_ids). On disk each term's list is
+    stored as (position gap, frequency) varint pairs.
+
+    Args:
+        path: Output path
+        doc_ids: Global document id of each position
+        lengths: Token count of each document
+        documents: Stored JSON document of each position
+        terms: Sorted vocabulary of the segment
+        term_ids: Term of each posting
+        positions: Document position of each posting
+        frequencies: Term frequency of each posting
+    """
+    dfs = np.bincount(term_ids, minlength=len(terms))
+    gaps = positions - np.where(np.arange(len(positions)) == _group_starts(dfs), 0, np.roll(positions, 1))
+    pairs = np.empty(2 * len(positions), dtype=np.int64)
+    pairs[0::2], pairs[1::2] = gaps, frequencies
+    blob, sizes = _varint_layout(pairs)
+
+    pair_bytes = sizes[0::2] + sizes[1::2]
+    term_bytes = np.bincount(term_ids, weights=pair_bytes, minlength=len(terms)).astype(np.int64)
+    term_offsets = np.cumsum(term_bytes) - term_bytes
+    dictionary = {term: [int(o), int(n), int(df)] for term, o, n, df in zip(terms, term_offsets, term_bytes, dfs)}
+    dictionary_bytes = json.dumps(dictionary, separators=(",", ":")).encode("utf-8")
+
+    doc_offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+    doc_offsets[1:] = np.cumsum([len(document) for document in documents])
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(doc_ids), len(dictionary_bytes), len(blob), int(doc_offsets[-1])))
+        for section in (dictionary_bytes, blob.tobytes()):
+            f.write(section)
+            f.write(b"\0" * _pad(len(section)))
+        f.write(np.asarray(doc_ids, dtype=np.int64).tobytes())
+        f.write(np.asarray(lengths, dtype=np.int64).tobytes())
+        f.write(doc_offsets.tobytes())
+        f.write(b"".join(documents))
+    os.replace(tmp_path, path)
+
+
+def _compact_terms(terms: List[str], term_ids: np.ndarray, positions: np.ndarray,
+                   frequencies: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Drop terms left without postings and renumber the rest"""
+    used = np.bincount(term_ids, minlength=len(terms)) > 0
+    if used.all():
+        return terms, term_ids, positions, frequencies
+    renumber = np.cumsum(used) - 1
+    return [term for term, keep in zip(terms, used) if keep], renumber[term_ids], positions, frequencies
+
+
+class _Segment:
+    """Memory-mapped immutable segment"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, term_len, postings_len, docs_len = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a corpus segment: {path}")
+
+        offset = _HEADER.size
+        self.terms = json.loads(self._map[offset:offset + term_len])
+        offset += term_len + _pad(term_len)
+        self._postings_start = offset
+        self._postings_len = postings_len
+        offset += postings_len + _pad(postings_len)
+        self.doc_ids = np.frombuffer(self._map, dtype=np.int64, count=count, offset=offset)
+        self.lengths = np.frombuffer(self._map, dtype=np.int64, count=count, offset=offset + 8 * count)
+        self._doc_offsets = np.frombuffer(self._map, dtype=np.int64, count=count + 1, offset=offset + 16 * count)
+        self._docs_start = offset + 24 * count + 8
+
+        self.path = path
+        self.postings = lru_cache(maxsize=4096)(self._decode_postings)
+        self._live = (None, None)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def _decode_postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Positions and term frequencies of a term, or None"""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        start = self._postings_start + entry[0]
+        pairs = decode_varints(self._map[start:start + entry[1]])
+        return np.cumsum(pairs[0::2]), pairs[1::2]
+
+    def all_postings(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Every posting as flat (terms, term_ids, positions, frequencies) arrays, as write_segment takes them"""
+        terms = list(self.terms)
+        dfs = np.array([self.terms[term][2] for term in terms], dtype=np.int64)
+        pairs = decode_varints(self._map[self._postings_start:self._postings_start + self._postings_len])
+        totals = np.cumsum(pairs[0::2])
+        starts = _group_starts(dfs)
+        positions = totals - np.where(starts > 0, totals[starts - 1], 0)
+        return terms, np.repeat(np.arange(len(terms)), dfs), positions, pairs[1::2]
+
+    def document_bytes(self, position: int) -> bytes:
+        """Stored JSON of the document at a position"""
+        start, end = int(self._doc_offsets[position]), int(self._doc_offsets[position + 1])
+        return self._map[self._docs_start + start:self._docs_start + end]
+
+    def document(self, position: int) -> Dict[str, Any]:
+        """Stored document at a position"""
+        return json.loads(self.document_bytes(position))
+
+    def live(self, deleted: frozenset) -> np.ndarray:
+        """Mask of positions whose documents are not deleted, cached per deleted set"""
+        if self._live[0] is not deleted:
+            mask = ~np.isin(self.doc_ids, np.fromiter(deleted, dtype=np.int64, count=len(deleted)))
+            self._live = (deleted, mask)
+        return self._live[1]
+
+    def close(self) -> None:
+        """Unmap the file, or leave that to garbage collection while arrays still view it"""
+        self.doc_ids = self.lengths = self._doc_offsets = None
+        self._live = (None, None)
+        self.postings.cache_clear()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+
+class _Buffer:
+    """Documents added in this process and not yet committed"""
+
+    def __init__(self):
+        self.doc_ids: List[int] = []
+        self.lengths: List[int] = []
+        self.documents: List[bytes] = []
+        self.terms: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.urls: Dict[str, List[int]] = {}
+        self.created: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, provisional_id: int, counts: Counter, length: int, document: bytes) -> None:
+        if self.created is None:
+            self.created = time.monotonic()
+        position = len(self.doc_ids)
+        self.doc_ids.append(provisional_id)
+        self.lengths.append(length)
+        self.documents.append(document)
+        for term, frequency in counts.items():
+            positions, frequencies = self.terms.setdefault(term, ([], []))
+            positions.append(position)
+            frequencies.append(frequency)
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        return np.array(entry[0], dtype=np.int64), np.array(entry[1], dtype=np.int64)
+
+    def document(self, position: int) -> Dict[str, Any]:
+        return json.loads(self.documents[position])
+
+    def live(self, deleted: frozenset) -> np.ndarray:
+        return np.array([doc_id not in deleted for doc_id in self.doc_ids], dtype=bool)
+
+
+class CorpusIndex:
+    """
+    Persistent BM25 inverted index over chunked extracted page contents.
+
+    New documents are buffered in memory (and searchable at once) until
+    commit() writes them as an immutable, memory-mapped segment with
+    varint-compressed posting lists. Segments of similar size are merged
+    once merge_factor of them accumulate, and merges drop deleted documents,
+    so the number of segments stays logarithmic in the corpus size.
+
+    Re-indexing a URL replaces its earlier chunks. Several processes may
+    share an index: commits take a file lock and re-read the manifest, and
+    readers pick up other processes' commits within refresh_interval seconds.
+    """
+
+    def __init__(self,
+                 path: str,
+                 chunk_words: int = 120,
+                 flush_docs: int = 200,
+                 flush_interval: float = 60.0,
+                 merge_factor: int = 4,
+                 refresh_interval: float = 5.0,
+                 k1: float = 1.5,
+                 b: float = 0.75):
+        """
+        Initialize the index, opening the segments already saved at path
+
+        Args:
+            path: Index directory
+            chunk_words: Approximate chunk length in words
+            flush_docs: Buffered chunks that trigger a commit
+            flush_interval: Seconds after which a non-empty buffer is committed on the next add
+            merge_factor: Segments of one size tier that trigger a merge
+            refresh_interval: Seconds between checks for commits by other processes
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization strength
+        """
+        self.path = path
+        self.chunk_words = chunk_words
+        self.flush_docs = flush_docs
+        self.flush_interval = flush_interval
+        self.merge_factor = max(2, merge_factor)
+        self.refresh_interval = refresh_interval
+        self.k1 = k1
+        self.b = b
+
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._segments: Dict[str, _Segment] = {}
+        self._manifest: Dict[str, Any] = self._empty_manifest()
+        self._deleted = frozenset()
+        self._buffer = _Buffer()
+        # Deletions made here and not yet committed: committed ids and
+        # (negative) buffered ids
+        self._pending_deleted: set = set()
+        self._checked_at = 0.0
+        self._signature = None
+        self._refresh(force=True)
+
+    @staticmethod
+    def _empty_manifest() -> Dict[str, Any]:
+        return {"version": _VERSION, "next_doc_id": 0, "segments": [], "deleted": [], "urls": {}}
+
+    def _manifest_signature(self):
+        try:
+            stat = os.stat(os.path.join(self.path, _MANIFEST))
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, _MANIFEST), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return self._empty_manifest()
+
+    def _refresh(self, force: bool = False) -> None:
+        """Open the segments of the current manifest if another commit happened"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            signature = self._manifest_signature()
+            if not force and signature == self._signature:
+                return
+            for attempt in range(3):
+                manifest = self._read_manifest()
+                try:
+                    self._open(manifest)
+                    break
+                except FileNotFoundError:
+                    # A merge removed a segment between reading the manifest and opening it
+                    if attempt == 2:
+                        raise
+            self._signature = signature
+
+    def _open(self, manifest: Dict[str, Any]) -> None:
+        """Switch to the segments listed in a manifest"""
+        names = [segment["name"] for segment in manifest["segments"]]
+        segments = {name: self._segments.get(name) or _Segment(os.path.join(self.path, name)) for name in names}
+        for name, segment in self._segments.items():
+            if name not in segments:
+                segment.close()
+        self._segments = segments
+        self._manifest = manifest
+        self._deleted = frozenset(manifest["deleted"]) | frozenset(self._pending_deleted)
+
+    def maybe_refresh(self) -> None:
+        """Pick up commits made by other processes (at most once per refresh interval)"""
+        self._refresh()
+
+    def __len__(self) -> int:
+        """Number of live chunks, buffered ones included"""
+        with self._lock:
+            return sum(len(segment) for segment in self._segments.values()) + len(self._buffer) - len(self._deleted)
+
+    def add_document(self, url: str, title: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Chunk and index a document, replacing earlier chunks of the same URL
+
+        Args:
+            url: Source URL (the document's identity)
+            title: Page title, indexed with every chunk
+            content: Page text
+            metadata: Extra fields stored with every chunk
+
+        Returns:
+            Number of chunks indexed
+        """
+        chunks = [chunk for chunk in chunk_text(content or "", self.chunk_words) if chunk.strip()]
+        if not chunks:
+            return 0
+
+        with self._lock:
+            self._delete_url(url)
+            title_tokens = tokenize(title or "")
+            provisional = self._buffer.urls.setdefault(url, [])
+            for number, chunk in enumerate(chunks):
+                tokens = title_tokens + tokenize(chunk)
+                document = dict(metadata or {}, url=url, title=title, content=chunk,
+                                chunk=number, chunks=len(chunks), indexed_at=time.time())
+                # Buffered documents get negative ids until commit assigns real ones
+                provisional_id = -(len(self._buffer) + 1)
+                provisional.append(provisional_id)
+                self._buffer.add(provisional_id, Counter(tokens), len(tokens),
+                                 json.dumps(document, ensure_ascii=False).encode("utf-8"))
+
+            if len(self._buffer) >= self.flush_docs or \
+                    time.monotonic() - self._buffer.created >= self.flush_interval:
+                self.commit()
+        return len(chunks)
+
+    def delete_url(self, url: str) -> int:
+        """
+        Remove every chunk of a URL from future results
+
+        Args:
+            url: Source URL
+
+        Returns:
+            Number of chunks removed
+        """
+        with self._lock:
+            return self._delete_url(url)
+
+    def _delete_url(self, url: str) -> int:
+        """Mark the committed and buffered chunks of a URL deleted"""
+        ids = self._manifest["urls"].get(url, []) + self._buffer.urls.get(url, [])
+        removed = [doc_id for doc_id in ids if doc_id not in self._deleted]
+        if removed:
+            self._pending_deleted.update(removed)
+            self._deleted = self._deleted | frozenset(removed)
+        # An empty entry still tells commit to drop the URL from the manifest
+        self._buffer.urls[url] = []
+        return len(removed)
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive lock across processes sharing the index directory"""
+        with open(os.path.join(self.path, _LOCK), "a+") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def commit(self) -> None:
+        """Write buffered documents and deletions as a new segment, then merge if the policy says so"""
+        with self._lock:
+            pending_urls = dict(self._buffer.urls)
+            if not len(self._buffer) and not pending_urls and not self._pending_deleted:
+                return
+
+            with self._write_lock():
+                manifest = self._read_manifest()
+                deleted = set(manifest["deleted"]) | {doc_id for doc_id in self._pending_deleted if doc_id >= 0}
+
+                # URLs touched here supersede whatever any process committed for them
+                for url in pending_urls:
+                    deleted.update(manifest["urls"].pop(url, []))
+
+                keep = [i for i, doc_id in enumerate(self._buffer.doc_ids) if doc_id not in self._pending_deleted]
+                if keep:
+                    start = manifest["next_doc_id"]
+                    assigned = {self._buffer.doc_ids[i]: start + n for n, i in enumerate(keep)}
+                    name = f"seg-{start:012d}.bin"
+                    self._write_buffer(os.path.join(self.path, name), keep, assigned)
+                    manifest["segments"].append({"name": name, "documents": len(keep)})
+                    manifest["next_doc_id"] = start + len(keep)
+                    for url, ids in pending_urls.items():
+                        live = [assigned[doc_id] for doc_id in ids if doc_id in assigned]
+                        if live:
+                            manifest["urls"][url] = live
+
+                manifest["deleted"] = sorted(deleted)
+                removed = self._merge(manifest)
+                self._write_manifest(manifest)
+                for name in removed:
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except OSError:
+                        pass
+
+            self._buffer = _Buffer()
+            self._pending_deleted = set()
+            self._refresh(force=True)
+
+    def _write_buffer(self, path: str, keep: List[int], assigned: Dict[int, int]) -> None:
+        """Write the kept buffered documents as a segment"""
+        remap = np.full(len(self._buffer), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        terms = sorted(self._buffer.terms)
+        counts = np.array([len(self._buffer.terms[term][0]) for term in terms], dtype=np.int64)
+        term_ids = np.repeat(np.arange(len(terms)), counts)
+        positions = remap[np.fromiter((p for term in terms for p in self._buffer.terms[term][0]),
+                                      dtype=np.int64, count=int(counts.sum()))]
+        frequencies = np.fromiter((f for term in terms for f in self._buffer.terms[term][1]),
+                                  dtype=np.int64, count=int(counts.sum()))
+        live = positions >= 0
+        write_segment(path,
+                      np.array([assigned[self._buffer.doc_ids[i]] for i in keep], dtype=np.int64),
+                      np.array([self._buffer.lengths[i] for i in keep], dtype=np.int64),
+                      [self._buffer.documents[i] for i in keep],
+                      *_compact_terms(terms, term_ids[live], positions[live], frequencies[live]))
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        path = os.path.join(self.path, _MANIFEST)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest, separators=(",", ":")))
+        os.replace(tmp_path, path)
+
+    def _tier(self, documents: int) -> int:
+        """Size tier of a segment: segments within a factor of merge_factor share a tier"""
+        return int(math.log(max(documents, 1), self.merge_factor))
+
+    def _merge(self, manifest: Dict[str, Any]) -> List[str]:
+        """
+        Apply the merge policy to a manifest (under the write lock)
+
+        Whenever merge_factor segments share a size tier, the oldest of them
+        are merged into one; a segment with more than a third of its
+        documents deleted is rewritten on its own.
+
+        Returns:
+            Names of the segment files that are no longer referenced
+        """
+        removed = []
+        deleted = frozenset(manifest["deleted"])
+        opened: Dict[str, _Segment] = {}
+
+        def segment(name: str) -> _Segment:
+            if name not in opened:
+                opened[name] = self._segments.get(name) or _Segment(os.path.join(self.path, name))
+            return opened[name]
+
+        try:
+            while True:
+                segments = manifest["segments"]
+                tiers: Dict[int, List[Dict[str, Any]]] = {}
+                for entry in segments:
+                    tiers.setdefault(self._tier(entry["documents"]), []).append(entry)
+                group = next((members[:self.merge_factor] for members in tiers.values()
+                              if len(members) >= self.merge_factor), None)
+                if group is None:
+                    group = next(([entry] for entry in segments
+                                  if (~segment(entry["name"]).live(deleted)).sum() * 3 > entry["documents"]), None)
+                if group is None:
+                    break
+
+                names = {entry["name"] for entry in group}
+                merged = self._merge_group([segment(entry["name"]) for entry in group], deleted)
+                position = min(i for i, entry in enumerate(segments) if entry["name"] in names)
+                remaining = [entry for entry in segments if entry["name"] not in names]
+                if merged is not None:
+                    remaining.insert(position, merged)
+                manifest["segments"] = remaining
+                removed.extend(names)
+
+            # Deletions only need remembering while a segment still holds the document
+            present = set()
+            for entry in manifest["segments"]:
+                ids = segment(entry["name"]).doc_ids
+                present.update(ids[np.isin(ids, list(deleted))].tolist())
+                del ids
+            manifest["deleted"] = sorted(present)
+        finally:
+            for name, opened_segment in opened.items():
+                if name not in self._segments:
+                    opened_segment.close()
+        return removed
+
+    def _merge_group(self, segments: List[_Segment], deleted: frozenset) -> Optional[Dict[str, Any]]:
+        """Write the live documents of several segments as one segment"""
+        doc_ids, lengths, documents = [], [], []
+        remaps = []
+        for segment in segments:
+            live = segment.live(deleted)
+            remap = np.full(len(segment), -1, dtype=np.int64)
+            remap[live] = np.arange(len(doc_ids), len(doc_ids) + int(live.sum()))
+            remaps.append(remap)
+            for position in np.flatnonzero(live):
+                doc_ids.append(int(segment.doc_ids[position]))
+                lengths.append(int(segment.lengths[position]))
+                documents.append(segment.document_bytes(int(position)))
+        if not doc_ids:
+            return None
+
+        vocabulary: Dict[str, int] = {}
+        flat = ([], [], [])
+        for segment, remap in zip(segments, remaps):
+            terms, term_ids, positions, frequencies = segment.all_postings()
+            local_ids = np.array([vocabulary.setdefault(term, len(vocabulary)) for term in terms], dtype=np.int64)
+            positions = remap[positions]
+            live = positions >= 0
+            for part, values in zip(flat, (local_ids[term_ids[live]], positions[live], frequencies[live])):
+                part.append(values)
+
+        # Renumber terms in sorted order and sort postings by term, then position
+        terms = sorted(vocabulary)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[[vocabulary[term] for term in terms]] = np.arange(len(terms))
+        term_ids, positions, frequencies = (np.concatenate(part) for part in flat)
+        term_ids = rank[term_ids]
+        order = np.lexsort((positions, term_ids))
+
+        name = f"seg-{doc_ids[0]:012d}-m{len(doc_ids)}-{os.getpid()}-{time.time_ns()}.bin"
+        write_segment(os.path.join(self.path, name), np.array(doc_ids), np.array(lengths), documents,
+                      *_compact_terms(terms, term_ids[order], positions[order], frequencies[order]))
+        return {"name": name, "documents": len(doc_ids)}
+
+    def search(self, query: str, k: int = 10) -> List[CorpusHit]:
+        """
+        Rank indexed chunks against a query with BM25
+
+        Args:
+            query: Query text
+            k: Number of results
+
+        Returns:
+            Up to k hits by decreasing score. relevance is the score divided by
+            the highest score BM25 can give the query ((k1 + 1) * idf for every
+            query term), and coverage is the share of the query's IDF mass whose
+            terms occur in the chunk; both are 0-1.
+        """
+        self._refresh()
+        query_terms = Counter(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            return self._search(query_terms, k)
+
+    def _search(self, query_terms: Counter, k: int) -> List[CorpusHit]:
+        """Score every segment and the buffer (under the lock, so no segment closes mid-query)"""
+        parts = list(self._segments.values()) + ([self._buffer] if len(self._buffer) else [])
+        deleted = self._deleted
+        documents = sum(len(part) for part in parts)
+        if not documents:
+            return []
+        total_length = sum(int(np.sum(part.lengths)) for part in parts)
+        avg_length = max(total_length / documents, 1.0)
+
+        postings = {term: [part.postings(term) for part in parts] for term in query_terms}
+        idf = {}
+        for term, lists in postings.items():
+            df = sum(len(entry[0]) for entry in lists if entry is not None)
+            idf[term] = math.log(1.0 + (documents - df + 0.5) / (df + 0.5))
+        mass = sum(idf[term] * count for term, count in query_terms.items())
+        if mass <= 0:
+            return []
+        # Term frequency saturates at (k1 + 1), so this is the best possible score
+        upper = (self.k1 + 1.0) * mass
+
+        candidates = []
+        for index, part in enumerate(parts):
+            scores = matched = None
+            lengths = np.asarray(part.lengths, dtype=np.float64)
+            for term, count in query_terms.items():
+                entry = postings[term][index]
+                if entry is None:
+                    continue
+                positions, frequencies = entry
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[positions] / avg_length)
+                if scores is None:
+                    scores, matched = np.zeros(len(part)), np.zeros(len(part))
+                scores[positions] += idf[term] * count * frequencies * (self.k1 + 1.0) / (frequencies + norm)
+                matched[positions] += idf[term] * count
+            if scores is None:
+                continue
+            scores[~part.live(deleted)] = 0.0
+            top = np.flatnonzero(scores > 0)
+            if len(top) > k:
+                top = top[np.argpartition(-scores[top], k - 1)[:k]]
+            candidates.extend((float(scores[p]), index, int(p), float(matched[p])) for p in top)
+
+        hits = []
+        for score, index, position, matched_mass in heapq.nlargest(k, candidates):
+            part = parts[index]
+            hits.append(CorpusHit(int(part.doc_ids[position]), score,
+                                  min(1.0, score / upper), min(1.0, matched_mass / mass),
+                                  part.document(position)))
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the index size
+
+        Returns:
+            Dictionary with chunk, URL, segment, deleted and buffered counts
+        """
+        with self._lock:
+            return {
+                "chunks": len(self),
+                "urls": len(self._manifest["urls"]) + sum(1 for url in self._buffer.urls
+                                                         if url not in self._manifest["urls"]),
+                "segments": len(self._segments),
+                "deleted": len(self._deleted),
+                "buffered": len(self._buffer) - sum(1 for doc_id in self._pending_deleted if doc_id < 0),
+                "path": self.path
+            }
+
+
+# Shared index so every router in the process writes to one buffer
+_default_index: Optional[CorpusIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_corpus_index() -> Optional[CorpusIndex]:
+    """
+    Return the process-wide corpus index, or None if it is disabled
+
+    Buffered documents are committed when the process exits.
+
+    Returns:
+        The shared CorpusIndex instance or None
+    """
+    global _default_index
+
+    load_dotenv()
+    if os.getenv("CORPUS_INDEX_ENABLED", "true").lower() != "true":
+        return None
+
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = CorpusIndex(
+                    os.getenv("CORPUS_INDEX_PATH", "cache/corpus_index"),
+                    chunk_words=int(os.getenv("CORPUS_CHUNK_WORDS", "120")),
+                    flush_docs=int(os.getenv("CORPUS_FLUSH_DOCS", "200")),
+                    flush_interval=float(os.getenv("CORPUS_FLUSH_INTERVAL", "60")),
+                    merge_factor=int(os.getenv("CORPUS_MERGE_FACTOR", "4")))
+                atexit.register(_default_index.commit)
+    return _default_index
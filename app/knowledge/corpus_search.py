@@ -0,0 +1,145 @@
+from typing import Dict, Any, List, Optional, Iterable
+import os
+from dotenv import load_dotenv
+from app.core.intent import intent_flags
+from app.knowledge.corpus_index import CorpusIndex, get_corpus_index
+from app.knowledge.lexicon import get_lexicon
+
+# Intents a page must address (by their keywords) to answer a need, as in the knowledge base
+_COVERED_INTENTS = ("treatment", "diagnosis")
+
+class CorpusSearch:
+    """
+    Searches page contents extracted by earlier requests, kept in a local
+    BM25 CorpusIndex, as a network-free counterpart to DynamicSearch
+    """
+
+    def __init__(self, index: Optional[CorpusIndex] = None):
+        """
+        Initialize the corpus search
+
+        Args:
+            index: Index to search (defaults to the shared corpus index)
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.index = index if index is not None else get_corpus_index()
+        self.min_score = float(os.getenv("CORPUS_MIN_SCORE", "0.35"))
+        self.min_coverage = float(os.getenv("CORPUS_MIN_COVERAGE", "0.85"))
+        self.chunks_per_source = int(os.getenv("CORPUS_CHUNKS_PER_SOURCE", "3"))
+
+    def search(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search indexed chunks, shaped like web search results
+
+        Args:
+            query: The search query
+            max_results: Maximum number of chunks to return
+
+        Returns:
+            List of results with title, url, snippet, score and source
+        """
+        return [{
+            "title": hit.document.get("title", ""),
+            "url": hit.document.get("url", ""),
+            "snippet": hit.document.get("content", "")[:300],
+            "score": hit.relevance,
+            "source": "local_corpus"
+        } for hit in self.index.search(query, k=max_results)]
+
+    def retrieve(self,
+                 query: str,
+                 limit: int = 3,
+                 min_score: Optional[float] = None,
+                 concepts: Iterable[str] = (),
+                 intent: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve indexed pages relevant to a query, shaped like extracted contents
+
+        Chunks are grouped by URL; each page keeps its best-matching chunks in
+        document order and is scored by its best chunk. A chunk must reach
+        min_score and contain terms carrying CORPUS_MIN_COVERAGE of the
+        query's IDF mass, and a page must name every given concept and, for
+        treatment and diagnosis intents, use that intent's keywords.
+
+        Args:
+            query: The search query
+            limit: Maximum number of pages to return
+            min_score: Minimum relevance (0-1) of a page's best chunk
+            concepts: Concept names (lexicon names) the pages must cover
+            intent: Primary query intent
+
+        Returns:
+            List of extracted content dictionaries, best page first
+        """
+        min_score = self.min_score if min_score is None else min_score
+        pages: Dict[str, List[Any]] = {}
+        for hit in self.index.search(query, k=limit * self.chunks_per_source * 2):
+            if hit.relevance < min_score or hit.coverage < self.min_coverage:
+                continue
+            chunks = pages.setdefault(hit.document["url"], [])
+            if len(chunks) < self.chunks_per_source:
+                chunks.append(hit)
+
+        contents = []
+        for url, hits in pages.items():
+            if len(contents) >= limit:
+                break
+            ordered = sorted(hits, key=lambda hit: hit.document.get("chunk", 0))
+            content = {
+                "title": hits[0].document.get("title", ""),
+                "content": "\n\n".join(hit.document["content"] for hit in ordered),
+                "source_url": url,
+                "extraction_success": True,
+                "score": hits[0].relevance,
+                "source": "local_corpus"
+            }
+            if self.covers(content, concepts, intent):
+                contents.append(content)
+        return contents
+
+    @staticmethod
+    def covers(content: Dict[str, Any], concepts: Iterable[str] = (), intent: Optional[str] = None) -> bool:
+        """
+        Check whether a page addresses a need's concepts and intent
+
+        Args:
+            content: Extracted content dictionary
+            concepts: Concept names (lexicon names) the page must name
+            intent: Primary query intent
+
+        Returns:
+            True if every concept is found and, for treatment and diagnosis
+            intents, the page uses one of the intent's keywords
+        """
+        text = f"{content.get('title') or ''}. {content.get('content') or ''}".lower()
+        required = {concept.lower() for concept in concepts}
+        if required:
+            found = get_lexicon().found(text)
+            if not required <= {name.lower() for names in found.values() for name in names}:
+                return False
+        return intent not in _COVERED_INTENTS or intent_flags(text)[intent]
+
+    def ingest(self, extracted_contents: List[Dict[str, Any]]) -> int:
+        """
+        Index successfully extracted pages for later requests
+
+        Args:
+            extracted_contents: Extracted content dictionaries
+
+        Returns:
+            Number of pages indexed
+        """
+        indexed = 0
+        for content in extracted_contents:
+            # Failed or raw-HTML extractions and pages served from the index are not (re)indexed
+            if not content.get("extraction_success") or content.get("extraction_method") == "basic" \
+                    or content.get("source") == "local_corpus":
+                continue
+            url = content.get("source_url")
+            if not url or not content.get("content"):
+                continue
+            if self.index.add_document(url, content.get("title", ""), content["content"]):
+                indexed += 1
+        return indexed
@@ -1,61 +1,137 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterable
+import os
+import json
+import threading
+import numpy as np
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+from app.knowledge.lexicon import get_lexicon
+from app.knowledge.vector_index import VectorIndex
+from app.utils.hashing_vectorizer import HashingVectorizer
+
+DEFAULT_KB_DOCUMENTS = os.path.join(os.path.dirname(__file__), "data", "kb_documents.jsonl")
+
+# Intents with a matching _apply_filters category
+_INTENT_CATEGORIES = ("treatment", "diagnosis")
+
+# Document fields returned with every result
+_RESULT_FIELDS = ("title", "content", "url", "source_type", "publication_date")
+
+# Reserved documentation domains (RFC 2606) used by placeholder documents
+_PLACEHOLDER_DOMAINS = ("example.com", "example.org", "example.net", "example", "test", "invalid", "localhost")
 
 class GastroKnowledgeBase:
     """
     Connects to the curated gastroenterology knowledge base
+    
+    Curated documents are embedded and served from a local VectorIndex
+    persisted under KB_INDEX_PATH. An empty index is seeded from the bundled
+    documents (or KB_SEED_DOCUMENTS); scripts/build_kb_index.py loads larger
+    collections.
     """
     
-    def __init__(self):
-        """Initialize the knowledge base connector"""
-        # In a real implementation, this would connect to a vector database like Pinecone
-        pass
+    def __init__(self,
+                 index_path: Optional[str] = None,
+                 seed_documents: Optional[str] = None,
+                 embedding_dim: Optional[int] = None):
+        """
+        Initialize the knowledge base connector
+        
+        Args:
+            index_path: Directory of the vector index
+            seed_documents: JSONL documents loaded into an empty index
+            embedding_dim: Dimension of the hashed text embeddings
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+        
+        self.index_path = index_path or os.getenv("KB_INDEX_PATH", "cache/kb_index")
+        self.seed_documents = seed_documents or os.getenv("KB_SEED_DOCUMENTS", DEFAULT_KB_DOCUMENTS)
+        self.top_k = int(os.getenv("KB_TOP_K", "3"))
+        self.min_score = float(os.getenv("KB_MIN_SCORE", "0.1"))
+        
+        # Hashed word and character n-grams; needs no model download
+        self.vectorizer = HashingVectorizer(n_features=embedding_dim or int(os.getenv("KB_EMBEDDING_DIM", "1024")))
+        self.index = VectorIndex(self.vectorizer.n_features, self.index_path)
+        
+        # Lexicon concepts named by each document, filled on first use
+        self._concepts: Dict[int, frozenset] = {}
+        
+        if self.index.count == 0 and self.seed_documents and os.path.exists(self.seed_documents):
+            self.add_documents(load_documents(self.seed_documents))
+            self.index.save()
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts for the vector index
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Matrix of shape (len(texts), embedding dimension)
+        """
+        return self.vectorizer.transform(texts)
+    
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> List[int]:
+        """
+        Add documents to the index (call index.save() to persist them)
+        
+        Args:
+            documents: Documents with title, content, url, source_type and publication_date
+            
+        Returns:
+            Labels of the added documents, usable with delete_document
+        """
+        documents = [dict(document) for document in documents]
+        if not documents:
+            return []
+        texts = [f"{document.get('title', '')}. {document.get('content', '')}" for document in documents]
+        return self.index.add(self.embed(texts), documents)
     
-    def query(self, query_text: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
+    def delete_document(self, label: int) -> bool:
+        """
+        Remove a document from future results (call index.save() to persist it)
+        
+        Args:
+            label: Label returned by add_documents
+            
+        Returns:
+            True if a document was removed
+        """
+        return self.index.delete(label)
+    
+    def query(self, query_text: str, filters: Dict[str, Any] = None, top_k: Optional[int] = None) -> Dict[str, Any]:
         """
         Query the knowledge base for relevant information
         
         Args:
             query_text: The query text to search for
             filters: Optional filters to apply to the search
+            top_k: Maximum number of results (defaults to KB_TOP_K)
             
         Returns:
             Dictionary containing search results and metadata
         """
-        # This is a placeholder implementation
-        # In a real system, this would query a vector database
-        
-        # Mock results for demonstration
-        mock_results = [
-            {
-                "title": "GERD Treatment Guidelines",
-                "content": "Gastroesophageal reflux disease (GERD) is typically treated with proton pump inhibitors (PPIs) as first-line therapy. Lifestyle modifications including weight loss, avoiding late meals, and elevating the head of the bed are also recommended.",
-                "url": "https://example.com/gerd-guidelines",
-                "relevance_score": 0.92,
-                "source_type": "clinical_guidelines",
-                "publication_date": "2022-03-15"
-            },
-            {
-                "title": "Inflammatory Bowel Disease: Current Management",
-                "content": "Management of IBD includes anti-inflammatory medications, immunosuppressants, biologics, and in some cases, surgery. Treatment is individualized based on disease severity, location, and patient factors.",
-                "url": "https://example.com/ibd-management",
-                "relevance_score": 0.85,
-                "source_type": "medical_textbook",
-                "publication_date": "2021-11-10"
-            },
-            {
-                "title": "Diagnostic Approach to Chronic Diarrhea",
-                "content": "Chronic diarrhea evaluation should include detailed history, physical examination, basic laboratory tests, and may require endoscopic evaluation with biopsies. Common causes include IBS, IBD, celiac disease, and microscopic colitis.",
-                "url": "https://example.com/chronic-diarrhea",
-                "relevance_score": 0.78,
-                "source_type": "medical_journal",
-                "publication_date": "2023-01-22"
-            }
-        ]
+        top_k = top_k or self.top_k
+        
+        # Over-fetch when filtering so filtered-out hits do not starve the results
+        hits = self.index.query(self.embed([query_text])[0], k=top_k * 4 if filters else top_k)
+        
+        results = []
+        for hit in hits:
+            if hit.score < self.min_score:
+                continue
+            result = {field: hit.metadata.get(field) for field in _RESULT_FIELDS}
+            result["relevance_score"] = round(hit.score, 4)
+            result["kb_id"] = hit.label
+            results.append(result)
         
         # Apply filters if provided
-        filtered_results = mock_results
+        filtered_results = results
         if filters:
-            filtered_results = self._apply_filters(mock_results, filters)
+            filtered_results = self._apply_filters(results, filters)
+        filtered_results = filtered_results[:top_k]
         
         return {
             "query": query_text,
@@ -64,6 +140,58 @@ class GastroKnowledgeBase:
             "filters_applied": filters or {}
         }
     
+    def covering_results(self,
+                         query_text: str,
+                         concepts: Iterable[str] = (),
+                         intent: Optional[str] = None,
+                         top_k: Optional[int] = None,
+                         min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Find documents that can answer a query on their own
+        
+        A result must reach min_score, name every given concept (lexicon
+        names, as the reasoning agent reports them) and, for treatment and
+        diagnosis intents, be a document of that category.
+        
+        Args:
+            query_text: The query text to search for
+            concepts: Concept names the documents must cover
+            intent: Primary query intent
+            top_k: Maximum number of results (defaults to KB_TOP_K)
+            min_score: Minimum cosine similarity
+            
+        Returns:
+            Qualifying results, best first, with the document's "concepts"
+        """
+        filters = {"category": intent} if intent in _INTENT_CATEGORIES else None
+        required = {concept.lower() for concept in concepts}
+        
+        results = []
+        for result in self.query(query_text, filters=filters, top_k=top_k)["results"]:
+            if result["relevance_score"] < min_score:
+                continue
+            covered = self.concepts(result)
+            if required <= covered:
+                results.append(dict(result, concepts=sorted(covered)))
+        return results
+    
+    def concepts(self, result: Dict[str, Any]) -> frozenset:
+        """
+        Lowercased lexicon concept names of a result's document
+        
+        Args:
+            result: Result from query
+            
+        Returns:
+            Set of concept names found in the title and content
+        """
+        label = result["kb_id"]
+        if label not in self._concepts:
+            text = f"{result.get('title') or ''}. {result.get('content') or ''}".lower()
+            found = get_lexicon().found(text)
+            self._concepts[label] = frozenset(name.lower() for names in found.values() for name in names)
+        return self._concepts[label]
+    
     def _apply_filters(self, results: List[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Apply filters to knowledge base results"""
         filtered_results = results
@@ -91,3 +219,59 @@ class GastroKnowledgeBase:
             filtered_results = condition_filtered
         
         return filtered_results
+
+
+def load_documents(path: str) -> List[Dict[str, Any]]:
+    """
+    Read knowledge base documents from a JSONL file
+    
+    Args:
+        path: JSONL file with one document per line
+        
+    Returns:
+        Documents in file order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def has_citable_source(result: Dict[str, Any]) -> bool:
+    """
+    Check whether a result comes from a real, citable source
+    
+    Documents without an http(s) URL, or with a placeholder URL such as the
+    example.com links of the bundled seed documents, cannot be cited in an
+    answer.
+    
+    Args:
+        result: Result from GastroKnowledgeBase.query
+        
+    Returns:
+        True if the result's URL points to a real host
+    """
+    parsed = urlparse(result.get("url") or "")
+    host = (parsed.hostname or "").rstrip(".")
+    if parsed.scheme not in ("http", "https") or not host:
+        return False
+    return not any(host == domain or host.endswith("." + domain) for domain in _PLACEHOLDER_DOMAINS)
+
+
+# Shared instance so every request searches the same loaded index
+_default_knowledge_base: Optional[GastroKnowledgeBase] = None
+_default_knowledge_base_lock = threading.Lock()
+
+
+def get_knowledge_base() -> GastroKnowledgeBase:
+    """
+    Return the process-wide knowledge base, loading its index on first use
+    
+    Returns:
+        The shared GastroKnowledgeBase instance
+    """
+    global _default_knowledge_base
+    
+    if _default_knowledge_base is None:
+        with _default_knowledge_base_lock:
+            if _default_knowledge_base is None:
+                _default_knowledge_base = GastroKnowledgeBase()
+    return _default_knowledge_base
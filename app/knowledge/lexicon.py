@@ -0,0 +1,392 @@
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+import os
+import json
+import gzip
+import time
+import logging
+import threading
+from functools import lru_cache
+from dotenv import load_dotenv
+from app.utils.term_matcher import TermMatcher, MappedTermMatcher
+from app.utils.spelling import SpellingIndex, vocabulary_words
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICON_SOURCE = os.path.join(os.path.dirname(__file__), "data", "gi_lexicon.json")
+DEFAULT_KNOWN_WORDS = os.path.join(os.path.dirname(__file__), "data", "known_words.txt")
+# Words of 5+ letters from Webster's Second International (public domain)
+DEFAULT_DICTIONARY = os.path.join(os.path.dirname(__file__), "data", "english_words.txt.gz")
+
+# Lexicon categories, in the order the ReasoningAgent consults them
+CATEGORIES = ["condition", "procedure", "medication"]
+
+# Surface-form fields of a concept entry, besides its canonical name
+_SURFACE_FIELDS = ("abbreviations", "synonyms", "brands")
+
+# Fields whose words are never offered as spelling corrections: a near-miss
+# of a brand or an abbreviation is far likelier an ordinary word
+_UNCORRECTABLE_FIELDS = ("abbreviations", "brands")
+
+# Bumped when the compiled spelling index changes shape, so stale files are rebuilt
+SPELLING_INDEX_FORMAT = 2
+
+
+class ConceptMatch(NamedTuple):
+    """One occurrence of a lexicon concept in a text"""
+    concept_id: str
+    name: str
+    category: str
+    term: str
+    start: int
+    end: int
+
+
+def _lexicon_terms(data: Dict[str, Any]):
+    """Yield (concept index, term) for every surface form of every concept"""
+    for concept_index, entry in enumerate(data["concepts"]):
+        for term in [entry["name"]] + [t for field in _SURFACE_FIELDS for t in entry.get(field, [])]:
+            yield concept_index, term.lower().strip()
+
+
+@lru_cache(maxsize=4)
+def load_dictionary(path: str) -> frozenset:
+    """
+    Load a word list, gzip-compressed or plain, one word per line
+
+    Args:
+        path: Path of the word list
+
+    Returns:
+        The lowercased words (empty if the file does not exist)
+    """
+    if not path or not os.path.exists(path):
+        return frozenset()
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+def _write_atomic(path: str, blob: bytes) -> None:
+    """Write a file through a temporary path so readers never see it half-written"""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def compile_lexicon(source: str, output: str) -> Dict[str, Any]:
+    """
+    Compile a JSON lexicon into a serialized automaton
+
+    Every surface form (canonical name, abbreviations, synonyms, brand names)
+    becomes a term mapped to its concept. Forms that normalize to an existing
+    term keep their first concept. The file is written to a temporary path and
+    renamed into place, so readers never map a half-written automaton.
+
+    Args:
+        source: Path of the JSON lexicon
+        output: Path of the compiled automaton
+
+    Returns:
+        Summary with the number of concepts and terms
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    concepts = [{"id": entry["id"], "name": entry["name"], "category": entry["category"]}
+                for entry in data["concepts"]]
+    terms: List[str] = []
+    term_concepts: List[int] = []
+    seen = set()
+    for concept_index, key in _lexicon_terms(data):
+        if key and key not in seen:
+            seen.add(key)
+            terms.append(key)
+            term_concepts.append(concept_index)
+
+    metadata = {"version": data.get("version", 1), "concepts": concepts, "term_concepts": term_concepts}
+    blob = TermMatcher(terms).serialize(metadata)
+    _write_atomic(output, blob)
+
+    return {"concepts": len(concepts), "terms": len(terms), "bytes": len(blob)}
+
+
+def spelling_index_path(automaton_path: str) -> str:
+    """
+    Default spelling index path for a compiled automaton
+
+    Args:
+        automaton_path: Path of the compiled automaton
+
+    Returns:
+        The automaton path with a .spelling.json extension
+    """
+    return f"{os.path.splitext(automaton_path)[0]}.spelling.json"
+
+
+def compile_spelling_index(source: str, output: str, known_words: str = DEFAULT_KNOWN_WORDS) -> Dict[str, Any]:
+    """
+    Precompute the symmetric-delete spelling index over the lexicon's words
+
+    Only words of concept names and synonyms are correction targets; words
+    of brands and abbreviations are stored as known words.
+
+    Args:
+        source: Path of the JSON lexicon
+        output: Path of the JSON spelling index
+        known_words: Word list (one per line, "#" comments) that is never corrected
+
+    Returns:
+        Summary with the number of vocabulary words and deletes
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    known = []
+    if known_words and os.path.exists(known_words):
+        with open(known_words, "r", encoding="utf-8") as f:
+            known = [word.lower() for line in f for word in line.split("#", 1)[0].split()]
+
+    # Brands and abbreviations are known, but only names and synonyms are
+    # correction targets
+    targets = [entry["name"] for entry in data["concepts"]]
+    targets += [term for entry in data["concepts"] for term in entry.get("synonyms", [])]
+    uncorrectable = [term for entry in data["concepts"] for field in _UNCORRECTABLE_FIELDS
+                     for term in entry.get(field, [])]
+    known += vocabulary_words(term.lower() for term in uncorrectable)
+
+    index = SpellingIndex.build(vocabulary_words(term.lower().strip() for term in targets), known_words=known)
+    blob = json.dumps(dict(index.to_dict(), format=SPELLING_INDEX_FORMAT), separators=(",", ":")).encode("utf-8")
+    _write_atomic(output, blob)
+
+    return {"words": len(index.words), "deletes": len(index.index), "bytes": len(blob)}
+
+
+class Lexicon:
+    """
+    Medical lexicon of GI conditions, procedures and medications.
+
+    The vocabulary lives in a JSON data file and is served from a compiled
+    automaton that is memory-mapped, so startup and per-query cost do not grow
+    with the vocabulary. The compiled file is normally built ahead of time by
+    scripts/build_lexicon.py; if it is missing or older than the source it is
+    rebuilt on load. File changes are picked up without a restart: at most
+    once per reload interval the modification times are checked and the
+    automaton is swapped atomically.
+
+    A symmetric-delete spelling index over the lexicon's words is compiled
+    and reloaded alongside the automaton, so misspelled concept names can be
+    corrected before matching. Words in the English and medical dictionary
+    are never corrected.
+    """
+
+    def __init__(self,
+                 source: Optional[str] = None,
+                 path: Optional[str] = None,
+                 reload_interval: Optional[float] = None,
+                 spelling_path: Optional[str] = None,
+                 known_words: Optional[str] = None,
+                 dictionary: Optional[str] = None):
+        """
+        Initialize the lexicon
+
+        Args:
+            source: Path of the JSON lexicon
+            path: Path of the compiled automaton
+            reload_interval: Seconds between checks for changed files (0 checks on every lookup)
+            spelling_path: Path of the compiled spelling index (defaults to one next to the automaton)
+            known_words: Path of the word list the spelling corrector never changes
+            dictionary: Path of the dictionary word list (gzip or plain) the corrector never changes
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.source = source or os.getenv("LEXICON_SOURCE", DEFAULT_LEXICON_SOURCE)
+        self.path = path or os.getenv("LEXICON_PATH", "cache/gi_lexicon.automaton")
+        self.spelling_path = spelling_path or os.getenv("LEXICON_SPELLING_PATH") or spelling_index_path(self.path)
+        self.known_words = known_words or os.getenv("LEXICON_KNOWN_WORDS", DEFAULT_KNOWN_WORDS)
+        self.dictionary = dictionary or os.getenv("LEXICON_DICTIONARY", DEFAULT_DICTIONARY)
+        self.reload_interval = reload_interval if reload_interval is not None else float(os.getenv("LEXICON_RELOAD_INTERVAL", "5"))
+        self.scan_cache_size = int(os.getenv("LEXICON_SCAN_CACHE_SIZE", "4096"))
+
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._signature = None
+        self.reloads = 0
+        self._load()
+
+    def _file_signature(self):
+        """Modification times of the source, known-word and compiled files"""
+        def mtime(path: str) -> Optional[int]:
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                return None
+        return mtime(self.source), mtime(self.known_words), mtime(self.path), mtime(self.spelling_path)
+
+    def _load(self) -> None:
+        """Map the compiled automaton and load the spelling index, rebuilding either first if it is stale"""
+        source_mtime, known_mtime, compiled_mtime, spelling_mtime = self._file_signature()
+        if compiled_mtime is None or (source_mtime is not None and source_mtime > compiled_mtime):
+            compile_lexicon(self.source, self.path)
+        if spelling_mtime is None or max(source_mtime or 0, known_mtime or 0) > spelling_mtime:
+            compile_spelling_index(self.source, self.spelling_path, self.known_words)
+
+        matcher = MappedTermMatcher(self.path)
+        concepts = matcher.metadata["concepts"]
+        names = {category: [c["name"] for c in concepts if c["category"] == category] for category in CATEGORIES}
+
+        # Query logs repeat heavily and the pipeline scans each query more
+        # than once, so recent scans are memoized per automaton version
+        scan = lru_cache(maxsize=self.scan_cache_size)(matcher.find)
+
+        with open(self.spelling_path, "r", encoding="utf-8") as f:
+            spelling_data = json.load(f)
+        if spelling_data.get("format") != SPELLING_INDEX_FORMAT:
+            compile_spelling_index(self.source, self.spelling_path, self.known_words)
+            with open(self.spelling_path, "r", encoding="utf-8") as f:
+                spelling_data = json.load(f)
+        spelling = SpellingIndex.from_dict(spelling_data, load_dictionary(self.dictionary))
+
+        # Swap everything at once so concurrent lookups see one consistent version
+        self._state = (matcher, concepts, matcher.metadata["term_concepts"], names, scan, spelling)
+        self._signature = self._file_signature()
+        self._checked_at = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        """Reload if either file changed since the last load, keeping the loaded version if that fails"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            if self._file_signature() != self._signature:
+                try:
+                    self._load()
+                except Exception as e:
+                    # A malformed or half-written file must not fail every
+                    # lookup; keep the previous version and retry next interval
+                    logger.error(f"Lexicon reload failed, serving the previous version: {e}")
+                    return
+                self.reloads += 1
+
+    def find(self, text: str) -> List[ConceptMatch]:
+        """
+        Find every concept mention in a text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches ordered by end position
+        """
+        self._maybe_reload()
+        _, concepts, term_concepts, _, scan, _ = self._state
+
+        matches = []
+        for match in scan(text):
+            concept = concepts[term_concepts[match.term_id]]
+            matches.append(ConceptMatch(concept["id"], concept["name"], concept["category"],
+                                        match.term, match.start, match.end))
+        return matches
+
+    def found(self, text: str) -> Dict[str, List[str]]:
+        """
+        List the canonical names of the concepts in a text, per category
+
+        Synonyms, abbreviations and brand names resolve to their concept, so
+        "Nexium" and "esomeprazole" both yield "esomeprazole". A term inside a
+        longer match is ignored, so "hepatitis B" does not also yield "hepatitis".
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Mapping of each of CATEGORIES to canonical names, each once, in lexicon order
+        """
+        self._maybe_reload()
+        _, concepts, term_concepts, _, scan, _ = self._state
+
+        matches = scan(text)
+        outermost = [
+            match for match in matches
+            if not any(other.start <= match.start and match.end <= other.end
+                       and other.end - other.start > match.end - match.start for other in matches)
+        ]
+
+        found: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+        for i in sorted({term_concepts[match.term_id] for match in outermost}):
+            found.setdefault(concepts[i]["category"], []).append(concepts[i]["name"])
+        return found
+
+    def names(self, category: str) -> List[str]:
+        """
+        List the canonical names of a category
+
+        Args:
+            category: One of CATEGORIES
+
+        Returns:
+            Canonical names in lexicon order
+        """
+        self._maybe_reload()
+        return list(self._state[3].get(category, []))
+
+    def correct(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Correct misspelled lexicon words in a text
+
+        "gastroparisis" becomes "gastroparesis" and "colonscopy" becomes
+        "colonoscopy". Words of fewer than 5 letters and known words (lexicon
+        words and the known-word list) are never changed.
+
+        Args:
+            text: Lowercased text
+
+        Returns:
+            Tuple of (corrected text, list of (original, replacement) pairs)
+        """
+        self._maybe_reload()
+        return self._state[5].correct(text)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the loaded lexicon
+
+        Returns:
+            Dictionary with concept and term counts and the number of reloads
+        """
+        matcher, concepts, _, _, _, spelling = self._state
+        return {
+            "concepts": len(concepts),
+            "terms": len(matcher),
+            "spelling_words": len(spelling.words),
+            "reloads": self.reloads,
+            "path": self.path
+        }
+
+
+# Shared instance so every ReasoningAgent uses the same mapped automaton
+_default_lexicon: Optional[Lexicon] = None
+_default_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> Lexicon:
+    """
+    Return the process-wide lexicon, loading it on first use
+
+    Returns:
+        The shared Lexicon instance
+    """
+    global _default_lexicon
+
+    if _default_lexicon is None:
+        with _default_lexicon_lock:
+            if _default_lexicon is None:
+                _default_lexicon = Lexicon()
+    return _default_lexicon
@@ -1,12 +1,161 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
+import time
+import asyncio
+import threading
 from dotenv import load_dotenv
+from app.utils.rate_limiter import TokenBucket
+from app.utils.ttl_cache import TTLCache
+from app.utils.cassette import get_cassette
 
 try:
     from duckduckgo_search import DDGS
+    from duckduckgo_search.exceptions import RatelimitException
 except ImportError:
     # If the package is not installed, we'll use a mock implementation
     DDGS = None
+    RatelimitException = None
+
+
+class SharedDuckDuckGoClient:
+    """
+    Long-lived DuckDuckGo client shared by every DuckDuckGoSearch instance.
+
+    Calls pass through a token bucket, results are cached, and throttling
+    signals from DuckDuckGo put the client into an exponential cooldown
+    during which cached or placeholder results are served without calling out.
+    """
+    
+    def __init__(self):
+        """Initialize the shared client from environment settings"""
+        # Load environment variables from .env file
+        load_dotenv()
+        
+        self.limiter = TokenBucket(
+            rate=float(os.getenv("DDG_RATE_PER_SECOND", "1.0")),
+            capacity=float(os.getenv("DDG_BURST", "3"))
+        )
+        self.cache = TTLCache(
+            max_entries=int(os.getenv("DDG_CACHE_MAX_ENTRIES", "1024")),
+            ttl=float(os.getenv("DDG_CACHE_TTL", "3600"))
+        )
+        self.acquire_timeout = float(os.getenv("DDG_ACQUIRE_TIMEOUT", "5"))
+        self.base_cooldown = float(os.getenv("DDG_THROTTLE_COOLDOWN", "30"))
+        self.max_cooldown = float(os.getenv("DDG_THROTTLE_MAX_COOLDOWN", "600"))
+        
+        self.cassette = get_cassette()
+        self._ddgs = None
+        self._ddgs_lock = threading.Lock()
+        self._cooldown_until = 0.0
+        self._throttle_count = 0
+    
+    def _client(self):
+        """Create the underlying DDGS session on first use"""
+        if self._ddgs is None:
+            with self._ddgs_lock:
+                if self._ddgs is None:
+                    self._ddgs = DDGS()
+        return self._ddgs
+    
+    def is_throttled(self) -> bool:
+        """Whether the client is cooling down after a throttling signal"""
+        return time.monotonic() < self._cooldown_until
+    
+    def _on_throttled(self) -> None:
+        """Start or extend the cooldown after DuckDuckGo throttled a request"""
+        self._throttle_count += 1
+        cooldown = min(self.base_cooldown * (2 ** (self._throttle_count - 1)), self.max_cooldown)
+        self._cooldown_until = time.monotonic() + cooldown
+        self.limiter.drain()
+        print(f"DuckDuckGo rate limit hit, pausing requests for {cooldown:.0f}s")
+    
+    def text(self, query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run a text search through the limiter and cache
+
+        Args:
+            query: The search query
+            max_results: Maximum number of results to return
+
+        Returns:
+            List of raw DDG result dictionaries, or None if the search could not be made
+        """
+        key = (query.strip().lower(), max_results)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # While throttled, prefer stale results over another rejected request
+        if self.is_throttled() or not self.limiter.acquire(timeout=self.acquire_timeout):
+            return self.cache.get(key, allow_stale=True)
+        
+        return self._fetch(query, max_results, key)
+    
+    async def atext(self, query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Async variant of text that waits for rate-limit tokens on the event loop
+
+        Args:
+            query: The search query
+            max_results: Maximum number of results to return
+
+        Returns:
+            List of raw DDG result dictionaries, or None if the search could not be made
+        """
+        key = (query.strip().lower(), max_results)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if self.is_throttled():
+            return self.cache.get(key, allow_stale=True)
+        
+        try:
+            await asyncio.wait_for(self.limiter.acquire_async(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            return self.cache.get(key, allow_stale=True)
+        
+        return await asyncio.to_thread(self._fetch, query, max_results, key)
+    
+    def _fetch(self, query: str, max_results: int, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Call DuckDuckGo once a token has been acquired and cache the results"""
+        try:
+            results = self.cassette.call(
+                "duckduckgo",
+                {"query": query, "max_results": max_results},
+                lambda: list(self._client().text(query, max_results=max_results) or [])
+            )
+        except Exception as e:
+            if RatelimitException is not None and isinstance(e, RatelimitException):
+                self._on_throttled()
+                return self.cache.get(key, allow_stale=True)
+            raise
+        
+        self._throttle_count = 0
+        self.cache.set(key, results)
+        return results
+
+
+# Shared client so every request reuses one session, limiter and cache
+_shared_client: Optional[SharedDuckDuckGoClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> SharedDuckDuckGoClient:
+    """
+    Return the process-wide DuckDuckGo client
+
+    Returns:
+        The shared SharedDuckDuckGoClient instance
+    """
+    global _shared_client
+    
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = SharedDuckDuckGoClient()
+    return _shared_client
+
 
 class DuckDuckGoSearch:
     """
@@ -20,6 +169,7 @@ class DuckDuckGoSearch:
         
         # Check if the duckduckgo-search package is installed
         self.ddgs_available = DDGS is not None
+        self.client = get_shared_client() if self.ddgs_available else None
     
     def search(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """
@@ -37,21 +187,12 @@ class DuckDuckGoSearch:
             return self._get_placeholder_results(query, max_results)
         
         try:
-            # Initialize the DDGS client
-            ddgs = DDGS()
-            
-            # Perform the search
-            results = []
-            for r in ddgs.text(query, max_results=max_results):
-                result = {
-                    "title": r.get("title", ""),
-                    "url": r.get("href", ""),
-                    "snippet": r.get("body", ""),
-                    "source": "DuckDuckGo"
-                }
-                results.append(result)
+            raw_results = self.client.text(query, max_results)
+            if raw_results is None:
+                print("DuckDuckGo search throttled, using placeholder results")
+                return self._get_placeholder_results(query, max_results)
             
-            return results
+            return [self._format_result(r) for r in raw_results]
             
         except Exception as e:
             # Log the error (in a production system, use proper logging)
@@ -60,6 +201,42 @@ class DuckDuckGoSearch:
             # Return placeholder results in case of error
             return self._get_placeholder_results(query, max_results)
     
+    async def asearch(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Async variant of search that waits for rate-limit tokens without blocking the event loop
+        
+        Args:
+            query: The search query
+            max_results: Maximum number of results to return
+            
+        Returns:
+            List of search results
+        """
+        if not self.ddgs_available:
+            return self._get_placeholder_results(query, max_results)
+        
+        try:
+            raw_results = await self.client.atext(query, max_results)
+            if raw_results is None:
+                print("DuckDuckGo search throttled, using placeholder results")
+                return self._get_placeholder_results(query, max_results)
+            
+            return [self._format_result(r) for r in raw_results]
+            
+        except Exception as e:
+            print(f"Error in DuckDuckGo search: {str(e)}")
+            return self._get_placeholder_results(query, max_results)
+    
+    @staticmethod
+    def _format_result(r: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw DDG result into the common result format"""
+        return {
+            "title": r.get("title", ""),
+            "url": r.get("href", ""),
+            "snippet": r.get("body", ""),
+            "source": "DuckDuckGo"
+        }
+    
     def _get_placeholder_results(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Get placeholder results when the actual search fails"""
         # Create dynamic placeholder results based on the query
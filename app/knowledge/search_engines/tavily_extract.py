@@ -1,8 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import os
 import requests
 import json
 from dotenv import load_dotenv
+from app.utils.cassette import get_cassette
 
 class TavilyExtract:
     """
@@ -18,7 +19,12 @@ class TavilyExtract:
         if not self.api_key:
             raise ValueError("TAVILY_API_KEY environment variable is not set")
         # We will use the main Tavily search endpoint with specific parameters for content
-        self.base_url = "https://api.tavily.com/search"
+        # The API base can be pointed at a local stand-in (see app/utils/provider_stub.py)
+        api_base = os.getenv("TAVILY_API_BASE", "https://api.tavily.com").rstrip("/")
+        self.base_url = os.getenv("TAVILY_EXTRACT_URL", f"{api_base}/search")
+        
+        # Record/replay layer for outbound calls (pass-through unless CASSETTE_MODE is set)
+        self.cassette = get_cassette()
     
     def extract(self, url: str) -> Dict[str, Any]:
         """
@@ -60,8 +66,10 @@ class TavilyExtract:
             print(f"Request payload: {json.dumps(debug_payload)}")
             
             # Make the API request
-            response = requests.post(
+            response = self.cassette.http(
+                "post",
                 self.base_url,
+                provider=True,
                 headers=headers,
                 json=payload
             )
@@ -155,7 +163,7 @@ class TavilyExtract:
         
         try:
             # Make a simple GET request to the URL
-            response = requests.get(url, timeout=10)
+            response = self.cassette.http("get", url, timeout=10)
             
             # Check if request was successful
             if response.status_code == 200:
@@ -180,18 +188,21 @@ class TavilyExtract:
                 }
             else:
                 print(f"Alternative extraction failed with status code: {response.status_code}")
-                return self._get_fallback_extract(url)
+                return self._get_fallback_extract(url, url_error=f"HTTP {response.status_code}")
                 
         except Exception as e:
             print(f"Error in alternative extraction: {str(e)}")
-            return self._get_fallback_extract(url)
+            return self._get_fallback_extract(url, url_error=str(e))
     
-    def _get_fallback_extract(self, url: str) -> Dict[str, Any]:
+    def _get_fallback_extract(self, url: str, url_error: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate fallback extraction results when all extraction methods fail
         
         Args:
             url: The URL that was attempted to be extracted
+            url_error: Why the URL itself could not be fetched (e.g. "HTTP 404"
+                or a timeout), or None when the failure was the provider's
+                (bad or expired API key, validation error, outage)
             
         Returns:
             Dictionary with fallback content
@@ -201,7 +212,7 @@ class TavilyExtract:
         # Try to fetch basic information without the Tavily API
         try:
             # Make a simple HEAD request to check if the URL is accessible
-            head_response = requests.head(url, timeout=5)
+            head_response = self.cassette.http("head", url, timeout=5)
             is_accessible = head_response.status_code < 400
         except:
             is_accessible = False
@@ -233,7 +244,8 @@ class TavilyExtract:
             "published_date": "",
             "source_url": url,
             "extraction_success": False,
-            "fallback": True
+            "fallback": True,
+            "url_error": url_error
         }
         
     def check_api_status(self) -> Dict[str, Any]:
@@ -257,8 +269,10 @@ class TavilyExtract:
                 "api_key": self.api_key
             }
             
-            response = requests.post(
+            response = self.cassette.http(
+                "post",
                 self.base_url,
+                provider=True,
                 headers=headers,
                 json=payload
             )
@@ -3,6 +3,7 @@ import os
 import requests
 import json
 from dotenv import load_dotenv
+from app.utils.cassette import get_cassette
 
 class TavilySearch:
     """
@@ -17,7 +18,12 @@ class TavilySearch:
         self.api_key = os.getenv("TAVILY_API_KEY")
         if not self.api_key:
             raise ValueError("TAVILY_API_KEY environment variable is not set")
-        self.base_url = "https://api.tavily.com/search"
+        # The API base can be pointed at a local stand-in (see app/utils/provider_stub.py)
+        api_base = os.getenv("TAVILY_API_BASE", "https://api.tavily.com").rstrip("/")
+        self.base_url = os.getenv("TAVILY_SEARCH_URL", f"{api_base}/search")
+        
+        # Record/replay layer for outbound calls (pass-through unless CASSETTE_MODE is set)
+        self.cassette = get_cassette()
     
     def search(self, query: str, search_depth: str = "basic", filter_medical: bool = False) -> List[Dict[str, Any]]:
         """
@@ -76,8 +82,10 @@ class TavilySearch:
             print(f"Using Tavily API key: {api_key_preview}")
             
             # Make the API request
-            response = requests.post(
+            response = self.cassette.http(
+                "post",
                 self.base_url,
+                provider=True,
                 headers=headers,
                 json=payload
             )
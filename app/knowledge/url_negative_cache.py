@@ -0,0 +1,193 @@
+from typing import Dict, Any, Optional
+import os
+import math
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit
+from dotenv import load_dotenv
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter used as a cheap pre-check before the exact lookup
+    """
+
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
+        """
+        Initialize the Bloom filter
+
+        Args:
+            capacity: Expected number of distinct items
+            error_rate: Target false positive rate at full capacity
+        """
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        """Derive bit positions using double hashing over a single digest"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        """Add an item to the filter"""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def clear(self) -> None:
+        """Reset every bit in the filter"""
+        self.bits = bytearray(len(self.bits))
+
+
+class URLNegativeCache:
+    """
+    Remembers URLs whose extraction failed so they can be skipped for a while.
+
+    Each consecutive failure doubles the time the URL stays blocked, up to a
+    maximum TTL. A Bloom filter answers the common "never failed" case without
+    touching the entry table.
+    """
+
+    def __init__(self,
+                 base_ttl: Optional[float] = None,
+                 max_ttl: Optional[float] = None,
+                 capacity: Optional[int] = None):
+        """
+        Initialize the negative cache
+
+        Args:
+            base_ttl: Seconds a URL is blocked after its first failure
+            max_ttl: Upper bound on the blocking period
+            capacity: Expected number of distinct failing URLs
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.base_ttl = base_ttl if base_ttl is not None else float(os.getenv("URL_NEGATIVE_CACHE_BASE_TTL", "300"))
+        self.max_ttl = max_ttl if max_ttl is not None else float(os.getenv("URL_NEGATIVE_CACHE_MAX_TTL", "86400"))
+        self.capacity = capacity if capacity is not None else int(os.getenv("URL_NEGATIVE_CACHE_CAPACITY", "10000"))
+
+        self._bloom = BloomFilter(self.capacity)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(url: str) -> str:
+        """Normalize a URL so trivial variations share one entry"""
+        # Scheme and host are case-insensitive; the path and query are not
+        parts = urlsplit(url.strip())
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+    def is_blocked(self, url: str) -> bool:
+        """
+        Check whether a URL is currently known to be bad
+
+        Args:
+            url: The URL to check
+
+        Returns:
+            True if the URL failed recently and its backoff has not expired
+        """
+        key = self._normalize(url)
+        if key not in self._bloom:
+            return False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return False
+            return entry["expires_at"] > time.time()
+
+    def record_failure(self, url: str, reason: str = "") -> float:
+        """
+        Record a failed extraction and extend the URL's backoff
+
+        Args:
+            url: The URL that failed
+            reason: Short description of the failure
+
+        Returns:
+            Number of seconds the URL is now blocked for
+        """
+        key = self._normalize(url)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key, {"failures": 0})
+            entry["failures"] += 1
+            ttl = min(self.base_ttl * (2 ** (entry["failures"] - 1)), self.max_ttl)
+            entry["expires_at"] = now + ttl
+            entry["reason"] = reason
+            self._entries[key] = entry
+            self._bloom.add(key)
+
+            # Drop expired entries once the table outgrows its expected size
+            if len(self._entries) > self.capacity:
+                self._evict_expired(now)
+
+        return ttl
+
+    def record_success(self, url: str) -> None:
+        """
+        Forget any failure history for a URL that extracted successfully
+
+        Args:
+            url: The URL that succeeded
+        """
+        key = self._normalize(url)
+        if key not in self._bloom:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _evict_expired(self, now: float) -> None:
+        """Remove expired entries and rebuild the Bloom filter from the survivors"""
+        self._entries = {k: v for k, v in self._entries.items() if v["expires_at"] > now}
+        self._bloom.clear()
+        for key in self._entries:
+            self._bloom.add(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the current state of the cache
+
+        Returns:
+            Dictionary with entry counts
+        """
+        now = time.time()
+        with self._lock:
+            blocked = sum(1 for v in self._entries.values() if v["expires_at"] > now)
+            return {
+                "tracked_urls": len(self._entries),
+                "blocked_urls": blocked
+            }
+
+
+# Shared instance so failures are remembered across requests in one process
+_default_cache: Optional[URLNegativeCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_negative_cache() -> URLNegativeCache:
+    """
+    Return the process-wide URL negative cache
+
+    Returns:
+        The shared URLNegativeCache instance
+    """
+    global _default_cache
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = URLNegativeCache()
+    return _default_cache
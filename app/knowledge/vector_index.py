@@ -0,0 +1,349 @@
+from typing import Dict, List, Any, Optional, Callable, NamedTuple
+import os
+import json
+import mmap
+import logging
+import threading
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    # Fall back to exact NumPy search if hnswlib is not installed
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# Files of a saved index directory
+_MANIFEST = "manifest.json"
+_VECTORS = "vectors.npy"
+_METADATA = "metadata.jsonl"
+_OFFSETS = "offsets.npy"
+_GRAPH = "hnsw.bin"
+
+_FORMAT_VERSION = 1
+
+
+class VectorHit(NamedTuple):
+    """One nearest-neighbour result"""
+    label: int
+    score: float
+    metadata: Dict[str, Any]
+
+
+def _replace_atomic(path: str, write: Callable[[str], None]) -> None:
+    """Write a file through a temporary path so readers never see it half-written"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    """Write an .npy file at exactly path (np.save would append the extension)"""
+    with open(path, "wb") as f:
+        np.save(f, array)
+
+
+def _save_bytes(path: str, blob: bytes) -> None:
+    """Write bytes to a file"""
+    with open(path, "wb") as f:
+        f.write(blob)
+
+
+class VectorIndex:
+    """
+    Local approximate nearest-neighbour index with metadata, persisted on disk.
+
+    Vectors are L2-normalized and searched by cosine similarity with an HNSW
+    graph (hnswlib), or exactly with NumPy when hnswlib is not installed.
+    Items get consecutive integer labels. Deleting an item only marks it, so
+    labels stay stable and the item is skipped by every later query.
+
+    A saved index is a directory holding the vectors (.npy), the metadata
+    (JSON lines plus an offset table), the HNSW graph and a manifest. On load
+    the vectors, offsets and metadata are memory-mapped, so only the items a
+    query returns are read; the HNSW graph is read whole by hnswlib. Items
+    added after loading stay in memory until save().
+    """
+
+    def __init__(self,
+                 dim: int,
+                 path: Optional[str] = None,
+                 M: int = 16,
+                 ef_construction: int = 200,
+                 ef_search: int = 64,
+                 use_hnsw: Optional[bool] = None):
+        """
+        Initialize the index, loading it from path if it was saved there
+
+        Args:
+            dim: Vector dimension
+            path: Directory the index is saved to and loaded from
+            M: HNSW links per node
+            ef_construction: HNSW candidate list size while inserting
+            ef_search: HNSW candidate list size while querying (raised to k if smaller)
+            use_hnsw: Force the HNSW graph on or off (defaults to whether hnswlib is installed)
+        """
+        self.dim = dim
+        self.path = path
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.use_hnsw = (hnswlib is not None) if use_hnsw is None else use_hnsw
+        if self.use_hnsw and hnswlib is None:
+            logger.error("hnswlib package not found. Install with: pip install hnswlib")
+            raise ImportError("hnswlib")
+
+        self._lock = threading.RLock()
+        self._saved_vectors = np.zeros((0, dim), dtype=np.float32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._metadata_map: Optional[mmap.mmap] = None
+        self._pending_vectors: List[np.ndarray] = []
+        self._pending_metadata: List[Dict[str, Any]] = []
+        self._all_vectors: Optional[np.ndarray] = None
+        self.deleted = set()
+        self._graph = None
+
+        if path and os.path.exists(os.path.join(path, _MANIFEST)):
+            self._load()
+        elif self.use_hnsw:
+            self._graph = self._new_graph(1024)
+
+    def __len__(self) -> int:
+        """Number of live (not deleted) items"""
+        return self.count - len(self.deleted)
+
+    @property
+    def count(self) -> int:
+        """Number of labels handed out, deleted items included"""
+        return len(self._saved_vectors) + len(self._pending_metadata)
+
+    def _new_graph(self, max_elements: int):
+        """Create an empty HNSW graph over normalized vectors"""
+        graph = hnswlib.Index(space="ip", dim=self.dim)
+        graph.init_index(max_elements=max(max_elements, 1), ef_construction=self.ef_construction, M=self.M)
+        return graph
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        """Validate the shape and scale rows to unit length"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def add(self, vectors: np.ndarray, metadata: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert items
+
+        Args:
+            vectors: Matrix of shape (n, dim)
+            metadata: JSON-serializable metadata of each item
+
+        Returns:
+            Labels given to the items
+        """
+        vectors = self._normalize(vectors)
+        if len(vectors) != len(metadata):
+            raise ValueError("Every vector needs one metadata entry")
+
+        with self._lock:
+            labels = list(range(self.count, self.count + len(vectors)))
+            if self._graph is not None and len(vectors):
+                needed = self.count + len(vectors)
+                if needed > self._graph.get_max_elements():
+                    self._graph.resize_index(max(needed, 2 * self._graph.get_max_elements()))
+                self._graph.add_items(vectors, labels)
+
+            self._pending_vectors.append(vectors)
+            self._pending_metadata.extend(metadata)
+            self._all_vectors = None
+            return labels
+
+    def delete(self, label: int) -> bool:
+        """
+        Mark an item as deleted
+
+        Args:
+            label: Label returned by add
+
+        Returns:
+            True if a live item was deleted
+        """
+        with self._lock:
+            if not 0 <= label < self.count or label in self.deleted:
+                return False
+            if self._graph is not None:
+                self._graph.mark_deleted(label)
+            self.deleted.add(label)
+            return True
+
+    def metadata(self, label: int) -> Dict[str, Any]:
+        """
+        Read the metadata of an item
+
+        Args:
+            label: Item label
+
+        Returns:
+            The metadata stored with the item
+        """
+        saved = len(self._saved_vectors)
+        if label >= saved:
+            return self._pending_metadata[label - saved]
+        start, end = int(self._offsets[label]), int(self._offsets[label + 1])
+        return json.loads(self._metadata_map[start:end])
+
+    def _vectors(self) -> np.ndarray:
+        """Every stored vector, saved and pending, as one matrix"""
+        if self._all_vectors is None:
+            if self._pending_vectors:
+                self._all_vectors = np.vstack([self._saved_vectors] + self._pending_vectors)
+            else:
+                self._all_vectors = self._saved_vectors
+        return self._all_vectors
+
+    def query(self,
+              vector: np.ndarray,
+              k: int = 5,
+              filter: Optional[Callable[[int], bool]] = None) -> List[VectorHit]:
+        """
+        Find the items most similar to a vector
+
+        Args:
+            vector: Query vector of shape (dim,)
+            k: Number of results
+            filter: Optional predicate on labels; items it rejects are skipped
+
+        Returns:
+            Up to k hits ordered by decreasing cosine similarity
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            k = min(k, len(self))
+            if k <= 0:
+                return []
+
+            if self._graph is not None:
+                self._graph.set_ef(max(self.ef_search, k))
+                try:
+                    labels, distances = self._graph.knn_query(query, k=k, filter=filter)
+                    pairs = zip(labels[0].tolist(), (1.0 - distances[0]).tolist())
+                    return [VectorHit(label, score, self.metadata(label)) for label, score in pairs]
+                except RuntimeError:
+                    # A selective filter can leave fewer than k reachable
+                    # items; answer those queries exactly instead
+                    pass
+
+            scores = self._vectors() @ query[0]
+            allowed = np.ones(len(scores), dtype=bool)
+            allowed[list(self.deleted)] = False
+            if filter is not None:
+                allowed &= np.fromiter((filter(label) for label in range(len(scores))), dtype=bool, count=len(scores))
+            candidates = np.flatnonzero(allowed)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [VectorHit(int(label), float(scores[label]), self.metadata(int(label))) for label in candidates]
+
+    def save(self) -> None:
+        """
+        Persist the index to its directory
+
+        Pending items are appended to the metadata file; the vectors, offsets,
+        graph and finally the manifest are replaced atomically, so a reader
+        always sees a complete index.
+        """
+        if not self.path:
+            raise ValueError("VectorIndex has no path to save to")
+
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            vectors = self._vectors()
+
+            metadata_path = os.path.join(self.path, _METADATA)
+            offsets = [int(self._offsets[-1])]
+            with open(metadata_path, "ab") as f:
+                # Skip bytes left behind by an interrupted save
+                f.truncate(offsets[0])
+                for item in self._pending_metadata:
+                    f.write(json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n")
+                    offsets.append(f.tell())
+            all_offsets = np.concatenate([self._offsets[:-1], np.array(offsets, dtype=np.int64)])
+
+            _replace_atomic(os.path.join(self.path, _VECTORS), lambda tmp: _save_array(tmp, vectors))
+            _replace_atomic(os.path.join(self.path, _OFFSETS), lambda tmp: _save_array(tmp, all_offsets))
+            if self._graph is not None:
+                _replace_atomic(os.path.join(self.path, _GRAPH), self._graph.save_index)
+
+            manifest = {
+                "version": _FORMAT_VERSION,
+                "dim": self.dim,
+                "count": len(vectors),
+                "deleted": sorted(self.deleted),
+                "M": self.M,
+                "ef_construction": self.ef_construction
+            }
+            _replace_atomic(os.path.join(self.path, _MANIFEST),
+                            lambda tmp: _save_bytes(tmp, json.dumps(manifest).encode("utf-8")))
+
+            self._load()
+
+    def _load(self) -> None:
+        """Map a saved index, rebuilding the HNSW graph if it is missing or out of date"""
+        with open(os.path.join(self.path, _MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["dim"] != self.dim:
+            raise ValueError(f"Index at {self.path} has dimension {manifest['dim']}, expected {self.dim}")
+
+        count = manifest["count"]
+        self._saved_vectors = np.load(os.path.join(self.path, _VECTORS), mmap_mode="r")[:count]
+        self._offsets = np.load(os.path.join(self.path, _OFFSETS), mmap_mode="r")[:count + 1]
+
+        if self._metadata_map is not None:
+            self._metadata_map.close()
+        self._metadata_map = None
+        if self._offsets[-1] > 0:
+            with open(os.path.join(self.path, _METADATA), "rb") as f:
+                self._metadata_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._pending_vectors = []
+        self._pending_metadata = []
+        self._all_vectors = None
+        self.deleted = set(manifest["deleted"])
+        self.M = manifest.get("M", self.M)
+        self.ef_construction = manifest.get("ef_construction", self.ef_construction)
+
+        if not self.use_hnsw:
+            return
+        graph_path = os.path.join(self.path, _GRAPH)
+        self._graph = None
+        if os.path.exists(graph_path):
+            graph = hnswlib.Index(space="ip", dim=self.dim)
+            graph.load_index(graph_path, max_elements=max(count, 1))
+            if graph.get_current_count() == count:
+                self._graph = graph
+        if self._graph is None:
+            logger.info(f"Rebuilding HNSW graph for {count} vectors in {self.path}")
+            self._graph = self._new_graph(count)
+            if count:
+                self._graph.add_items(self._saved_vectors, np.arange(count))
+            for label in self.deleted:
+                self._graph.mark_deleted(label)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the index size and backend
+
+        Returns:
+            Dictionary with item, deleted and pending counts, backend and path
+        """
+        return {
+            "items": len(self),
+            "deleted": len(self.deleted),
+            "pending": len(self._pending_metadata),
+            "backend": "hnsw" if self._graph is not None else "exact",
+            "path": self.path
+        }
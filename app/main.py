@@ -7,11 +7,13 @@ import logging
 
 from app.core.query_processor import QueryProcessor
 from app.core.reasoning_agent import ReasoningAgent
-from app.core.knowledge_router import KnowledgeRouter
+from app.core.knowledge_router import KnowledgeRouter, tier_counts
 from app.output.answer_generator import AnswerGenerator
 from app.output.source_compiler import SourceCompiler
 from app.output.quality_assurance import QualityAssurance
 from app.output.llm_summarizer import LLMSummarizer
+from app.output.token_usage import get_usage_tracker, request_usage
+from datetime import date
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +36,7 @@ class Response(BaseModel):
     answer: str
     sources: List[Source]
     confidence_score: float
+    usage: Optional[Dict[str, Any]] = None
 
 @app.get("/")
 async def root():
@@ -88,6 +91,9 @@ async def process_query(query: Query):
         # The knowledge_router now handles the entire pipeline internally
         knowledge_results = knowledge_router.retrieve(information_needs)
         logger.info(f"Retrieved knowledge for {len(knowledge_results)} information needs")
+        logger.info(f"Answered by: {[need_result.get('answered_by') for need_result in knowledge_results.values()]}")
+        usage = request_usage(knowledge_results)
+        logger.info(f"LLM token usage: prompt={usage['prompt_tokens']} completion={usage['completion_tokens']} cached={usage['cached_tokens']}")
         
         # Step 4: Compile sources from the knowledge results
         sources = []
@@ -124,7 +130,8 @@ async def process_query(query: Query):
         response = {
             "answer": answer,
             "sources": sources,
-            "confidence_score": confidence_score
+            "confidence_score": confidence_score,
+            "usage": usage
         }
         
         logger.info(f"Successfully processed query with confidence score: {confidence_score}")
@@ -149,9 +156,34 @@ async def direct_query(query: Query):
         
         return {
             "query": query.text,
-            "result": result
+            "result": result,
+            "usage": request_usage({"need_0": result})
         }
         
     except Exception as e:
         logger.error(f"Error processing direct query: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
+
+@app.get("/api/usage", response_model=Dict[str, Any])
+async def token_usage(day: Optional[str] = None):
+    """
+    Report provider-reported LLM token usage for a day (default: today, UTC),
+    broken down by model and pipeline stage
+    """
+    try:
+        requested_day = date.fromisoformat(day) if day else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid day: {day}. Use YYYY-MM-DD")
+    
+    tracker = get_usage_tracker()
+    report = tracker.daily(requested_day)
+    report["days_available"] = tracker.days()
+    return report
+
+@app.get("/api/routing", response_model=Dict[str, int])
+async def routing_tiers():
+    """
+    Report how many information needs each retrieval tier (knowledge_base,
+    local_corpus or web) has answered since the server started
+    """
+    return tier_counts()
@@ -0,0 +1,188 @@
+from typing import Dict, List, Any, Optional
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+
+class CompletionCache:
+    """
+    Disk-backed cache of LLM completions.
+
+    Entries are keyed on the service, model, sampling parameters and a hash of
+    the prompt messages, stored in SQLite, expired after a TTL and evicted
+    least-recently-used once the cache outgrows its entry limit.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """
+        Initialize the completion cache
+
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            max_entries: Maximum number of cached completions
+            ttl: Seconds a completion stays valid
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.path = path or os.getenv("LLM_CACHE_PATH", "cache/llm_completions.sqlite3")
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed_at)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(service: str,
+                 model: str,
+                 temperature: float,
+                 max_tokens: int,
+                 messages: List[Dict[str, Any]]) -> str:
+        """
+        Build the cache key for a completion request
+
+        Args:
+            service: LLM service name
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum completion tokens
+            messages: Chat messages sent to the model
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        prompt_hash = hashlib.sha256(
+            json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        material = f"{service}|{model}|{temperature}|{max_tokens}|{prompt_hash}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached completion
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached value, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a completion, evicting the least recently used entries if needed
+
+        Args:
+            key: Cache key from make_key
+            value: JSON-serializable completion data
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self.writes += 1
+
+            count = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached completion"""
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache metrics
+
+        Returns:
+            Dictionary with entry count, hits, misses, writes, evictions and hit rate
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+# Shared cache so every summarizer in the process uses one connection
+_default_cache: Optional[CompletionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """
+    Return the process-wide completion cache, or None if caching is disabled
+
+    Returns:
+        The shared CompletionCache instance or None
+    """
+    global _default_cache
+
+    load_dotenv()
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = CompletionCache()
+    return _default_cache
@@ -0,0 +1,228 @@
+from typing import Dict, List, Any, Optional
+import os
+import hashlib
+import logging
+import threading
+from dotenv import load_dotenv
+from app.utils.ttl_cache import TTLCache
+
+try:
+    import tiktoken
+except ImportError:
+    # Fall back to a character-based estimate if tiktoken is not installed
+    tiktoken = None
+
+# Tokens available for source material per model. These sit well below each
+# model's context window to leave room for instructions and the response and
+# to keep prompt processing time predictable.
+MODEL_CONTEXT_BUDGETS = {
+    "gpt-3.5-turbo": 6000,
+    "gpt-4o-mini": 12000,
+    "gpt-4o": 12000,
+    "gpt-4-turbo": 12000,
+    "llama3-70b-8192": 5000,
+    "llama3-8b-8192": 5000,
+    "llama-3.1-8b-instant": 12000,
+    "llama-3.3-70b-versatile": 12000
+}
+DEFAULT_CONTEXT_BUDGET = 4000
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Encodings are expensive to load, so share them across builders
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+# Token counts keyed on (encoding, content hash)
+_token_counts = TTLCache(max_entries=8192, ttl=float("inf"))
+
+
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for a model, or None if unavailable"""
+    if tiktoken is None:
+        return None
+
+    with _encodings_lock:
+        if model in _encodings:
+            return _encodings[model]
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                # Non-OpenAI models (e.g. Llama on Groq) are close enough to cl100k
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # The BPE files are downloaded on first use; remember the failure
+            logging.getLogger(__name__).warning(f"tiktoken encoding unavailable, estimating tokens: {str(e)}")
+            encoding = None
+        _encodings[model] = encoding
+        return encoding
+
+
+class ContextBuilder:
+    """
+    Builds the source context for summarization within a per-model token budget.
+
+    The budget is split across sources in proportion to their relevance score.
+    Sources that need less than their share release the remainder to the
+    others, so short sources are kept whole and long ones are trimmed.
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        """
+        Initialize the context builder
+
+        Args:
+            budget: Fixed token budget for all models (overrides the per-model table)
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        env_budget = os.getenv("LLM_CONTEXT_TOKEN_BUDGET")
+        self.budget_override = budget if budget is not None else (int(env_budget) if env_budget else None)
+
+    def budget_for(self, model: str) -> int:
+        """
+        Get the source-context token budget for a model
+
+        Args:
+            model: Model name
+
+        Returns:
+            Number of tokens available for source material
+        """
+        if self.budget_override is not None:
+            return self.budget_override
+        return MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET)
+
+    def count_tokens(self, text: str, model: str) -> int:
+        """
+        Count tokens in text, caching the result per content hash
+
+        Args:
+            text: Text to count
+            model: Model whose tokenizer should be used
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+
+        encoding = _get_encoding(model)
+        encoding_name = encoding.name if encoding is not None else "estimate"
+        key = (encoding_name, hashlib.sha1(text.encode("utf-8")).hexdigest())
+
+        count = _token_counts.get(key)
+        if count is None:
+            if encoding is not None:
+                count = len(encoding.encode(text, disallowed_special=()))
+            else:
+                count = (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+            _token_counts.set(key, count)
+        return count
+
+    def truncate(self, text: str, max_tokens: int, model: str) -> str:
+        """
+        Cut text down to at most max_tokens tokens
+
+        Args:
+            text: Text to truncate
+            max_tokens: Token limit
+            model: Model whose tokenizer should be used
+
+        Returns:
+            The truncated text
+        """
+        if max_tokens <= 0:
+            return ""
+
+        encoding = _get_encoding(model)
+        if encoding is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+        tokens = encoding.encode(text, disallowed_special=())
+        return encoding.decode(tokens[:max_tokens])
+
+    @staticmethod
+    def allocate(needs: List[int], weights: List[float], budget: int) -> List[int]:
+        """
+        Split a token budget across sources by weight
+
+        Args:
+            needs: Tokens each source would use untruncated
+            weights: Relevance weight of each source
+            budget: Total tokens available
+
+        Returns:
+            Tokens granted to each source
+        """
+        grants = [0] * len(needs)
+        pending = [i for i in range(len(needs)) if needs[i] > 0]
+        remaining = max(budget, 0)
+
+        # Water-filling: satisfy every source that fits its weighted share,
+        # then redistribute what they did not use among the rest
+        while pending and remaining > 0:
+            total_weight = sum(weights[i] for i in pending)
+            shares = {i: remaining * weights[i] / total_weight for i in pending}
+            satisfied = [i for i in pending if needs[i] <= shares[i]]
+
+            if not satisfied:
+                for i in pending:
+                    grants[i] = int(shares[i])
+                break
+
+            for i in satisfied:
+                grants[i] = needs[i]
+                remaining -= needs[i]
+            pending = [i for i in pending if i not in satisfied]
+
+        return grants
+
+    def build(self, extracted_contents: List[Dict[str, Any]], model: str, first_number: int = 1) -> str:
+        """
+        Format extracted contents into a prompt context within the model's budget
+
+        Args:
+            extracted_contents: List of extracted content dictionaries
+            model: Model the context is built for
+            first_number: Citation number of the first source
+
+        Returns:
+            String containing formatted context
+        """
+        headers = []
+        bodies = []
+        weights = []
+
+        for i, content in enumerate(extracted_contents):
+            header_lines = [
+                f"### SOURCE {first_number + i}: {content.get('title', 'Unknown title')}",
+                f"URL: {content.get('source_url', 'No URL')}"
+            ]
+            if content.get("author"):
+                header_lines.append(f"Author: {content.get('author')}")
+            if content.get("published_date"):
+                header_lines.append(f"Date: {content.get('published_date')}")
+            headers.append("\n".join(header_lines) + "\n")
+
+            body = content.get("content")
+            bodies.append(body if body is not None else "No content available")
+
+            # Unscored sources get a neutral weight; keep a floor so none are starved
+            score = content.get("score")
+            weights.append(max(float(score), 0.05) if isinstance(score, (int, float)) else 0.5)
+
+        header_tokens = sum(self.count_tokens(h, model) for h in headers)
+        budget = self.budget_for(model) - header_tokens
+        needs = [self.count_tokens(body, model) for body in bodies]
+        grants = self.allocate(needs, weights, budget)
+
+        context_parts = []
+        for header, body, need, grant in zip(headers, bodies, needs, grants):
+            if grant < need:
+                body = self.truncate(body, grant, model) + "... [content truncated to fit context budget]"
+            context_parts.append(f"{header}\nCONTENT:\n{body}\n\n")
+
+        return "\n".join(context_parts)
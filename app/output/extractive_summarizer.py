@@ -0,0 +1,213 @@
+from typing import Dict, List, Any, Optional, Tuple
+import os
+import re
+import numpy as np
+from dotenv import load_dotenv
+from app.output.passage_selector import PassageSelector, tokenize
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\[(])")
+_MARKUP_RE = re.compile(r"<[^>]+>|\[[^\]]*\]\([^)]*\)|https?://\S+")
+
+
+def split_sentences(text: str, min_words: int = 6, max_words: int = 60) -> List[str]:
+    """
+    Split text into sentences usable as summary statements
+
+    Fragments that are too short (headings, captions) or too long (tables,
+    run-on markup) are dropped.
+
+    Args:
+        text: Text to split
+        min_words: Shortest sentence kept
+        max_words: Longest sentence kept
+
+    Returns:
+        List of sentences in document order
+    """
+    sentences = []
+    for paragraph in re.split(r"\n\s*\n|\n(?=[-*#•])", _MARKUP_RE.sub(" ", text)):
+        for sentence in _SENTENCE_RE.split(" ".join(paragraph.split())):
+            sentence = sentence.strip(" -*#•")
+            if min_words <= len(sentence.split()) <= max_words and sentence[-1:] in ".!?":
+                sentences.append(sentence)
+    return sentences
+
+
+def tfidf_matrix(documents: List[List[str]], extra: Optional[List[List[str]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build L2-normalised TF-IDF vectors
+
+    Args:
+        documents: Tokenized sentences the vocabulary and IDF are fitted on
+        extra: Further tokenized texts (e.g. the query) projected into the same space
+
+    Returns:
+        Tuple of (document vectors, extra vectors)
+    """
+    vocabulary: Dict[str, int] = {}
+    for tokens in documents:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    def counts(token_lists: List[List[str]]) -> np.ndarray:
+        matrix = np.zeros((len(token_lists), len(vocabulary)), dtype=np.float32)
+        for i, tokens in enumerate(token_lists):
+            for token in tokens:
+                j = vocabulary.get(token)
+                if j is not None:
+                    matrix[i, j] += 1.0
+        return matrix
+
+    tf = counts(documents)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log((1.0 + len(documents)) / (1.0 + df)) + 1.0
+
+    def normalise(matrix: np.ndarray) -> np.ndarray:
+        weighted = np.log1p(matrix) * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        return weighted / np.maximum(norms, 1e-9)
+
+    return normalise(tf), normalise(counts(extra or []))
+
+
+def textrank(similarity: np.ndarray,
+             personalization: Optional[np.ndarray] = None,
+             damping: float = 0.85,
+             iterations: int = 50,
+             tolerance: float = 1e-6) -> np.ndarray:
+    """
+    Rank nodes of a weighted similarity graph with (personalised) PageRank
+
+    Args:
+        similarity: Symmetric non-negative similarity matrix
+        personalization: Teleport distribution biasing the ranking (uniform if None)
+        damping: Probability of following an edge rather than teleporting
+        iterations: Maximum power iterations
+        tolerance: L1 change at which iteration stops
+
+    Returns:
+        Array of scores summing to 1
+    """
+    n = similarity.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0.0)
+    out_degree = weights.sum(axis=1, keepdims=True)
+    # Sentences without edges teleport instead of leaking rank
+    transition = np.divide(weights, out_degree, out=np.full_like(weights, 1.0 / n), where=out_degree > 0)
+
+    if personalization is None or personalization.sum() <= 0:
+        teleport = np.full(n, 1.0 / n)
+    else:
+        teleport = personalization / personalization.sum()
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1.0 - damping) * teleport + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+class ExtractiveSummarizer:
+    """
+    Offline summarizer that quotes the most relevant source sentences.
+
+    Sentences are ranked by TextRank over their TF-IDF similarity graph,
+    biased towards sentences that match the query and its medical concepts.
+    The top sentences, with near-duplicates removed, are returned in source
+    order with [SOURCE X] citations. No network calls are made, so this works
+    as a fallback when LLM providers fail and as a low-latency mode.
+    """
+
+    def __init__(self,
+                 min_sentences: Optional[int] = None,
+                 max_sentences: Optional[int] = None,
+                 max_sentences_per_source: int = 150,
+                 redundancy_threshold: float = 0.6):
+        """
+        Initialize the extractive summarizer
+
+        Args:
+            min_sentences: Fewest sentences in a summary (if the sources have them)
+            max_sentences: Most sentences in a summary
+            max_sentences_per_source: Sentences considered per source, from the start
+            redundancy_threshold: Cosine similarity above which a sentence counts as a duplicate
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.min_sentences = min_sentences or int(os.getenv("EXTRACTIVE_MIN_SENTENCES", "3"))
+        self.max_sentences = max_sentences or int(os.getenv("EXTRACTIVE_MAX_SENTENCES", "7"))
+        self.max_sentences_per_source = max_sentences_per_source
+        self.redundancy_threshold = redundancy_threshold
+
+    def rank(self,
+             query: str,
+             extracted_contents: List[Dict[str, Any]],
+             concepts: Optional[List[str]] = None) -> List[Tuple[int, int, str]]:
+        """
+        Pick the summary sentences
+
+        Args:
+            query: The query text
+            extracted_contents: Sources, numbered from 1 in list order
+            concepts: Medical concepts detected in the query
+
+        Returns:
+            List of (source number, position in source, sentence) in source order
+        """
+        candidates = []
+        for source_number, content in enumerate(extracted_contents, start=1):
+            sentences = split_sentences(content.get("content") or "")[:self.max_sentences_per_source]
+            candidates.extend((source_number, position, sentence) for position, sentence in enumerate(sentences))
+        if not candidates:
+            return []
+
+        tokens = [tokenize(sentence) for _, _, sentence in candidates]
+        weighted_terms = PassageSelector.query_terms(query, concepts)
+        query_tokens = [term for term, weight in weighted_terms.items() for _ in range(int(weight))]
+
+        vectors, query_vectors = tfidf_matrix(tokens, [query_tokens])
+        similarity = np.clip(vectors @ vectors.T, 0.0, 1.0)
+        relevance = np.clip(vectors @ query_vectors[0], 0.0, 1.0)
+
+        # Relevance steers both where the random walk restarts and the final order
+        scores = textrank(similarity, personalization=relevance + 0.01)
+        scores = scores / scores.max() * (0.5 + relevance)
+
+        matching = int((relevance > 0).sum())
+        target = min(max(matching, self.min_sentences), self.max_sentences, len(candidates))
+
+        chosen: List[int] = []
+        for i in np.argsort(-scores, kind="stable"):
+            if len(chosen) >= target:
+                break
+            if any(similarity[i, j] > self.redundancy_threshold for j in chosen):
+                continue
+            chosen.append(int(i))
+
+        return sorted(candidates[i] for i in chosen)
+
+    def summarize(self,
+                  query: str,
+                  extracted_contents: List[Dict[str, Any]],
+                  concepts: Optional[List[str]] = None) -> str:
+        """
+        Build a cited extractive summary
+
+        Args:
+            query: The query text
+            extracted_contents: Sources, numbered from 1 in list order
+            concepts: Medical concepts detected in the query
+
+        Returns:
+            Summary with one cited sentence per line, or "" if no sentence qualifies
+        """
+        return "\n".join(
+            f"- {sentence} [SOURCE {source_number}]"
+            for source_number, _, sentence in self.rank(query, extracted_contents, concepts)
+        )
@@ -0,0 +1,392 @@
+from typing import Dict, List, Any, Optional, Tuple
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from dotenv import load_dotenv
+from app.utils.cassette import get_cassette
+from app.utils.rate_limiter import RequestTokenScheduler
+
+SUPPORTED_SERVICES = ["openai", "groq"]
+
+DEFAULT_MODELS = {
+    "openai": ("OPENAI_MODEL", "gpt-3.5-turbo"),
+    "groq": ("GROQ_MODEL", "llama3-70b-8192")
+}
+
+# Small, low-latency models for high-volume auxiliary calls (e.g. map-reduce map steps)
+FAST_MODELS = {
+    "openai": ("OPENAI_FAST_MODEL", "gpt-4o-mini"),
+    "groq": ("GROQ_FAST_MODEL", "llama-3.1-8b-instant")
+}
+
+
+def fast_models() -> Dict[str, str]:
+    """
+    Get the fast model configured for each service
+
+    Returns:
+        Mapping of service name to model name
+    """
+    load_dotenv()
+    return {service: os.getenv(env_var, default) for service, (env_var, default) in FAST_MODELS.items()}
+
+
+def create_client(service: str):
+    """
+    Create an SDK client for an LLM service from environment settings
+
+    Args:
+        service: "openai" or "groq"
+
+    Returns:
+        Tuple of (client, default model name)
+    """
+    logger = logging.getLogger(__name__)
+    timeout = float(os.getenv("LLM_TIMEOUT", "30"))
+    # Failover handles retries across providers; keep SDK-level retries short
+    max_retries = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "1"))
+
+    if service == "openai":
+        try:
+            from openai import OpenAI
+        except ImportError:
+            logger.error("OpenAI package not found. Install with: pip install openai")
+            raise
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is not set")
+        # OPENAI_BASE_URL can point at any OpenAI-compatible endpoint
+        client = OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None,
+                        timeout=timeout, max_retries=max_retries)
+    elif service == "groq":
+        try:
+            from groq import Groq
+        except ImportError:
+            logger.error("Groq package not found. Install with: pip install groq")
+            raise
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("GROQ_API_KEY environment variable is not set")
+        client = Groq(api_key=api_key, base_url=os.getenv("GROQ_BASE_URL") or None,
+                      timeout=timeout, max_retries=max_retries)
+    else:
+        raise ValueError(f"Unsupported LLM_SERVICE: {service}. Use 'openai' or 'groq'")
+
+    env_var, default_model = DEFAULT_MODELS[service]
+    return client, os.getenv(env_var, default_model)
+
+
+def is_failover_error(error: Exception) -> bool:
+    """
+    Decide whether an error should move the request to another provider
+
+    Timeouts, connection failures, throttling (429) and server errors (5xx)
+    are provider-side problems; anything else (bad request, auth) is not.
+
+    Args:
+        error: Exception raised by the SDK
+
+    Returns:
+        True if another provider should be tried
+    """
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name or isinstance(error, (TimeoutError, ConnectionError))
+
+
+class ProviderStats:
+    """
+    Rolling latency and error statistics for one provider/model pair
+    """
+
+    def __init__(self, window: int = 50, cooldown: float = 30.0):
+        """
+        Initialize the statistics
+
+        Args:
+            window: Number of recent calls considered
+            cooldown: Seconds a provider is skipped after consecutive failures
+        """
+        self.calls = deque(maxlen=window)
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, success: bool) -> None:
+        """Record the outcome of one call"""
+        with self._lock:
+            self.calls.append((latency, success))
+            if success:
+                self.consecutive_failures = 0
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= 2:
+                    backoff = self.cooldown * (2 ** (self.consecutive_failures - 2))
+                    self.unhealthy_until = time.monotonic() + min(backoff, 600.0)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.calls:
+            return 0.0
+        return sum(1 for _, ok in self.calls if not ok) / len(self.calls)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Median latency of recent successful calls, or None if unknown"""
+        latencies = sorted(l for l, ok in self.calls if ok)
+        if not latencies:
+            return None
+        return latencies[len(latencies) // 2]
+
+    def is_healthy(self, max_error_rate: float) -> bool:
+        return time.monotonic() >= self.unhealthy_until and self.error_rate <= max_error_rate
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": len(self.calls),
+            "latency_p50": self.latency,
+            "error_rate": self.error_rate,
+            "healthy_in": max(self.unhealthy_until - time.monotonic(), 0.0)
+        }
+
+
+# One statistics table per process, so latency history, error rates and
+# cooldowns outlive the summarizers (and routers) built for each request
+_provider_stats: Dict[Tuple[str, str], ProviderStats] = {}
+_provider_stats_lock = threading.Lock()
+
+
+def get_provider_stats() -> Dict[Tuple[str, str], ProviderStats]:
+    """
+    Return the process-wide provider statistics, keyed by (service, model)
+
+    Returns:
+        The shared statistics table
+    """
+    return _provider_stats
+
+
+class LLMProvider:
+    """
+    A live client for one LLM service and the model used with it
+    """
+
+    def __init__(self, name: str, client: Any, model: str):
+        self.name = name
+        self.client = client
+        self.model = model
+
+
+class LLMRouter:
+    """
+    Routes chat completions across several LLM providers.
+
+    Every configured provider keeps its client alive. Each call goes to the
+    fastest healthy provider by rolling median latency, with the preferred
+    service breaking ties. Providers without history are tried through
+    occasional exploration.
+    Timeouts, throttling and server errors fail over to the next provider
+    within the same request.
+    """
+
+    def __init__(self,
+                 preferred: str,
+                 providers: Optional[List[LLMProvider]] = None,
+                 stats: Optional[Dict[Tuple[str, str], ProviderStats]] = None):
+        """
+        Initialize the router
+
+        Args:
+            preferred: Service used when latency data does not favour another
+            providers: Providers to route between
+            stats: Statistics table to record into (defaults to a private one;
+                from_env uses the process-wide table)
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+        self.cassette = get_cassette()
+        self.preferred = preferred
+        self.providers: Dict[str, LLMProvider] = {}
+        self.stats: Dict[Tuple[str, str], ProviderStats] = stats if stats is not None else {}
+        self._stats_lock = _provider_stats_lock
+
+        self.max_error_rate = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+        self.explore_rate = float(os.getenv("LLM_ROUTER_EXPLORE_RATE", "0.05"))
+        self.window = int(os.getenv("LLM_ROUTER_WINDOW", "50"))
+        self.cooldown = float(os.getenv("LLM_ROUTER_COOLDOWN", "30"))
+
+        for provider in providers or []:
+            self.add_provider(provider)
+
+    @classmethod
+    def from_env(cls, preferred: str) -> "LLMRouter":
+        """
+        Build a router for the preferred service plus any other configured service
+
+        The preferred service must be configured; other services listed in
+        LLM_ROUTER_SERVICES (default: all supported) are added when their API
+        key is available. The router records into the process-wide provider
+        statistics, so routing decisions carry over between requests.
+
+        Args:
+            preferred: Primary LLM service
+
+        Returns:
+            Configured LLMRouter
+        """
+        client, model = create_client(preferred)
+        router = cls(preferred, [LLMProvider(preferred, client, model)], stats=get_provider_stats())
+
+        extra = os.getenv("LLM_ROUTER_SERVICES", ",".join(SUPPORTED_SERVICES))
+        for service in [s.strip().lower() for s in extra.split(",") if s.strip()]:
+            if service in router.providers or service not in SUPPORTED_SERVICES:
+                continue
+            try:
+                client, model = create_client(service)
+                router.add_provider(LLMProvider(service, client, model))
+            except (ValueError, ImportError) as e:
+                router.logger.info(f"LLM provider {service} not available for failover: {str(e)}")
+
+        return router
+
+    def add_provider(self, provider: LLMProvider) -> None:
+        """Register a provider"""
+        self.providers[provider.name] = provider
+
+    def _stats_for(self, provider: LLMProvider, model: Optional[str] = None) -> ProviderStats:
+        key = (provider.name, model or provider.model)
+        with self._stats_lock:
+            if key not in self.stats:
+                self.stats[key] = ProviderStats(self.window, self.cooldown)
+            return self.stats[key]
+
+    def ranked(self) -> List[LLMProvider]:
+        """
+        Order providers for the next call
+
+        Returns:
+            Healthy providers fastest first, followed by unhealthy ones
+        """
+        def sort_key(provider):
+            stats = self._stats_for(provider)
+            healthy = stats.is_healthy(self.max_error_rate)
+            latency = stats.latency
+            is_preferred = provider.name == self.preferred
+            # Providers without latency history rank last among healthy ones
+            return (
+                0 if healthy else 1,
+                latency if latency is not None else float("inf"),
+                0 if is_preferred else 1
+            )
+
+        return sorted(self.providers.values(), key=sort_key)
+
+    def complete(self, models: Optional[Dict[str, str]] = None, **request) -> Tuple[Any, LLMProvider]:
+        """
+        Run a chat completion on the best provider, failing over on provider errors
+
+        Args:
+            models: Per-service model overrides (e.g. fast models); other
+                providers use their own model
+            **request: Completion arguments (messages, max_tokens, temperature, ...);
+                the model is filled in per provider
+
+        Returns:
+            Tuple of (SDK response, provider that answered)
+        """
+        models = models or {}
+        candidates = self.ranked()
+
+        # Occasionally try a healthy alternative so its latency stays known
+        healthy = [p for p in candidates if self._stats_for(p).is_healthy(self.max_error_rate)]
+        if len(healthy) > 1 and random.random() < self.explore_rate:
+            explore = random.choice(healthy[1:])
+            candidates.remove(explore)
+            candidates.insert(0, explore)
+
+        last_error: Optional[Exception] = None
+        for provider in candidates:
+            model = models.get(provider.name, provider.model)
+            stats = self._stats_for(provider, model)
+            start = time.perf_counter()
+            try:
+                response = self.cassette.llm(
+                    provider.client.chat.completions.create,
+                    model=model,
+                    **request
+                )
+            except Exception as e:
+                if not is_failover_error(e):
+                    raise
+                stats.record(time.perf_counter() - start, success=False)
+                self.logger.warning(f"LLM provider {provider.name} ({model}) failed, trying next: {str(e)}")
+                last_error = e
+                continue
+
+            stats.record(time.perf_counter() - start, success=True)
+            return response, provider
+
+        raise last_error if last_error else RuntimeError("No LLM providers configured")
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Report rolling statistics per provider and model
+
+        Returns:
+            Dictionary keyed by "provider/model"
+        """
+        with self._stats_lock:
+            items = list(self.stats.items())
+        return {f"{name}/{model}": stats.snapshot() for (name, model), stats in items}
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After delay from a throttling error, if the provider sent one
+
+    Args:
+        error: Exception raised by the SDK
+
+    Returns:
+        Seconds to wait, or None if the header is missing or not numeric
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# One scheduler per process so concurrent summarizers share the provider quota
+_default_scheduler: Optional[RequestTokenScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> RequestTokenScheduler:
+    """
+    Return the process-wide requests/tokens-per-minute scheduler for LLM calls
+
+    Returns:
+        The shared RequestTokenScheduler instance
+    """
+    global _default_scheduler
+
+    if _default_scheduler is None:
+        with _default_scheduler_lock:
+            if _default_scheduler is None:
+                load_dotenv()
+                _default_scheduler = RequestTokenScheduler(
+                    rpm=float(os.getenv("LLM_RPM_LIMIT", "60")),
+                    tpm=float(os.getenv("LLM_TPM_LIMIT", "60000"))
+                )
+    return _default_scheduler
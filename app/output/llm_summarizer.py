@@ -1,8 +1,22 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import os
 import json
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from app.output.context_builder import ContextBuilder
+from app.output.passage_selector import PassageSelector
+from app.output.completion_cache import get_completion_cache
+from app.output.extractive_summarizer import ExtractiveSummarizer
+from app.output.prompt_templates import (
+    MEDICAL_SUMMARY_PROMPT, MEDICAL_SUMMARY_PROMPTS, MAP_PROMPT, MAP_NO_INFORMATION, REDUCE_PROMPTS
+)
+from app.core.intent import DEFAULT_INTENT, intent_profile
+from app.output.token_usage import get_usage_tracker, usage_from_response, combine_usage
+from app.output.llm_router import (
+    LLMRouter, LLMProvider, SUPPORTED_SERVICES, create_client, get_llm_scheduler, retry_after_seconds, fast_models
+)
 
 
 class LLMSummarizer:
@@ -19,218 +33,564 @@ class LLMSummarizer:
         self.llm_service = os.getenv("LLM_SERVICE", "openai").lower()
         self.logger = logging.getLogger(__name__)
 
-        if self.llm_service == "openai":
-            try:
-                from openai import OpenAI
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    raise ValueError(
-                        "OPENAI_API_KEY environment variable is not set")
-                self.client = OpenAI(api_key=api_key)
-                self.model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-            except ImportError:
-                self.logger.error(
-                    "OpenAI package not found. Install with: pip install openai")
-                raise
-        elif self.llm_service == "groq":
-            try:
-                from groq import Groq
-                api_key = os.getenv("GROQ_API_KEY")
-                if not api_key:
-                    raise ValueError(
-                        "GROQ_API_KEY environment variable is not set")
-                self.client = Groq(api_key=api_key)
-                self.model = os.getenv("GROQ_MODEL", "llama3-70b-8192")
-            except ImportError:
-                self.logger.error(
-                    "Groq package not found. Install with: pip install groq")
-                raise
-        else:
+        # Query-focused passage selection and token-budgeted context assembly
+        self.passage_selector = PassageSelector()
+        self.context_builder = ContextBuilder()
+
+        # Persistent completion cache (None when LLM_CACHE_ENABLED=false)
+        self.completion_cache = get_completion_cache()
+
+        if self.llm_service not in SUPPORTED_SERVICES:
             raise ValueError(
                 f"Unsupported LLM_SERVICE: {self.llm_service}. Use 'openai' or 'groq'")
 
+        # Keep clients for every configured service alive and route between them
+        self.router = LLMRouter.from_env(self.llm_service)
+
+        # Provider-reported token usage per day, model and stage
+        self.usage_tracker = get_usage_tracker()
+
+        # Requests/tokens-per-minute admission for batch summarization
+        self.scheduler = get_llm_scheduler()
+
+        # Offline extractive summaries, used as a fast mode and when providers fail
+        self.extractive_summarizer = ExtractiveSummarizer()
+        self.mode = os.getenv("LLM_SUMMARY_MODE", "llm").lower()
+        self.extractive_fallback = os.getenv("EXTRACTIVE_FALLBACK_ENABLED", "true").lower() == "true"
+
+        self.temperature = 0.3  # Slightly higher temperature for GPT-3.5 Turbo to maintain coherence
+
+    @property
+    def client(self):
+        """Client of the preferred LLM service"""
+        return self.router.providers[self.llm_service].client
+
+    @client.setter
+    def client(self, client) -> None:
+        self.router.providers[self.llm_service].client = client
+
+    @property
+    def model(self) -> str:
+        """Model used with the preferred LLM service"""
+        return self.router.providers[self.llm_service].model
+
+    @model.setter
+    def model(self, model_name: str) -> None:
+        self.router.providers[self.llm_service].model = model_name
+
     def summarize(self,
                   query: str,
                   extracted_contents: List[Dict[str, Any]],
-                  max_tokens: int = 500) -> Dict[str, Any]:
+                  max_tokens: Optional[int] = None,
+                  concepts: Optional[List[str]] = None,
+                  mode: Optional[str] = None,
+                  intent: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate a concise, medically accurate summary from extracted contents
 
         Args:
             query: Original user query
             extracted_contents: List of extracted content dictionaries
-            max_tokens: Maximum tokens for the summary response
+            max_tokens: Maximum tokens for the summary response (defaults to the intent profile)
+            concepts: Medical concepts recognised in the query, used to pick relevant passages
+            mode: "llm", "map_reduce" (per-source notes merged by a short final call)
+                or "extractive" (fast, offline); defaults to LLM_SUMMARY_MODE
+            intent: Query intent from the ReasoningAgent; selects answer length,
+                stop sequences and length instructions
 
         Returns:
             Dictionary with the summary and metadata
         """
+        if (mode or self.mode) == "extractive":
+            return self._extractive_result(query, extracted_contents, concepts)
+
+        profile = intent_profile(intent or DEFAULT_INTENT)
+        max_tokens = max_tokens or profile["max_tokens"]
         try:
-            # Check if we have any valid extracted contents
-            valid_contents = [content for content in extracted_contents
-                              if content.get("extraction_success", False) and content.get("content")]
+            if (mode or self.mode) == "map_reduce":
+                return self._map_reduce(query, extracted_contents, concepts, intent, max_tokens)
 
+            valid_contents, messages = self._build_request(query, extracted_contents, concepts, intent)
             if not valid_contents:
-                return {
-                    "summary": "No valid content could be extracted to answer your query. Please try with a different search term or consult direct medical sources.",
-                    "sources": [],
-                    "query": query,
-                    "model_used": self.model,
-                    "token_count": 0
-                }
-
-            # Prepare the context from extracted contents
-            context = self._prepare_context(valid_contents)
-
-            # Create the prompt with medical-specific instructions
-            prompt = self._create_medical_prompt(query, context)
-
-            # Log the model being used
-            self.logger.info(f"Using {self.llm_service} model: {self.model}")
-
-            # Generate the summary using the LLM
-            if self.llm_service == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a gastroenterology expert assistant providing concise, accurate medical information with proper citations."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.3,  # Slightly higher temperature for GPT-3.5 Turbo to maintain coherence
-                    n=1
-                )
-            elif self.llm_service == "groq":
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a gastroenterology expert assistant providing concise, accurate medical information with proper citations."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.3,
-                    n=1
-                )
-
-            # Extract the generated summary
-            summary_text = response.choices[0].message.content.strip()
-
-            # Check for empty summary
-            if not summary_text:
-                summary_text = "Unable to generate a summary from the available content. The extracted information may not be relevant to your query."
-
-            # Create metadata for the summary
-            sources = []
-            for i, content in enumerate(valid_contents):
-                sources.append({
-                    "id": f"source-{i+1}",
-                    "title": content.get("title", "Unknown title"),
-                    "url": content.get("source_url", ""),
-                    "author": content.get("author", "Unknown"),
-                    "published_date": content.get("published_date", "")
-                })
-
-            # Calculate token count safely
-            token_count = len(summary_text.split()) if summary_text else 0
-
-            # Return the summary and metadata
-            return {
-                "summary": summary_text,
-                "sources": sources,
-                "query": query,
-                "model_used": self.model,
-                "token_count": token_count
-            }
+                return self._empty_result(query)
+
+            summary_text, model_used, cached, calls = self._complete(messages, max_tokens, stop=profile["stop"])
+            return self._build_result(query, valid_contents, summary_text, model_used, cached, calls)
 
         except Exception as e:
-            self.logger.error(f"Error in LLM summarization: {str(e)}")
-            # Return an error response with basic information
-            return {
-                "summary": f"Unable to generate summary due to an error: {str(e)}",
-                "sources": [],
-                "query": query,
-                "model_used": self.model,
-                "token_count": 0,
-                "error": str(e)
-            }
+            return self._fallback_result(query, extracted_contents, concepts, e)
 
-    def _prepare_context(self, extracted_contents: List[Dict[str, Any]]) -> str:
+    def summarize_many(self,
+                       items: List[Dict[str, Any]],
+                       max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Prepare the context from the extracted contents
+        Summarize many queries concurrently within the provider's rate limits
+
+        Every call is admitted by the shared requests/tokens-per-minute
+        scheduler using its estimated prompt plus completion tokens, so
+        workers queue rather than trip the limits. Throttled calls (HTTP 429)
+        are retried after the provider's Retry-After delay.
+
+        Args:
+            items: Dictionaries with "query" and "extracted_contents", and
+                optionally "max_tokens", "concepts", "mode" and "intent"
+            max_workers: Number of concurrent calls (defaults to LLM_BATCH_CONCURRENCY)
+
+        Returns:
+            List of summary dictionaries in the same order as items
+        """
+        max_workers = max_workers or int(os.getenv("LLM_BATCH_CONCURRENCY", "8"))
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(self._summarize_scheduled, items))
+
+    def _summarize_scheduled(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Summarize one batch item, waiting for the scheduler and retrying throttled calls
 
         Args:
+            item: Batch item as accepted by summarize_many
+
+        Returns:
+            Dictionary with the summary and metadata
+        """
+        query = item.get("query", "")
+        extracted_contents = item.get("extracted_contents") or []
+        concepts = item.get("concepts")
+        intent = item.get("intent")
+        profile = intent_profile(intent or DEFAULT_INTENT)
+        max_tokens = item.get("max_tokens") or profile["max_tokens"]
+
+        mode = item.get("mode") or self.mode
+        if mode == "extractive":
+            return self._extractive_result(query, extracted_contents, concepts)
+
+        try:
+            if mode == "map_reduce":
+                return self._map_reduce(query, extracted_contents, concepts, intent, max_tokens, scheduled=True)
+
+            valid_contents, messages = self._build_request(query, extracted_contents, concepts, intent)
+            if not valid_contents:
+                return self._empty_result(query)
+
+            # Cached completions cost no quota
+            cached = self._cache_lookup(messages, self.temperature, max_tokens)
+            if cached is not None:
+                return self._build_result(query, valid_contents, cached["content"],
+                                          cached.get("model", self.model), True, [])
+
+            prompt_tokens = sum(self.context_builder.count_tokens(m["content"], self.model) for m in messages)
+            max_retries = int(os.getenv("LLM_BATCH_MAX_RETRIES", "5"))
+
+            for attempt in range(max_retries + 1):
+                self.scheduler.acquire(prompt_tokens + max_tokens)
+                try:
+                    summary_text, model_used, _, calls = self._complete(
+                        messages, max_tokens, use_cache=False, stop=profile["stop"])
+                    return self._build_result(query, valid_contents, summary_text, model_used, False, calls)
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 429 or attempt == max_retries:
+                        raise
+                    delay = retry_after_seconds(e)
+                    if delay is None:
+                        delay = min(2.0 ** attempt, 60.0)
+                    self.logger.warning(f"LLM throttled, retrying in {delay:.1f}s (attempt {attempt + 1})")
+                    self.scheduler.pause(delay)
+
+        except Exception as e:
+            return self._fallback_result(query, extracted_contents, concepts, e)
+
+    def _build_request(self,
+                       query: str,
+                       extracted_contents: List[Dict[str, Any]],
+                       concepts: Optional[List[str]] = None,
+                       intent: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Select usable sources and build the chat messages for a summary
+
+        Args:
+            query: Original user query
             extracted_contents: List of extracted content dictionaries
+            concepts: Medical concepts recognised in the query
+            intent: Query intent selecting the prompt's length rule
 
         Returns:
-            String containing formatted context
+            Tuple of (valid contents, chat messages); the messages are empty when no content is usable
+        """
+        valid_contents = self._valid_contents(extracted_contents)
+        if not valid_contents:
+            return [], []
+
+        # Keep only the passages of each source that match the query
+        focused_contents = self.passage_selector.select(query, valid_contents, concepts)
+
+        # Prepare the context from extracted contents
+        context = self._prepare_context(focused_contents)
+
+        # Create the prompt with medical-specific instructions
+        messages = self._create_medical_prompt(query, context, intent)
+        return valid_contents, messages
+
+    def _map_reduce(self,
+                    query: str,
+                    extracted_contents: List[Dict[str, Any]],
+                    concepts: Optional[List[str]],
+                    intent: Optional[str],
+                    max_tokens: int,
+                    scheduled: bool = False) -> Dict[str, Any]:
         """
-        context_parts = []
+        Summarize each source separately with a fast model, then merge the notes
+
+        Map calls run in parallel, one per source, so latency follows the
+        slowest source rather than the total context length. The reduce call
+        only sees the short, already cited notes.
 
-        for i, content in enumerate(extracted_contents):
-            # Format the content with metadata
-            context_part = f"### SOURCE {i+1}: {content.get('title', 'Unknown title')}\n"
-            context_part += f"URL: {content.get('source_url', 'No URL')}\n"
-            if content.get("author"):
-                context_part += f"Author: {content.get('author')}\n"
-            if content.get("published_date"):
-                context_part += f"Date: {content.get('published_date')}\n"
+        Args:
+            query: Original user query
+            extracted_contents: List of extracted content dictionaries
+            concepts: Medical concepts recognised in the query
+            intent: Query intent selecting the reduce prompt and stop sequences
+            max_tokens: Maximum tokens for the final summary
+            scheduled: Admit map calls through the rate-limit scheduler (batch use)
 
-            # For GPT-3.5 Turbo, we need to be careful about context length
-            # Extract and truncate the content to a reasonable length
-            content_text = content.get('content', '')
+        Returns:
+            Dictionary with the summary and metadata
+        """
+        valid_contents = self._valid_contents(extracted_contents)
+        if not valid_contents:
+            return self._empty_result(query)
+
+        focused_contents = self.passage_selector.select(query, valid_contents, concepts)
+        models = fast_models()
+        map_model = models.get(self.llm_service, self.model)
+        map_max_tokens = int(os.getenv("LLM_MAP_MAX_TOKENS", "200"))
+
+        def map_source(number: int, content: Dict[str, Any]) -> Tuple[str, bool, List[Dict[str, Any]]]:
+            context = self.context_builder.build([content], map_model, first_number=number)
+            messages = MAP_PROMPT.messages(number=str(number), context=context, query=query)
+            if scheduled:
+                prompt_tokens = sum(self.context_builder.count_tokens(m["content"], map_model) for m in messages)
+                self.scheduler.acquire(prompt_tokens + map_max_tokens)
+            text, _, cached, calls = self._complete(messages, map_max_tokens, stage="map", models=models)
+            if MAP_NO_INFORMATION in text.upper():
+                return "", cached, calls
+            # Keep every note attributable even if the model dropped a citation
+            lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+            citation = f"[SOURCE {number}]"
+            return "\n".join(line if "[SOURCE" in line else f"{line} {citation}" for line in lines), cached, calls
+
+        with ThreadPoolExecutor(max_workers=len(focused_contents)) as executor:
+            futures = [executor.submit(map_source, i + 1, content) for i, content in enumerate(focused_contents)]
+
+        notes = []
+        calls: List[Dict[str, Any]] = []
+        all_cached = True
+        errors = []
+        for future in futures:
+            try:
+                note, cached, map_calls = future.result()
+            except Exception as e:
+                self.logger.warning(f"Map step failed for one source: {str(e)}")
+                errors.append(e)
+                continue
+            calls.extend(map_calls)
+            all_cached = all_cached and cached
+            if note:
+                notes.append(note)
+
+        if len(errors) == len(futures):
+            raise errors[0]
+
+        summary_text, model_used = "", map_model
+        if notes:
+            template = REDUCE_PROMPTS.get(intent or DEFAULT_INTENT, REDUCE_PROMPTS[DEFAULT_INTENT])
+            messages = template.messages(notes="\n\n".join(notes), query=query)
+            if scheduled:
+                prompt_tokens = sum(self.context_builder.count_tokens(m["content"], self.model) for m in messages)
+                self.scheduler.acquire(prompt_tokens + max_tokens)
+            summary_text, model_used, cached, reduce_calls = self._complete(
+                messages, max_tokens, stage="reduce", stop=intent_profile(intent or DEFAULT_INTENT)["stop"])
+            calls.extend(reduce_calls)
+            all_cached = all_cached and cached
+
+        result = self._build_result(query, valid_contents, summary_text, model_used, all_cached, calls)
+        result["mode"] = "map_reduce"
+        return result
+
+    @staticmethod
+    def _valid_contents(extracted_contents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the extracted contents that succeeded and have text"""
+        return [content for content in extracted_contents
+                if content.get("extraction_success", False) and content.get("content")]
+
+    def _complete(self,
+                  messages: List[Dict[str, Any]],
+                  max_tokens: int,
+                  use_cache: bool = True,
+                  stage: str = "summarize",
+                  stop: Optional[List[str]] = None,
+                  models: Optional[Dict[str, str]] = None) -> Tuple[str, str, bool, List[Dict[str, Any]]]:
+        """
+        Get a completion from the cache or the fastest healthy provider
 
-            # Handle None values
-            if content_text is None:
-                content_text = "No content available"
+        Args:
+            messages: Chat messages for the request
+            max_tokens: Maximum completion tokens
+            use_cache: Whether to look the request up in the completion cache first
+            stage: Pipeline stage the call is booked under in the usage metrics
+            stop: Stop sequences ending generation early
+            models: Per-service model overrides (e.g. fast models for map steps)
 
-            # If content is very long, truncate it to ~4000 chars to fit in context window
-            if len(content_text) > 4000:
-                content_text = content_text[:4000] + \
-                    "... [content truncated due to length]"
+        Returns:
+            Tuple of (summary text, model used, whether it came from the cache,
+            provider-reported usage of the calls made)
+        """
+        temperature = self.temperature
+        models = models or {}
+
+        # Identical prompts for the same model and settings are served from the cache
+        cached = self._cache_lookup(messages, temperature, max_tokens, models) if use_cache else None
+        if cached is not None:
+            model_used = cached.get("model", self.model)
+            self.logger.info(f"Completion cache hit for model: {model_used}")
+            return cached["content"], model_used, True, []
+
+        # Generate the summary on the fastest healthy provider, failing over if needed
+        request = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature, "n": 1}
+        if stop:
+            request["stop"] = stop
+
+        start = time.perf_counter()
+        response, provider = self.router.complete(models=models, **request)
+        latency = time.perf_counter() - start
+        model_used = models.get(provider.name, provider.model)
+        self.logger.info(f"Used {provider.name} model: {model_used}")
+
+        # Extract the generated summary
+        summary_text = (response.choices[0].message.content or "").strip()
+
+        # Book the true token usage reported by the provider
+        calls = []
+        usage = usage_from_response(response)
+        if usage is not None:
+            self.usage_tracker.record(model_used, stage, usage)
+            # Latency sits next to cached_tokens so prompt-cache gains show up per call
+            calls.append({"model": model_used, "stage": stage, "latency": round(latency, 3), **usage})
+
+        if summary_text and self.completion_cache is not None:
+            cache_key = self.completion_cache.make_key(
+                provider.name, model_used, temperature, max_tokens, messages)
+            self.completion_cache.set(cache_key, {"content": summary_text, "model": model_used})
+
+        return summary_text, model_used, False, calls
+
+    def _build_result(self,
+                      query: str,
+                      valid_contents: List[Dict[str, Any]],
+                      summary_text: str,
+                      model_used: str,
+                      cached: bool,
+                      calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Assemble the summary dictionary with source metadata
 
-            # Add the main content
-            context_part += f"\nCONTENT:\n{content_text}\n\n"
+        Args:
+            query: Original user query
+            valid_contents: Sources the summary was generated from
+            summary_text: Generated summary
+            model_used: Model that produced the summary
+            cached: Whether the summary came from the completion cache
+            calls: Provider-reported usage of each LLM call behind the summary
 
-            context_parts.append(context_part)
+        Returns:
+            Dictionary with the summary and metadata
+        """
+        # Check for empty summary
+        if not summary_text:
+            summary_text = "Unable to generate a summary from the available content. The extracted information may not be relevant to your query."
+
+        # Create metadata for the summary
+        sources = []
+        for i, content in enumerate(valid_contents):
+            source = {
+                "id": f"source-{i+1}",
+                "title": content.get("title", "Unknown title"),
+                "url": content.get("source_url", ""),
+                "author": content.get("author", "Unknown"),
+                "published_date": content.get("published_date", "")
+            }
+            # Information needs that retrieved this source (merged summaries)
+            if content.get("needs"):
+                source["needs"] = content["needs"]
+            sources.append(source)
+
+        # Prompt, completion and cached tokens as reported by the provider;
+        # cache hits made no call and cost nothing
+        usage = combine_usage(calls)
+        usage["calls"] = calls
+
+        # Output tokens, estimated locally when the provider did not report usage
+        token_count = usage["completion_tokens"] if calls else self.context_builder.count_tokens(summary_text, model_used)
+
+        # Return the summary and metadata
+        return {
+            "summary": summary_text,
+            "sources": sources,
+            "query": query,
+            "model_used": model_used,
+            "token_count": token_count,
+            "usage": usage,
+            "cached": cached
+        }
+
+    def _extractive_result(self,
+                           query: str,
+                           extracted_contents: List[Dict[str, Any]],
+                           concepts: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Summarize offline by quoting the most relevant source sentences
 
-        # Join all context parts
-        return "\n".join(context_parts)
+        Args:
+            query: Original user query
+            extracted_contents: List of extracted content dictionaries
+            concepts: Medical concepts recognised in the query
 
-    def _create_medical_prompt(self, query: str, context: str) -> str:
+        Returns:
+            Dictionary with the summary and metadata ("model_used" is "extractive")
+        """
+        valid_contents = self._valid_contents(extracted_contents)
+        if not valid_contents:
+            return self._empty_result(query)
+
+        summary_text = self.extractive_summarizer.summarize(query, valid_contents, concepts)
+        result = self._build_result(query, valid_contents, summary_text, "extractive", False, [])
+        result["mode"] = "extractive"
+        return result
+
+    def _fallback_result(self,
+                         query: str,
+                         extracted_contents: List[Dict[str, Any]],
+                         concepts: Optional[List[str]],
+                         error: Exception) -> Dict[str, Any]:
         """
-        Create a prompt specifically designed for medical summarization
+        Answer with an extractive summary after the LLM path failed
 
         Args:
             query: Original user query
-            context: Formatted context from extracted contents
+            extracted_contents: List of extracted content dictionaries
+            concepts: Medical concepts recognised in the query
+            error: The LLM failure
+
+        Returns:
+            Extractive summary marked as a fallback, or the error result if
+            fallback is disabled or finds nothing to quote
+        """
+        if not self.extractive_fallback:
+            return self._error_result(query, error)
+
+        self.logger.warning(f"LLM summarization failed, using extractive fallback: {str(error)}")
+        try:
+            valid_contents = self._valid_contents(extracted_contents)
+            summary_text = self.extractive_summarizer.summarize(query, valid_contents, concepts) if valid_contents else ""
+        except Exception as e:
+            self.logger.error(f"Extractive fallback failed: {str(e)}")
+            return self._error_result(query, error)
+
+        if not summary_text:
+            return self._error_result(query, error)
+        result = self._build_result(query, valid_contents, summary_text, "extractive", False, [])
+        result["mode"] = "extractive"
+        result["fallback"] = True
+        result["llm_error"] = str(error)
+        return result
+
+    def _empty_result(self, query: str) -> Dict[str, Any]:
+        """Result returned when no extracted content is usable"""
+        return {
+            "summary": "No valid content could be extracted to answer your query. Please try with a different search term or consult direct medical sources.",
+            "sources": [],
+            "query": query,
+            "model_used": self.model,
+            "token_count": 0
+        }
+
+    def _error_result(self, query: str, error: Exception) -> Dict[str, Any]:
+        """Result returned when summarization fails"""
+        self.logger.error(f"Error in LLM summarization: {str(error)}")
+        # Return an error response with basic information
+        return {
+            "summary": f"Unable to generate summary due to an error: {str(error)}",
+            "sources": [],
+            "query": query,
+            "model_used": self.model,
+            "token_count": 0,
+            "error": str(error)
+        }
+
+    def _cache_lookup(self,
+                      messages: List[Dict[str, Any]],
+                      temperature: float,
+                      max_tokens: int,
+                      models: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look for a cached completion from any provider the router would use
+
+        Args:
+            messages: Chat messages for the request
+            temperature: Sampling temperature
+            max_tokens: Maximum completion tokens
+            models: Per-service model overrides
 
         Returns:
-            Prompt string
+            Cached completion data, or None
         """
-        # Modified prompt optimized for GPT-3.5 Turbo's capabilities
-        prompt = f"""
-As a gastroenterology expert, provide a concise, accurate response to this query:
+        if self.completion_cache is None:
+            return None
+
+        models = models or {}
+        for provider in self.router.ranked():
+            model = models.get(provider.name, provider.model)
+            key = self.completion_cache.make_key(provider.name, model, temperature, max_tokens, messages)
+            cached = self.completion_cache.get(key)
+            if cached is not None:
+                return cached
+        return None
 
-QUERY: {query}
+    def _prepare_context(self, extracted_contents: List[Dict[str, Any]]) -> str:
+        """
+        Prepare the context from the extracted contents
 
-Below are sources from medical literature. Use these to formulate your response.
+        Sources share a per-model token budget in proportion to their relevance
+        score, so the most relevant material survives truncation.
 
-{context}
+        Args:
+            extracted_contents: List of extracted content dictionaries
 
-INSTRUCTIONS:
-1. Only include medical facts directly supported by the sources
-2. Be brief and crisp - focus on the most relevant information
-3. Use clear medical terminology for healthcare professionals
-4. Cite sources using [SOURCE X] notation after each fact
-5. If sources conflict, present both perspectives
-6. If information is limited, state this clearly
-7. Avoid personal opinions or unsupported recommendations
-8. Use bullet points for readability when appropriate
-9. Keep your response to 3-7 sentences for straightforward queries
-10. Focus on the direct answer to the query
+        Returns:
+            String containing formatted context
+        """
+        return self.context_builder.build(extracted_contents, self.model)
+
+    def _create_medical_prompt(self, query: str, context: str, intent: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Create the chat messages for medical summarization
+
+        The instructions form a static system message shared by every request,
+        and the sources and query follow in the user message, so providers can
+        serve the common prefix from their prompt cache.
+
+        Args:
+            query: Original user query
+            context: Formatted context from extracted contents
+            intent: Query intent; each intent has its own compiled template
 
-YOUR RESPONSE:
-"""
-        return prompt
+        Returns:
+            System and user messages
+        """
+        template = MEDICAL_SUMMARY_PROMPTS.get(intent or DEFAULT_INTENT, MEDICAL_SUMMARY_PROMPT)
+        return template.messages(query=query, context=context)
 
     def set_model(self, model_name: str) -> None:
         """
@@ -245,17 +605,24 @@ YOUR RESPONSE:
 
     def set_service(self, service_name: str) -> None:
         """
-        Change the LLM service used for summarization
+        Change the preferred LLM service used for summarization
+
+        Clients for other services stay alive, so switching back is cheap and
+        the router can still fail over to them.
 
         Args:
             service_name: Name of the service to use ("openai" or "groq")
         """
-        if service_name.lower() not in ["openai", "groq"]:
+        service_name = service_name.lower()
+        if service_name not in SUPPORTED_SERVICES:
             raise ValueError(
                 f"Unsupported LLM service: {service_name}. Use 'openai' or 'groq'")
 
-        if service_name.lower() != self.llm_service:
+        if service_name != self.llm_service:
             self.logger.info(
                 f"Changing LLM service from {self.llm_service} to {service_name}")
-            # Reinitialize the client with the new service
-            self.__init__()
+            if service_name not in self.router.providers:
+                client, model = create_client(service_name)
+                self.router.add_provider(LLMProvider(service_name, client, model))
+            self.llm_service = service_name
+            self.router.preferred = service_name
@@ -0,0 +1,194 @@
+from typing import Dict, List, Any, Optional
+import os
+import re
+import numpy as np
+from dotenv import load_dotenv
+
+# Words that carry no retrieval signal for medical queries
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "what",
+    "when", "which", "who", "why", "with", "you", "your", "should", "would", "there",
+    "their", "these", "those", "was", "were", "will", "about", "into", "than", "then"
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokenizer that drops stopwords
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def chunk_text(text: str, target_words: int = 120) -> List[str]:
+    """
+    Split text into passages of roughly target_words words along paragraph and sentence boundaries
+
+    Args:
+        text: Text to split
+        target_words: Approximate passage length in words
+
+    Returns:
+        List of passages in document order
+    """
+    chunks = []
+    current: List[str] = []
+    current_words = 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        sentences = []
+        for sentence in _SENTENCE_RE.split(paragraph):
+            # Text without sentence punctuation (tables, raw markup) is cut into word windows
+            sentence_words = sentence.split()
+            for start in range(0, len(sentence_words), target_words):
+                sentences.append(" ".join(sentence_words[start:start + target_words]))
+        for sentence in sentences:
+            words = len(sentence.split())
+            if current and current_words + words > target_words:
+                chunks.append(" ".join(current))
+                current, current_words = [], 0
+            current.append(sentence)
+            current_words += words
+        # Prefer to end passages at paragraph breaks once they are reasonably long
+        if current_words >= target_words // 2:
+            chunks.append(" ".join(current))
+            current, current_words = [], 0
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def bm25_scores(passages: List[List[str]], query_terms: Dict[str, float], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """
+    Score tokenized passages against weighted query terms with BM25
+
+    Args:
+        passages: Tokenized passages
+        query_terms: Mapping of query term to weight
+        k1: Term frequency saturation
+        b: Length normalization strength
+
+    Returns:
+        Array of scores, one per passage
+    """
+    if not passages or not query_terms:
+        return np.zeros(len(passages))
+
+    terms = list(query_terms)
+    term_index = {t: j for j, t in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)), dtype=np.float32)
+    for i, tokens in enumerate(passages):
+        for token in tokens:
+            j = term_index.get(token)
+            if j is not None:
+                tf[i, j] += 1.0
+
+    lengths = np.array([len(tokens) for tokens in passages], dtype=np.float32)
+    avg_length = max(float(lengths.mean()), 1.0)
+    df = (tf > 0).sum(axis=0)
+    idf = np.log(1.0 + (len(passages) - df + 0.5) / (df + 0.5))
+    weights = np.array([query_terms[t] for t in terms], dtype=np.float32)
+
+    norm = k1 * (1.0 - b + b * lengths / avg_length)
+    saturated = tf * (k1 + 1.0) / (tf + norm[:, None])
+    return saturated @ (idf * weights)
+
+
+class PassageSelector:
+    """
+    Keeps only the passages of each extracted page that best match the query.
+
+    Pages are chunked, every chunk is scored with BM25 against the query and
+    the medical concepts found by the ReasoningAgent, and the top chunks of
+    each page are kept in their original order.
+    """
+
+    def __init__(self, chunk_words: Optional[int] = None, top_k: Optional[int] = None):
+        """
+        Initialize the passage selector
+
+        Args:
+            chunk_words: Approximate passage length in words
+            top_k: Passages kept per source
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.enabled = os.getenv("PASSAGE_SELECTION_ENABLED", "true").lower() == "true"
+        self.chunk_words = chunk_words or int(os.getenv("PASSAGE_CHUNK_WORDS", "120"))
+        self.top_k = top_k or int(os.getenv("PASSAGE_TOP_K", "4"))
+
+    @staticmethod
+    def query_terms(query: str, concepts: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Build weighted query terms, boosting words from recognised concepts
+
+        Args:
+            query: The query text
+            concepts: Medical concepts detected in the query
+
+        Returns:
+            Mapping of term to weight
+        """
+        terms: Dict[str, float] = {}
+        for token in tokenize(query):
+            terms[token] = 1.0
+        for concept in concepts or []:
+            for token in tokenize(concept):
+                terms[token] = 2.0
+        return terms
+
+    def select(self,
+               query: str,
+               extracted_contents: List[Dict[str, Any]],
+               concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Reduce each extracted content to its most query-relevant passages
+
+        Args:
+            query: The query text
+            extracted_contents: List of extracted content dictionaries
+            concepts: Medical concepts detected in the query
+
+        Returns:
+            New list of content dictionaries with trimmed "content"
+        """
+        if not self.enabled:
+            return extracted_contents
+
+        terms = self.query_terms(query, concepts)
+        if not terms:
+            return extracted_contents
+
+        selected_contents = []
+        for content in extracted_contents:
+            text = content.get("content") or ""
+            passages = chunk_text(text, self.chunk_words)
+            if len(passages) <= self.top_k:
+                selected_contents.append(content)
+                continue
+
+            scores = bm25_scores([tokenize(p) for p in passages], terms)
+            # Keep the best passages but present them in document order
+            keep = np.sort(np.argsort(-scores, kind="stable")[:self.top_k])
+
+            trimmed = dict(content)
+            trimmed["content"] = "\n...\n".join(passages[i] for i in keep)
+            trimmed["passages_selected"] = int(len(keep))
+            trimmed["passages_total"] = len(passages)
+            selected_contents.append(trimmed)
+
+        return selected_contents
@@ -0,0 +1,142 @@
+from typing import Dict, List
+from string import Template
+from app.core.intent import INTENT_PROFILES, DEFAULT_INTENT
+
+
+class PromptTemplate:
+    """
+    A chat prompt split into a static system prefix and a variable user part.
+
+    The system message is fixed text built once per process, so every request
+    with the same template starts with byte-identical tokens. Only the user
+    message, placed last, changes per request.
+
+    The current system prefixes are about 200 tokens, below the 1024-token
+    minimum of OpenAI's automatic prompt caching, so they are not cached yet
+    and cached_tokens stays 0. Keeping the prefix static means a cache applies
+    as soon as the instructions grow past the threshold, or with a provider
+    that caches shorter prefixes.
+    """
+
+    def __init__(self, system: str, user: str):
+        """
+        Compile the template
+
+        Args:
+            system: Static system message (instructions)
+            user: User message with $placeholders for per-request fields
+        """
+        self.system = system.strip()
+        self.user = Template(user.strip() + "\n")
+
+    def messages(self, **fields: str) -> List[Dict[str, str]]:
+        """
+        Render the chat messages for one request
+
+        Args:
+            **fields: Values for the user message placeholders
+
+        Returns:
+            System and user messages
+        """
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.substitute(**fields)}
+        ]
+
+
+MEDICAL_INSTRUCTIONS = """
+You are a gastroenterology expert assistant providing concise, accurate medical information with proper citations.
+You answer a query using the sources from medical literature that follow it.
+
+INSTRUCTIONS:
+1. Only include medical facts directly supported by the sources
+2. Be brief and crisp - focus on the most relevant information
+3. Use clear medical terminology for healthcare professionals
+4. Cite sources using [SOURCE X] notation after each fact
+5. If sources conflict, present both perspectives
+6. If information is limited, state this clearly
+7. Avoid personal opinions or unsupported recommendations
+8. Use bullet points for readability when appropriate
+9. $length_rule
+10. Focus on the direct answer to the query
+"""
+
+MEDICAL_USER_TEMPLATE = """
+SOURCES:
+
+$context
+
+QUERY: $query
+
+YOUR RESPONSE:
+"""
+
+# One template per intent; each has its own static prefix with the intent's length rule
+MEDICAL_SUMMARY_PROMPTS: Dict[str, PromptTemplate] = {
+    intent: PromptTemplate(
+        system=Template(MEDICAL_INSTRUCTIONS).substitute(length_rule=profile["length_rule"]),
+        user=MEDICAL_USER_TEMPLATE
+    )
+    for intent, profile in INTENT_PROFILES.items()
+}
+MEDICAL_SUMMARY_PROMPT = MEDICAL_SUMMARY_PROMPTS[DEFAULT_INTENT]
+
+# Map-reduce summarization: each source is condensed on its own, then the notes are merged
+MAP_INSTRUCTIONS = """
+You are a gastroenterology expert assistant extracting evidence from one medical source.
+
+INSTRUCTIONS:
+1. List only the facts from the source that help answer the query
+2. Write 1-5 short bullet points, most important first
+3. End every bullet with the source's citation exactly as given, e.g. [SOURCE 2]
+4. Keep numbers, doses, intervals and recommendation strengths exactly as stated
+5. If the source has nothing relevant, reply with exactly: NO RELEVANT INFORMATION
+"""
+
+MAP_PROMPT = PromptTemplate(
+    system=MAP_INSTRUCTIONS,
+    user="""
+CITATION: [SOURCE $number]
+
+$context
+
+QUERY: $query
+
+RELEVANT FACTS:
+"""
+)
+
+# Reply used by a map step for sources that do not address the query
+MAP_NO_INFORMATION = "NO RELEVANT INFORMATION"
+
+REDUCE_INSTRUCTIONS = """
+You are a gastroenterology expert assistant providing concise, accurate medical information with proper citations.
+You answer a query by merging evidence notes, each already cited to its source.
+
+INSTRUCTIONS:
+1. Only include facts stated in the notes
+2. Keep the [SOURCE X] citations from the notes exactly as written, after each fact
+3. Combine facts that agree and cite every source that supports them
+4. If notes conflict, present both perspectives
+5. If the evidence is limited, state this clearly
+6. Use clear medical terminology for healthcare professionals
+7. $length_rule
+8. Focus on the direct answer to the query
+"""
+
+REDUCE_PROMPTS: Dict[str, PromptTemplate] = {
+    intent: PromptTemplate(
+        system=Template(REDUCE_INSTRUCTIONS).substitute(length_rule=profile["length_rule"]),
+        user="""
+EVIDENCE NOTES:
+
+$notes
+
+QUERY: $query
+
+YOUR RESPONSE:
+"""
+    )
+    for intent, profile in INTENT_PROFILES.items()
+}
@@ -0,0 +1,201 @@
+from typing import Dict, List, Any, Optional
+import os
+import json
+import logging
+import threading
+from datetime import date, datetime, timezone
+from dotenv import load_dotenv
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "cached_tokens", "total_tokens")
+
+
+def empty_usage() -> Dict[str, int]:
+    """Usage record with every counter at zero"""
+    return {field: 0 for field in USAGE_FIELDS}
+
+
+def usage_from_response(response: Any) -> Optional[Dict[str, int]]:
+    """
+    Read token usage reported by the provider on a chat completion
+
+    Cached prompt tokens come from usage.prompt_tokens_details.cached_tokens
+    where the provider reports them, and count as 0 otherwise.
+
+    Args:
+        response: SDK chat completion response
+
+    Returns:
+        Dictionary of token counts, or None if the response carries no usage
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+
+    def as_int(value) -> int:
+        return value if isinstance(value, int) else 0
+
+    prompt_tokens = as_int(getattr(usage, "prompt_tokens", 0))
+    completion_tokens = as_int(getattr(usage, "completion_tokens", 0))
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = as_int(getattr(details, "cached_tokens", 0)) if details is not None else 0
+    total_tokens = as_int(getattr(usage, "total_tokens", 0)) or prompt_tokens + completion_tokens
+
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cached_tokens": cached_tokens,
+        "total_tokens": total_tokens
+    }
+
+
+def combine_usage(usages: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Add up several usage records
+
+    Args:
+        usages: Usage dictionaries (missing counters count as 0)
+
+    Returns:
+        Summed usage
+    """
+    combined = empty_usage()
+    for usage in usages:
+        for field in USAGE_FIELDS:
+            combined[field] += int(usage.get(field, 0) or 0)
+    return combined
+
+
+def request_usage(knowledge_results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aggregate the token usage of one request from KnowledgeRouter.retrieve results
+
+    Args:
+        knowledge_results: Results keyed by need
+
+    Returns:
+        Summed usage plus a per-model/stage breakdown
+    """
+    records = []
+    for need_result in knowledge_results.values():
+        summary = need_result.get("summarized_response") if isinstance(need_result, dict) else None
+        if summary and summary.get("usage"):
+            records.extend(summary["usage"].get("calls", []))
+
+    by_model_stage: Dict[str, Dict[str, int]] = {}
+    for record in records:
+        key = f"{record.get('model')}/{record.get('stage')}"
+        by_model_stage[key] = combine_usage([by_model_stage.get(key, empty_usage()), record])
+
+    totals = combine_usage(records)
+    totals["by_model_stage"] = by_model_stage
+    return totals
+
+
+class TokenUsageTracker:
+    """
+    Aggregates provider-reported token usage per day, model and stage.
+
+    Daily totals are kept in memory for a retention window. When
+    TOKEN_USAGE_LOG is set, every call is also appended to that JSONL file so
+    usage survives restarts and can be analysed offline.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, retention_days: Optional[int] = None):
+        """
+        Initialize the tracker
+
+        Args:
+            log_path: JSONL file receiving one line per call (None disables the log)
+            retention_days: Number of days of aggregates kept in memory
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.log_path = log_path if log_path is not None else (os.getenv("TOKEN_USAGE_LOG") or None)
+        self.retention_days = retention_days or int(os.getenv("TOKEN_USAGE_RETENTION_DAYS", "30"))
+        self.logger = logging.getLogger(__name__)
+        self._days: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+        if self.log_path and os.path.dirname(self.log_path):
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+
+    def record(self, model: str, stage: str, usage: Dict[str, int], day: Optional[date] = None) -> None:
+        """
+        Add one call's usage to the daily aggregates
+
+        Args:
+            model: Model that served the call
+            stage: Pipeline stage that made the call (e.g. "summarize")
+            usage: Token counts from usage_from_response
+            day: Day to book the usage on (defaults to today, UTC)
+        """
+        now = datetime.now(timezone.utc)
+        day_key = (day or now.date()).isoformat()
+        key = f"{model}/{stage}"
+
+        with self._lock:
+            buckets = self._days.setdefault(day_key, {})
+            current = buckets.get(key, dict(empty_usage(), calls=0))
+            for field in USAGE_FIELDS:
+                current[field] += int(usage.get(field, 0) or 0)
+            current["calls"] += 1
+            buckets[key] = current
+
+            # Drop the oldest days beyond the retention window
+            for old_day in sorted(self._days)[:-self.retention_days]:
+                del self._days[old_day]
+
+            if self.log_path:
+                try:
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps({"time": now.isoformat(), "model": model, "stage": stage, **usage}) + "\n")
+                except OSError as e:
+                    self.logger.warning(f"Could not write token usage log: {str(e)}")
+
+    def daily(self, day: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Report one day's usage
+
+        Args:
+            day: Day to report (defaults to today, UTC)
+
+        Returns:
+            Totals for the day (including the cached share of prompt tokens)
+            plus a per-model/stage breakdown
+        """
+        day_key = (day or datetime.now(timezone.utc).date()).isoformat()
+        with self._lock:
+            buckets = {key: dict(value) for key, value in self._days.get(day_key, {}).items()}
+
+        totals = combine_usage(list(buckets.values()))
+        totals["calls"] = sum(value["calls"] for value in buckets.values())
+        # Share of prompt tokens served from the provider's prefix cache
+        totals["cached_ratio"] = totals["cached_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0
+        return {"day": day_key, "totals": totals, "by_model_stage": buckets}
+
+    def days(self) -> List[str]:
+        """Days with recorded usage, oldest first"""
+        with self._lock:
+            return sorted(self._days)
+
+
+# Shared tracker so usage from every summarizer lands in one place
+_default_tracker: Optional[TokenUsageTracker] = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_usage_tracker() -> TokenUsageTracker:
+    """
+    Return the process-wide token usage tracker
+
+    Returns:
+        The shared TokenUsageTracker instance
+    """
+    global _default_tracker
+
+    if _default_tracker is None:
+        with _default_tracker_lock:
+            if _default_tracker is None:
+                _default_tracker = TokenUsageTracker()
+    return _default_tracker
@@ -0,0 +1,123 @@
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Callable, TypeVar
+import os
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of at most size items without materializing it
+
+    Args:
+        items: Items to split
+        size: Items per chunk
+
+    Returns:
+        Iterator over chunks
+    """
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def map_chunks(fn: Callable[[List[T]], List[R]],
+               items: Iterable[T],
+               chunk_size: int = 1000,
+               workers: Optional[int] = None) -> Iterator[R]:
+    """
+    Apply a chunk function to a stream of items, optionally in worker processes
+
+    Results come back in input order. With workers, at most two chunks per
+    worker are in flight, so memory stays flat however long the input is.
+
+    Args:
+        fn: Picklable module-level function mapping a chunk to its results
+        items: Input items
+        chunk_size: Items sent to fn at a time
+        workers: Worker processes (None or 1 runs in this process, 0 uses every CPU)
+
+    Returns:
+        Iterator over results
+    """
+    if workers is None or workers == 1:
+        for chunk in chunked(items, chunk_size):
+            yield from fn(chunk)
+        return
+
+    max_workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for chunk in chunked(items, chunk_size):
+            pending.append(executor.submit(fn, chunk))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_records(records: Iterable[Dict[str, Any]],
+                  path: str,
+                  output_format: Optional[str] = None,
+                  chunk_size: int = 10000,
+                  schema: Any = None) -> int:
+    """
+    Stream records to a JSONL or Parquet file
+
+    Parquet output needs pyarrow and is written one row group per chunk.
+
+    Args:
+        records: Records to write
+        path: Output path
+        output_format: "jsonl" or "parquet" (inferred from the extension if None)
+        chunk_size: Records per Parquet row group
+        schema: pyarrow schema for Parquet output (inferred from the first chunk if None)
+
+    Returns:
+        Number of records written
+    """
+    output_format = output_format or ("parquet" if path.endswith(".parquet") else "jsonl")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    count = 0
+    if output_format == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    if output_format != "parquet":
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.error("pyarrow package not found. Install with: pip install pyarrow")
+        raise
+
+    writer = None
+    try:
+        for chunk in chunked(records, chunk_size):
+            table = pa.Table.from_pylist(chunk, schema=schema)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            count += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
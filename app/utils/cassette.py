@@ -0,0 +1,360 @@
+from typing import Dict, Any, Callable, Optional
+import os
+import json
+import time
+import hashlib
+import importlib
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+# Fields that must never be written to a cassette or used in its key
+_SECRET_FIELDS = {"api_key", "authorization", "x-api-key"}
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recording exists for a request"""
+
+
+class RecordedError(RuntimeError):
+    """
+    Replayed provider error whose original exception class cannot be imported
+    """
+
+    def __init__(self, message: str, error_type: str = "", status_code: Optional[int] = None):
+        super().__init__(message)
+        self.error_type = error_type
+        self.status_code = status_code
+
+
+class RecordedResponse:
+    """
+    Minimal stand-in for requests.Response built from a cassette entry
+    """
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict[str, str]] = None, url: str = ""):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers or {}
+        self.url = url
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        import requests
+
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class CassetteStore:
+    """
+    Content-addressed store of recorded calls, one JSON file per request key
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory holding the cassette files
+        """
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry stored under key, or None"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, key: str, entry: Dict[str, Any]) -> None:
+        """Write an entry atomically under key"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+
+def _sanitize(value: Any) -> Any:
+    """Recursively drop secret fields from a request description"""
+    if isinstance(value, dict):
+        return {k: _sanitize(v) for k, v in value.items() if str(k).lower() not in _SECRET_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_sanitize(v) for v in value]
+    return value
+
+
+def _to_namespace(value: Any) -> Any:
+    """Turn recorded JSON back into attribute-accessible objects (SDK response style)"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+def _describe_error(error: Exception) -> Dict[str, Any]:
+    """Record an exception's class, message, HTTP status and response headers"""
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None)
+    if not isinstance(status_code, int):
+        status_code = getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None)
+    return {
+        "type": type(error).__name__,
+        "class": f"{type(error).__module__}.{type(error).__qualname__}",
+        "message": str(error),
+        "status_code": status_code if isinstance(status_code, int) else None,
+        "headers": {str(k): str(v) for k, v in dict(headers).items()} if headers else {}
+    }
+
+
+def _rebuild_error(error: Dict[str, Any]) -> Exception:
+    """
+    Rebuild a recorded exception so replays exercise the same error handling
+
+    The original class is re-imported and given the recorded message, status
+    code and a response carrying the recorded headers (e.g. Retry-After).
+    Classes whose constructor needs more than a message (SDK status errors)
+    are created without calling it. If the class cannot be imported, a
+    RecordedError with the same status code is returned instead.
+    """
+    message = error.get("message", "")
+    status_code = error.get("status_code")
+    module_name, _, qualname = error.get("class", "").rpartition(".")
+    try:
+        error_class = getattr(importlib.import_module(module_name), qualname)
+        if not (isinstance(error_class, type) and issubclass(error_class, Exception)):
+            raise TypeError(f"{error['class']} is not an exception class")
+    except (ImportError, AttributeError, TypeError, ValueError):
+        return RecordedError(message, error.get("type", ""), status_code)
+
+    try:
+        rebuilt = error_class(message)
+    except Exception:
+        rebuilt = error_class.__new__(error_class)
+        Exception.__init__(rebuilt, message)
+
+    if status_code is not None:
+        response = RecordedResponse(status_code, "", error.get("headers"))
+        for name, value in (("status_code", status_code), ("response", response)):
+            if getattr(rebuilt, name, None) is None:
+                try:
+                    setattr(rebuilt, name, value)
+                except AttributeError:
+                    pass
+    return rebuilt
+
+
+class Cassette:
+    """
+    Record/replay layer for outbound provider calls.
+
+    Modes:
+        off: calls go straight to the provider
+        record: calls go to the provider and their responses are stored
+        replay: responses are served from the store, no network access
+    """
+
+    def __init__(self,
+                 mode: Optional[str] = None,
+                 directory: Optional[str] = None,
+                 latency: Optional[str] = None):
+        """
+        Initialize the cassette
+
+        Args:
+            mode: "off", "record" or "replay"
+            directory: Directory for cassette files
+            latency: Replay latency: "recorded" (original timing), "none", or a fixed number of milliseconds
+        """
+        # Load environment variables from .env file
+        load_dotenv()
+
+        self.mode = (mode or os.getenv("CASSETTE_MODE", "off")).lower()
+        if self.mode not in ["off", "record", "replay"]:
+            raise ValueError(f"Unsupported CASSETTE_MODE: {self.mode}. Use 'off', 'record' or 'replay'")
+
+        self.store = CassetteStore(directory or os.getenv("CASSETTE_DIR", "cassettes"))
+        self.latency = (latency or os.getenv("CASSETTE_LATENCY", "recorded")).lower()
+        self.latency_scale = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def request_key(kind: str, request: Dict[str, Any]) -> str:
+        """
+        Compute the content address for a request
+
+        Args:
+            kind: Provider family, e.g. "http", "duckduckgo" or "llm"
+            request: Sanitized description of the request
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        canonical = json.dumps({"kind": kind, "request": request}, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _replay_delay(self, entry: Dict[str, Any]) -> None:
+        """Sleep according to the configured replay latency"""
+        if self.latency == "none":
+            return
+        if self.latency == "recorded":
+            delay = float(entry.get("elapsed", 0.0))
+        else:
+            delay = float(self.latency) / 1000.0
+        delay *= self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+    def call(self,
+             kind: str,
+             request: Dict[str, Any],
+             fn: Callable[[], Any],
+             serialize: Callable[[Any], Any] = lambda r: r,
+             deserialize: Callable[[Any], Any] = lambda r: r) -> Any:
+        """
+        Run a provider call through the cassette
+
+        Args:
+            kind: Provider family used to namespace keys
+            request: Description of the request (secrets are stripped)
+            fn: Zero-argument callable that performs the real call
+            serialize: Converts the live response into JSON-compatible data
+            deserialize: Rebuilds a response object from recorded data
+
+        Returns:
+            The live response (off/record) or the replayed response (replay)
+        """
+        if self.mode == "off":
+            return fn()
+
+        request = _sanitize(request)
+        key = self.request_key(kind, request)
+
+        if self.mode == "replay":
+            entry = self.store.load(key)
+            if entry is None:
+                raise CassetteMissError(f"No cassette recording for {kind} request {key[:12]}")
+            self._replay_delay(entry)
+            if "error" in entry:
+                raise _rebuild_error(entry["error"])
+            return deserialize(entry["response"])
+
+        start = time.perf_counter()
+        try:
+            response = fn()
+        except Exception as e:
+            self.store.save(key, {
+                "kind": kind,
+                "request": request,
+                "error": _describe_error(e),
+                "elapsed": time.perf_counter() - start,
+                "recorded_at": time.time()
+            })
+            raise
+        self.store.save(key, {
+            "kind": kind,
+            "request": request,
+            "response": serialize(response),
+            "elapsed": time.perf_counter() - start,
+            "recorded_at": time.time()
+        })
+        return response
+
+    def http(self, method: str, url: str, provider: bool = False, **kwargs) -> Any:
+        """
+        Make an HTTP request with the requests library through the cassette
+
+        Args:
+            method: HTTP method name ("get", "post", "head")
+            url: Request URL
+            provider: Key on the URL path only, so recordings of a provider API
+                stay valid when its base URL is pointed elsewhere
+            **kwargs: Keyword arguments for requests (headers, json, timeout, ...)
+
+        Returns:
+            A requests.Response, or a RecordedResponse when replaying
+        """
+        import requests
+
+        method = method.lower()
+        request = {
+            "method": method,
+            "url": urlsplit(url).path if provider else url,
+            "json": kwargs.get("json"),
+            "params": kwargs.get("params")
+        }
+
+        def serialize(response):
+            return {
+                "status_code": response.status_code,
+                "headers": dict(response.headers or {}),
+                "text": response.text
+            }
+
+        def deserialize(data):
+            return RecordedResponse(data["status_code"], data["text"], data.get("headers"), url)
+
+        return self.call(
+            "http",
+            request,
+            lambda: getattr(requests, method)(url, **kwargs),
+            serialize=serialize,
+            deserialize=deserialize
+        )
+
+    def llm(self, create: Callable[..., Any], **request) -> Any:
+        """
+        Make a chat completion call through the cassette
+
+        Args:
+            create: The SDK's chat.completions.create method
+            **request: Keyword arguments for the completion request
+
+        Returns:
+            The SDK response, or an attribute-accessible replay of it
+        """
+        def serialize(response):
+            if hasattr(response, "model_dump"):
+                return response.model_dump()
+            return response
+
+        return self.call(
+            "llm",
+            request,
+            lambda: create(**request),
+            serialize=serialize,
+            deserialize=_to_namespace
+        )
+
+
+# Shared cassette configured from the environment
+_default_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Cassette:
+    """
+    Return the process-wide cassette configured from CASSETTE_* variables
+
+    Returns:
+        The shared Cassette instance
+    """
+    global _default_cassette
+
+    if _default_cassette is None:
+        _default_cassette = Cassette()
+    return _default_cassette
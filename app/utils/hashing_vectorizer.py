@@ -0,0 +1,116 @@
+from typing import Dict, List, Tuple, Iterable
+import re
+import zlib
+import numpy as np
+from functools import lru_cache
+from app.utils.term_matcher import normalize_text
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingVectorizer:
+    """
+    Maps text to a fixed-size sparse vector without a vocabulary.
+
+    Word unigrams, word bigrams and character 4-grams of each word are hashed
+    with CRC32 (stable across processes) into n_features buckets with a
+    random sign, then scaled by 1/sqrt(number of features). Character n-grams
+    let "treated" share features with "treatment".
+    """
+
+    def __init__(self, n_features: int = 2 ** 13, char_ngram: int = 4):
+        """
+        Initialize the vectorizer
+
+        Args:
+            n_features: Number of hash buckets
+            char_ngram: Length of the character n-grams taken from each word
+        """
+        self.n_features = n_features
+        self.char_ngram = char_ngram
+
+    def units(self, text: str) -> List[str]:
+        """
+        Split a text into words and adjacent word pairs
+
+        Every feature belongs to exactly one unit, so per-unit results can be
+        memoized and summed.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            Words followed by space-joined word pairs
+        """
+        tokens = _TOKEN_RE.findall(normalize_text(text))
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def unit_hashes(self, unit: str) -> Tuple[int, ...]:
+        """
+        Hash the features of one unit
+
+        Args:
+            unit: A word or a space-joined word pair
+
+        Returns:
+            CRC32 of each feature (bucket is hash % n_features, sign is the top bit)
+        """
+        if " " in unit:
+            return (_gram_hash(f"b:{unit}"),)
+        return _word_hashes(unit, self.char_ngram)
+
+    def transform_one(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Featurize one text
+
+        Args:
+            text: Text to featurize
+
+        Returns:
+            Tuple of (bucket indexes, values) of the non-zero features
+        """
+        hashes = [h for unit in self.units(text) for h in self.unit_hashes(unit)]
+
+        buckets: Dict[int, float] = {}
+        for h in hashes:
+            index = h % self.n_features
+            buckets[index] = buckets.get(index, 0.0) + feature_sign(h)
+
+        indexes = np.fromiter(buckets.keys(), dtype=np.int64, count=len(buckets))
+        values = np.fromiter(buckets.values(), dtype=np.float32, count=len(buckets))
+        return indexes, values / np.sqrt(max(len(hashes), 1))
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Featurize texts into a dense matrix
+
+        Args:
+            texts: Texts to featurize
+
+        Returns:
+            Matrix of shape (len(texts), n_features)
+        """
+        rows = [self.transform_one(text) for text in texts]
+        matrix = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        for i, (indexes, values) in enumerate(rows):
+            np.add.at(matrix[i], indexes, values)
+        return matrix
+
+
+def feature_sign(h: int) -> float:
+    """Feature sign taken from the top bit of its hash"""
+    return 1.0 if h & 0x80000000 else -1.0
+
+
+@lru_cache(maxsize=65536)
+def _gram_hash(gram: str) -> int:
+    """CRC32 of a feature string, stable across processes"""
+    return zlib.crc32(gram.encode("utf-8"))
+
+
+@lru_cache(maxsize=65536)
+def _word_hashes(word: str, n: int) -> Tuple[int, ...]:
+    """Hashes of a word's unigram and boundary-padded character n-gram features"""
+    padded = f"<{word}>"
+    grams = [f"w:{word}"] + [f"c:{padded[i:i + n]}" for i in range(max(len(padded) - n + 1, 1))]
+    return tuple(_gram_hash(gram) for gram in grams)
@@ -0,0 +1,388 @@
+"""
+Local stand-in for the external providers used by the pipeline.
+
+Implements the Tavily search/extract endpoints and an OpenAI-compatible
+/chat/completions endpoint (including streaming) with configurable latency,
+error-rate and throttling profiles, so the API can be load-tested without
+spending provider credits.
+
+Run from the command line:
+
+    python -m app.utils.provider_stub --port 8765 --search-latency lognormal:800:0.4 --error-rate 0.02
+
+then point the pipeline at it:
+
+    TAVILY_API_BASE=http://127.0.0.1:8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    GROQ_BASE_URL=http://127.0.0.1:8765
+"""
+
+from typing import Optional
+import os
+import json
+import time
+import random
+import socket
+import asyncio
+import hashlib
+import argparse
+import threading
+import contextlib
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.utils.rate_limiter import TokenBucket
+
+
+class LatencyProfile:
+    """
+    Latency distribution parsed from a spec string.
+
+    Supported specs (all values in milliseconds):
+        fixed:MS
+        uniform:MIN:MAX
+        normal:MEAN:STD
+        lognormal:MEDIAN:SIGMA
+    """
+
+    def __init__(self, spec: str = "fixed:0", rng: Optional[random.Random] = None):
+        """
+        Initialize the profile
+
+        Args:
+            spec: Distribution spec string
+            rng: Random generator (seeded for reproducible runs)
+        """
+        parts = spec.split(":")
+        self.kind = parts[0].lower()
+        self.params = [float(p) for p in parts[1:]]
+        self.rng = rng or random.Random()
+
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        """
+        Draw one latency
+
+        Returns:
+            Latency in seconds (never negative)
+        """
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = self.rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            ms = self.rng.gauss(self.params[0], self.params[1])
+        else:
+            ms = self.params[0] * self.rng.lognormvariate(0.0, self.params[1])
+        return max(ms, 0.0) / 1000.0
+
+
+class StubProfile:
+    """
+    Behaviour settings for the stand-in server
+    """
+
+    def __init__(self,
+                 search_latency: str = "fixed:0",
+                 extract_latency: str = "fixed:0",
+                 chat_latency: str = "fixed:0",
+                 token_latency: str = "fixed:0",
+                 error_rate: float = 0.0,
+                 rate_limit: float = 0.0,
+                 burst: float = 10.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the profile
+
+        Args:
+            search_latency: Latency spec for /search
+            extract_latency: Latency spec for /extract
+            chat_latency: Latency spec for a chat completion (time to first token when streaming)
+            token_latency: Latency spec between streamed tokens
+            error_rate: Fraction of requests answered with a 5xx error
+            rate_limit: Requests per second before answering 429 (0 disables throttling)
+            burst: Token bucket capacity for the rate limit
+            seed: Seed for reproducible latency and error sampling
+        """
+        self.rng = random.Random(seed)
+        self.search_latency = LatencyProfile(search_latency, self.rng)
+        self.extract_latency = LatencyProfile(extract_latency, self.rng)
+        self.chat_latency = LatencyProfile(chat_latency, self.rng)
+        self.token_latency = LatencyProfile(token_latency, self.rng)
+        self.error_rate = error_rate
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit > 0 else None
+
+    @classmethod
+    def from_env(cls) -> "StubProfile":
+        """Build a profile from STUB_* environment variables"""
+        seed = os.getenv("STUB_SEED")
+        return cls(
+            search_latency=os.getenv("STUB_SEARCH_LATENCY", "fixed:0"),
+            extract_latency=os.getenv("STUB_EXTRACT_LATENCY", "fixed:0"),
+            chat_latency=os.getenv("STUB_CHAT_LATENCY", "fixed:0"),
+            token_latency=os.getenv("STUB_TOKEN_LATENCY", "fixed:0"),
+            error_rate=float(os.getenv("STUB_ERROR_RATE", "0")),
+            rate_limit=float(os.getenv("STUB_RATE_LIMIT", "0")),
+            burst=float(os.getenv("STUB_BURST", "10")),
+            seed=int(seed) if seed else None
+        )
+
+
+def _fake_text(seed_text: str, sentences: int = 6) -> str:
+    """Build deterministic filler text that mentions the query"""
+    digest = int(hashlib.sha1(seed_text.encode("utf-8")).hexdigest(), 16)
+    templates = [
+        "Current guidelines describe {q} as a common presentation in gastroenterology practice.",
+        "First-line management of {q} is supported by randomized controlled trials.",
+        "Diagnostic evaluation of {q} typically begins with history and targeted testing.",
+        "Endoscopic assessment may be indicated for {q} when alarm features are present.",
+        "Long-term outcomes in {q} depend on adherence and follow-up.",
+        "Recent consensus statements on {q} emphasise individualized therapy.",
+        "Risk factors associated with {q} include age, medication use and comorbidities."
+    ]
+    return " ".join(templates[(digest + i) % len(templates)].format(q=seed_text) for i in range(sentences))
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+def create_stub_app(profile: Optional[StubProfile] = None) -> FastAPI:
+    """
+    Create the stand-in provider application
+
+    Args:
+        profile: Behaviour settings (defaults to STUB_* environment variables)
+
+    Returns:
+        FastAPI application
+    """
+    profile = profile or StubProfile.from_env()
+    app = FastAPI(title="GastroAssist Provider Stub")
+    app.state.profile = profile
+    app.state.request_count = 0
+
+    def _fault() -> Optional[JSONResponse]:
+        """Return a throttling or error response if the profile calls for one"""
+        app.state.request_count += 1
+        if profile.limiter is not None:
+            wait = profile.limiter.try_acquire()
+            if wait > 0:
+                return JSONResponse(
+                    status_code=429,
+                    content={"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                    headers={"Retry-After": f"{max(wait, 0.001):.3f}"}
+                )
+        if profile.error_rate > 0 and profile.rng.random() < profile.error_rate:
+            return JSONResponse(
+                status_code=503,
+                content={"error": {"message": "Service temporarily unavailable", "type": "server_error"}}
+            )
+        return None
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "requests": app.state.request_count}
+
+    @app.post("/search")
+    async def search(request: Request):
+        fault = _fault()
+        if fault is not None:
+            return fault
+        payload = await request.json()
+        latency = profile.search_latency.sample()
+        await asyncio.sleep(latency)
+
+        query = payload.get("query", "")
+        max_results = int(payload.get("max_results", 5))
+        slug = hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+        results = []
+        for i in range(max_results):
+            result = {
+                "title": f"{query.title()} - Stub Source {i+1}",
+                "url": f"https://stub.example.org/{slug}/{i+1}",
+                "content": _fake_text(query, 2),
+                "score": round(0.95 - i * 0.05, 2)
+            }
+            if payload.get("include_raw_content"):
+                result["raw_content"] = _fake_text(f"{query} {i}", 40)
+            results.append(result)
+
+        return {"query": query, "results": results, "response_time": latency}
+
+    @app.post("/extract")
+    async def extract(request: Request):
+        fault = _fault()
+        if fault is not None:
+            return fault
+        payload = await request.json()
+        await asyncio.sleep(profile.extract_latency.sample())
+
+        urls = payload.get("urls", [])
+        if isinstance(urls, str):
+            urls = [urls]
+        return {
+            "results": [{"url": url, "raw_content": _fake_text(url, 40)} for url in urls],
+            "failed_results": []
+        }
+
+    async def chat_completions(request: Request):
+        fault = _fault()
+        if fault is not None:
+            return fault
+        payload = await request.json()
+        model = payload.get("model", "stub-model")
+        messages = payload.get("messages", [])
+        prompt_text = " ".join(str(m.get("content", "")) for m in messages)
+        max_tokens = int(payload.get("max_tokens") or 256)
+
+        words = _fake_text(messages[-1].get("content", "")[:80] if messages else "query", 5).split()
+        words = words[:max_tokens]
+        words[-1] = words[-1] + " [SOURCE 1]"
+        completion_id = f"chatcmpl-stub-{int(time.time() * 1000)}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": _estimate_tokens(prompt_text),
+            "completion_tokens": len(words),
+            "total_tokens": _estimate_tokens(prompt_text) + len(words),
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+
+        await asyncio.sleep(profile.chat_latency.sample())
+
+        if not payload.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+
+        async def event_stream():
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": word} if i == 0 else {"content": f" {word}"},
+                        "finish_reason": None
+                    }]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(profile.token_latency.sample())
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    # OpenAI clients post to {base_url}/chat/completions; Groq adds /openai/v1
+    for path in ["/chat/completions", "/v1/chat/completions", "/openai/v1/chat/completions"]:
+        app.add_api_route(path, chat_completions, methods=["POST"])
+
+    return app
+
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def run_stub_server(profile: Optional[StubProfile] = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run the stand-in server in a background thread
+
+    Args:
+        profile: Behaviour settings
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Yields:
+        Base URL of the running server, e.g. "http://127.0.0.1:54321"
+    """
+    import uvicorn
+
+    port = port or _free_port(host)
+    config = uvicorn.Config(create_stub_app(profile), host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("Provider stub server failed to start")
+        time.sleep(0.01)
+
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run a local stand-in for Tavily and OpenAI-compatible LLM APIs.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind")
+    parser.add_argument("--search-latency", type=str, default=os.getenv("STUB_SEARCH_LATENCY", "fixed:0"),
+                        help="Latency spec for /search, e.g. lognormal:800:0.4")
+    parser.add_argument("--extract-latency", type=str, default=os.getenv("STUB_EXTRACT_LATENCY", "fixed:0"),
+                        help="Latency spec for /extract")
+    parser.add_argument("--chat-latency", type=str, default=os.getenv("STUB_CHAT_LATENCY", "fixed:0"),
+                        help="Latency spec for chat completions (time to first token when streaming)")
+    parser.add_argument("--token-latency", type=str, default=os.getenv("STUB_TOKEN_LATENCY", "fixed:0"),
+                        help="Latency spec between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("STUB_ERROR_RATE", "0")),
+                        help="Fraction of requests answered with HTTP 503")
+    parser.add_argument("--rate-limit", type=float, default=float(os.getenv("STUB_RATE_LIMIT", "0")),
+                        help="Requests per second before answering HTTP 429 (0 disables)")
+    parser.add_argument("--burst", type=float, default=float(os.getenv("STUB_BURST", "10")),
+                        help="Burst size for the rate limit")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible sampling")
+    return parser.parse_args()
+
+
+def main():
+    """Run the stand-in server from the command line"""
+    import uvicorn
+
+    args = parse_arguments()
+    profile = StubProfile(
+        search_latency=args.search_latency,
+        extract_latency=args.extract_latency,
+        chat_latency=args.chat_latency,
+        token_latency=args.token_latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        seed=args.seed
+    )
+    uvicorn.run(create_stub_app(profile), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import time
+import asyncio
+import threading
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers
+    acquire one or more tokens and wait when the bucket is empty.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the token bucket
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens the bucket can hold
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens without blocking
+
+        Args:
+            tokens: Number of tokens needed
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            self._refill()
+            # Requests larger than the bucket are allowed once it is full
+            needed = min(tokens, self.capacity)
+            if self._tokens >= needed:
+                self._tokens -= tokens
+                return 0.0
+            return (needed - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting until they are available
+
+        Args:
+            tokens: Number of tokens needed
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the tokens were taken, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """
+        Take tokens from async code without blocking the event loop
+
+        Args:
+            tokens: Number of tokens needed
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, tokens: float = 1.0) -> None:
+        """Return tokens taken for work that did not go ahead"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the remote side signalled throttling"""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+
+class RequestTokenScheduler:
+    """
+    Admits calls under both a requests-per-minute and a tokens-per-minute limit.
+
+    Each call states its estimated token cost up front and waits until both
+    budgets can cover it, so concurrent workers queue instead of tripping the
+    provider's rate limits. When the provider throttles anyway, `pause` holds
+    every caller back for the Retry-After period.
+    """
+
+    def __init__(self, rpm: float, tpm: float):
+        """
+        Initialize the scheduler
+
+        Args:
+            rpm: Requests allowed per minute
+            tpm: Tokens (prompt plus completion) allowed per minute
+        """
+        self.requests = TokenBucket(rate=rpm / 60.0, capacity=rpm)
+        self.tokens = TokenBucket(rate=tpm / 60.0, capacity=tpm)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float) -> float:
+        """
+        Admit one call of the given token cost without blocking
+
+        Args:
+            tokens: Estimated tokens the call will consume
+
+        Returns:
+            0.0 if the call was admitted, otherwise the seconds to wait before retrying
+        """
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                return pause
+            # Check the token budget first so a request slot is never taken
+            # for a call that cannot run yet
+            wait = self.tokens.try_acquire(tokens)
+            if wait > 0:
+                return wait
+            wait = self.requests.try_acquire(1)
+            if wait > 0:
+                # Give the tokens back; the call is retried as a whole
+                self.tokens.release(tokens)
+                return wait
+            return 0.0
+
+    def acquire(self, tokens: float, timeout: Optional[float] = None) -> bool:
+        """
+        Admit one call, waiting until both budgets allow it
+
+        Args:
+            tokens: Estimated tokens the call will consume
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the call was admitted, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller, e.g. for the Retry-After period of a 429
+
+        Args:
+            seconds: How long to stop admitting calls
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.requests.drain()
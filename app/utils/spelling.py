@@ -0,0 +1,332 @@
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Set, AbstractSet
+import re
+from functools import lru_cache
+
+# Words the corrector considers: letters with inner apostrophes or hyphens
+_WORD_RE = re.compile(r"[a-z]+(?:['-][a-z]+)*")
+
+# Derivational endings dropped when comparing a word with its correction,
+# so "diabetes" and "diabetic" count as forms of one word
+_STEM_SUFFIXES = ("ies", "ics", "ing", "es", "ed", "ic", "al", "ly", "s", "y")
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+
+    Args:
+        a: First word
+        b: Second word
+        max_distance: Distances above this are reported as max_distance + 1
+
+    Returns:
+        Edit distance, capped at max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """
+    Every string obtained by deleting up to max_distance characters from a word
+
+    Args:
+        word: Word to delete from
+        max_distance: Most characters deleted
+
+    Returns:
+        Set of deletes, including the word itself
+    """
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+
+def inflection_bases(word: str) -> Set[str]:
+    """
+    Forms a word may be inflected from, e.g. "stages" -> "stage"
+
+    Args:
+        word: Lowercased word
+
+    Returns:
+        Candidate base forms (plural, past tense, -ing and -ly stripped)
+    """
+    bases = set()
+    if word.endswith("ies"):
+        bases.add(word[:-3] + "y")
+    if word.endswith("es"):
+        bases.add(word[:-2])
+    if word.endswith("s") and not word.endswith("ss"):
+        bases.add(word[:-1])
+    if word.endswith("ed"):
+        bases.update((word[:-2], word[:-1]))
+    if word.endswith("ing"):
+        bases.update((word[:-3], word[:-3] + "e"))
+    if word.endswith("ly"):
+        bases.add(word[:-2])
+    return {base for base in bases if len(base) >= 3}
+
+
+def stem(word: str) -> str:
+    """
+    Word with one derivational or inflectional ending removed
+
+    Args:
+        word: Lowercased word
+
+    Returns:
+        The word without its ending, keeping at least 4 letters
+    """
+    for suffix in _STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def is_variant(word: str, other: str) -> bool:
+    """
+    Whether two words are inflections or derivations of each other
+
+    Args:
+        word: Lowercased word
+        other: Lowercased word
+
+    Returns:
+        True for pairs such as "stages"/"stage" or "diabetes"/"diabetic"
+    """
+    return other in inflection_bases(word) or word in inflection_bases(other) or stem(word) == stem(other)
+
+
+class SpellingIndex:
+    """
+    Symmetric-delete (SymSpell) index for correcting misspelled words.
+
+    Every vocabulary word is stored under all of its deletes up to
+    max_distance characters. A misspelling within that distance shares at
+    least one delete with its target, so a lookup only generates the
+    misspelling's own deletes and checks the few words filed under them,
+    instead of comparing against the whole vocabulary.
+
+    The index is precomputed (see to_dict) and loaded from disk by the
+    Lexicon, so building it does not happen per process. The Lexicon also
+    attaches an English and medical dictionary: words found there, directly
+    or through an inflection, are spelled correctly and never changed.
+    """
+
+    def __init__(self,
+                 words: List[str],
+                 counts: List[int],
+                 index: Dict[str, List[int]],
+                 max_distance: int = 2,
+                 known_words: Iterable[str] = (),
+                 dictionary: AbstractSet[str] = frozenset()):
+        """
+        Initialize the index
+
+        Args:
+            words: Vocabulary words
+            counts: How often each word occurs in the vocabulary source (breaks ties)
+            index: Mapping of each delete to the indexes of the words it came from
+            max_distance: Largest edit distance the index supports
+            known_words: Correctly spelled words that are never corrected
+            dictionary: Dictionary words that are never corrected (shared, not serialized)
+        """
+        self.words = words
+        self.counts = counts
+        self.index = index
+        self.max_distance = max_distance
+        self.known = set(words) | set(known_words)
+        self.dictionary = dictionary
+
+        # Query words repeat heavily across a log
+        self.correct_word = lru_cache(maxsize=16384)(self._correct_word)
+
+    @classmethod
+    def build(cls,
+              words: Iterable[str],
+              max_distance: int = 2,
+              min_length: int = 4,
+              known_words: Iterable[str] = (),
+              dictionary: AbstractSet[str] = frozenset()) -> "SpellingIndex":
+        """
+        Build the index from a stream of vocabulary words
+
+        Args:
+            words: Vocabulary words, repeated as often as they occur
+            max_distance: Largest edit distance to support
+            min_length: Shorter words are left out of the index
+            known_words: Correctly spelled words that are never corrected
+            dictionary: Dictionary words that are never corrected
+
+        Returns:
+            The built index
+        """
+        positions: Dict[str, int] = {}
+        vocabulary: List[str] = []
+        counts: List[int] = []
+        for word in words:
+            if len(word) < min_length:
+                continue
+            if word not in positions:
+                positions[word] = len(vocabulary)
+                vocabulary.append(word)
+                counts.append(0)
+            counts[positions[word]] += 1
+
+        index: Dict[str, List[int]] = {}
+        for i, word in enumerate(vocabulary):
+            for delete in deletes(word, max_distance):
+                index.setdefault(delete, []).append(i)
+        return cls(vocabulary, counts, index, max_distance, known_words, dictionary)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the index for from_dict
+
+        Returns:
+            JSON-compatible dictionary
+        """
+        return {
+            "max_distance": self.max_distance,
+            "words": self.words,
+            "counts": self.counts,
+            "known_words": sorted(self.known - set(self.words)),
+            "index": self.index
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], dictionary: AbstractSet[str] = frozenset()) -> "SpellingIndex":
+        """
+        Load an index serialized by to_dict
+
+        Args:
+            data: Serialized index
+            dictionary: Dictionary words that are never corrected
+
+        Returns:
+            The loaded index
+        """
+        return cls(data["words"], data["counts"], data["index"], data["max_distance"], data["known_words"],
+                   dictionary)
+
+    def lookup(self, word: str, max_distance: int) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest vocabulary word
+
+        Ties on distance go to the word that occurs more often, then to the
+        earlier word.
+
+        Args:
+            word: Word to look up
+            max_distance: Largest accepted edit distance (capped at the index's)
+
+        Returns:
+            Tuple of (vocabulary word, distance), or None if nothing is close enough
+        """
+        max_distance = min(max_distance, self.max_distance)
+        candidates = {i for delete in deletes(word, max_distance) for i in self.index.get(delete, ())}
+
+        best = None
+        for i in candidates:
+            distance = edit_distance(word, self.words[i], max_distance)
+            if distance <= max_distance:
+                key = (distance, -self.counts[i], i)
+                if best is None or key < best:
+                    best = key
+        return (self.words[best[2]], best[0]) if best else None
+
+    def is_spelled_correctly(self, word: str) -> bool:
+        """
+        Whether a word, or the base it is inflected from, is known or in the dictionary
+
+        Args:
+            word: Lowercased word
+
+        Returns:
+            True if the word must not be corrected
+        """
+        for form in (word, *inflection_bases(word)):
+            if form in self.known or form in self.dictionary:
+                return True
+        return False
+
+    def _correct_word(self, word: str) -> str:
+        """Correction of one lowercased word, or the word itself"""
+        if len(word) < 5 or self.is_spelled_correctly(word):
+            return word
+        match = self.lookup(word, 1 if len(word) < 8 else 2)
+        # A nearby form of the same word is a variant, not a misspelling
+        if not match or is_variant(word, match[0]):
+            return word
+        return match[0]
+
+    def correct(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Correct misspelled words in a text
+
+        Only words of at least 5 letters that are neither known nor in the
+        dictionary (directly or through an inflection) are corrected, within
+        1 edit for words of 5-7 letters and 2 edits for longer ones, and never
+        to another form of the same word.
+        Everything else in the text is kept as it is.
+
+        Args:
+            text: Lowercased text
+
+        Returns:
+            Tuple of (corrected text, list of (original, replacement) pairs)
+        """
+        corrections: List[Tuple[str, str]] = []
+        pieces: List[str] = []
+        position = 0
+        for match in _WORD_RE.finditer(text):
+            word = match.group()
+            corrected = self.correct_word(word)
+            if corrected != word:
+                pieces.append(text[position:match.start()])
+                pieces.append(corrected)
+                position = match.end()
+                corrections.append((word, corrected))
+
+        if not corrections:
+            return text, corrections
+        pieces.append(text[position:])
+        return "".join(pieces), corrections
+
+
+def vocabulary_words(terms: Iterable[str]) -> List[str]:
+    """
+    Split terms into the words a SpellingIndex is built from
+
+    Args:
+        terms: Lowercased terms
+
+    Returns:
+        Words in term order, repeated as often as they occur; hyphenated
+        words also contribute their parts
+    """
+    words = []
+    for term in terms:
+        for word in _WORD_RE.findall(term):
+            words.append(word)
+            if "-" in word:
+                words.extend(word.split("-"))
+    return words
@@ -0,0 +1,322 @@
+from typing import Dict, List, Any, Optional, Tuple, Iterable, NamedTuple, Sequence
+import sys
+import json
+import mmap
+import struct
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+# Serialized automaton: magic, version, states, edges, outputs, terms, metadata bytes, reserved
+_HEADER = struct.Struct("<4sIIIIIII")
+_MAGIC = b"GAAC"
+_VERSION = 1
+
+# Characters memoized per state; bounds the transition memo on unusual input
+_MAX_ROW_MEMO = 128
+
+
+class TermMatch(NamedTuple):
+    """One occurrence of a lexicon term in a text"""
+    term_id: int
+    term: str
+    start: int
+    end: int
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text for matching, keeping character offsets unchanged
+
+    Typographic apostrophes are folded to ASCII so "Crohn’s" matches "crohn's".
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Normalized text of the same length
+    """
+    return text.lower().replace("’", "'").replace("‘", "'")
+
+
+class _AutomatonMatcher(ABC):
+    """
+    Matching loop shared by the in-memory and memory-mapped automata.
+
+    Subclasses provide the transition function, failure links, per-state
+    outputs and the term table.
+    """
+
+    terms: List[str]
+    prefix: bool = False
+    _lengths: Sequence[int]
+    _delta: Dict[int, Dict[str, Tuple[int, Sequence[int]]]]
+
+    @abstractmethod
+    def _next_state(self, state: int, char: str) -> int:
+        """State reached from a state on a character, following failure links"""
+
+    @abstractmethod
+    def _outputs(self, state: int) -> Sequence[int]:
+        """Term ids that end at a state"""
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def find(self, text: str) -> List[TermMatch]:
+        """
+        Find every term occurrence that respects word boundaries
+
+        Overlapping matches are all reported ("capsule endoscopy" also yields
+        "endoscopy").
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches ordered by end position
+        """
+        text = normalize_text(text)
+        matches = []
+        state = 0
+        delta = self._delta
+
+        for position, char in enumerate(text):
+            # Memoized transitions, failure links already followed
+            row = delta.get(state)
+            if row is None:
+                row = delta[state] = {}
+            step = row.get(char)
+            if step is None:
+                next_state = self._next_state(state, char)
+                step = (next_state, self._outputs(next_state))
+                if len(row) < _MAX_ROW_MEMO:
+                    row[char] = step
+            state, outputs = step
+            if not outputs:
+                continue
+
+            end = position + 1
+            right_ok = self.prefix or end == len(text) or not text[end].isalnum()
+            if not right_ok:
+                continue
+            for term_id in outputs:
+                start = end - self._lengths[term_id]
+                if start == 0 or not text[start - 1].isalnum():
+                    matches.append(TermMatch(term_id, self.terms[term_id], start, end))
+
+        return matches
+
+    def found(self, text: str) -> List[str]:
+        """
+        List the terms present in a text in lexicon order
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matched terms, each once, in the order of the lexicon
+        """
+        ids = {match.term_id for match in self.find(text)}
+        return [self.terms[i] for i in sorted(ids)]
+
+
+class TermMatcher(_AutomatonMatcher):
+    """
+    Aho-Corasick automaton that finds lexicon terms in a single pass over a text.
+
+    Matching cost depends on the text length and the number of matches, not
+    on the lexicon size. Matches must start at a word boundary and, unless
+    prefix matching is requested, end at one too, so "eus" does not match
+    inside "pseudo".
+    """
+
+    def __init__(self, terms: Iterable[str], prefix: bool = False):
+        """
+        Compile the automaton
+
+        Args:
+            terms: Lexicon terms (matched case-insensitively)
+            prefix: Match terms as word prefixes ("screen" matches "screening")
+        """
+        self.terms = list(terms)
+        self.prefix = prefix
+        self._lengths = [len(normalize_text(term)) for term in self.terms]
+        self._delta = {}
+
+        # Trie stored as one transition dict per state; state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for term_id, term in enumerate(self.terms):
+            state = 0
+            for char in normalize_text(term):
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            if state != 0:
+                self._output[state].append(term_id)
+
+        # Breadth-first pass sets failure links and merges outputs along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                inherited = self._output[self._fail[next_state]]
+                if inherited:
+                    self._output[next_state] = self._output[next_state] + inherited
+
+    def _next_state(self, state: int, char: str) -> int:
+        goto, fail = self._goto, self._fail
+        while state and char not in goto[state]:
+            state = fail[state]
+        return goto[state].get(char, 0)
+
+    def _outputs(self, state: int) -> Sequence[int]:
+        return self._output[state]
+
+    def serialize(self, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Serialize the automaton into the compact format read by MappedTermMatcher
+
+        Transitions are stored as CSR arrays (per-state offsets into sorted
+        edge characters and targets), followed by failure links, outputs, term
+        lengths and a JSON block with the terms and caller metadata.
+
+        Args:
+            metadata: JSON-serializable data stored alongside the automaton
+
+        Returns:
+            The serialized automaton
+        """
+        edge_offsets = array("I", [0])
+        edge_chars = array("I")
+        edge_targets = array("I")
+        for transitions in self._goto:
+            for char in sorted(transitions):
+                edge_chars.append(ord(char))
+                edge_targets.append(transitions[char])
+            edge_offsets.append(len(edge_chars))
+
+        out_offsets = array("I", [0])
+        out_terms = array("I")
+        for outputs in self._output:
+            out_terms.extend(outputs)
+            out_offsets.append(len(out_terms))
+
+        meta = json.dumps({"terms": self.terms, "metadata": metadata or {}}, ensure_ascii=False).encode("utf-8")
+        header = _HEADER.pack(_MAGIC, _VERSION, len(self._goto), len(edge_chars),
+                              len(out_terms), len(self.terms), len(meta), 0)
+
+        sections = [edge_offsets, edge_chars, edge_targets, array("I", self._fail),
+                    out_offsets, out_terms, array("I", self._lengths)]
+        if sys.byteorder != "little":
+            for section in sections:
+                section.byteswap()
+        return header + b"".join(section.tobytes() for section in sections) + meta
+
+
+class MappedTermMatcher(_AutomatonMatcher):
+    """
+    Read-only automaton served straight from a memory-mapped file.
+
+    Loading costs one mmap call regardless of lexicon size; pages are read
+    on demand and shared between worker processes by the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map a file written from TermMatcher.serialize
+
+        Args:
+            path: Path of the serialized automaton
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_states, n_edges, n_outputs, n_terms, meta_len, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a compatible term automaton")
+        if sys.byteorder != "little":
+            raise ValueError("Memory-mapped automata require a little-endian platform")
+
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+
+        def section(count: int):
+            nonlocal offset
+            data = view[offset:offset + 4 * count].cast("I")
+            offset += 4 * count
+            return data
+
+        self._edge_offsets = section(n_states + 1)
+        self._edge_chars = section(n_edges)
+        self._edge_targets = section(n_edges)
+        self._fail = section(n_states)
+        self._out_offsets = section(n_states + 1)
+        self._out_terms = section(n_outputs)
+        self._lengths = section(n_terms)
+
+        meta = json.loads(bytes(view[offset:offset + meta_len]).decode("utf-8"))
+        self.terms = meta["terms"]
+        self.metadata = meta["metadata"]
+        self.prefix = False
+
+        self._delta = {}
+
+    def _next_state(self, state: int, char: str) -> int:
+        code = ord(char)
+        offsets, chars = self._edge_offsets, self._edge_chars
+        while True:
+            lo, hi = offsets[state], offsets[state + 1]
+            i = bisect_left(chars, code, lo, hi)
+            if i < hi and chars[i] == code:
+                return self._edge_targets[i]
+            if state == 0:
+                return 0
+            state = self._fail[state]
+
+    def _outputs(self, state: int) -> Sequence[int]:
+        start, end = self._out_offsets[state], self._out_offsets[state + 1]
+        return tuple(self._out_terms[start:end])
+
+
+# Compiled matchers shared by every caller in the process
+_matchers: Dict[Tuple[Tuple[str, ...], bool], TermMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_term_matcher(terms: Iterable[str], prefix: bool = False) -> TermMatcher:
+    """
+    Return the process-wide matcher for a lexicon, compiling it on first use
+
+    Args:
+        terms: Lexicon terms
+        prefix: Match terms as word prefixes
+
+    Returns:
+        Compiled TermMatcher
+    """
+    key = (tuple(terms), prefix)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(key)
+            if matcher is None:
+                matcher = TermMatcher(key[0], prefix=prefix)
+                _matchers[key] = matcher
+    return matcher
@@ -0,0 +1,88 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries expire after a fixed TTL
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays fresh
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """
+        Look up a value
+
+        Args:
+            key: Cache key
+            allow_stale: Return the value even if it has expired
+
+        Returns:
+            The cached value, or None if missing (or expired and not allowed stale)
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if not allow_stale and time.time() - stored_at > self.ttl:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report hit/miss counters
+
+        Returns:
+            Dictionary with size and hit statistics
+        """
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Run a query log through normalization, concept matching, intent detection
+and need planning, writing one row per query.
+
+Input is plain text (one query per line) or JSONL with the query in a field.
+Output is JSONL or Parquet (needs pyarrow). The summary lists the most
+repeated fingerprints (cache warm-up candidates) and how many queries matched
+no lexicon concept (lexicon gaps).
+
+    python scripts/analyze_query_log.py logs/queries.txt --output out/queries.jsonl
+    python scripts/analyze_query_log.py logs/queries.jsonl --field text --output out/queries.parquet --workers 0
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter, deque
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.core.query_processor import QueryProcessor
+from app.core.reasoning_agent import ReasoningAgent
+from app.utils.batch import write_records
+
+
+def read_queries(path, field=None):
+    """Yield query texts from a text or JSONL log"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if field:
+                query = json.loads(line).get(field)
+                if query:
+                    yield query
+            else:
+                yield line
+
+
+def parquet_schema():
+    """Explicit schema so empty lists in the first row group do not fix the types"""
+    import pyarrow as pa
+
+    return pa.schema([
+        ("query", pa.string()),
+        ("canonical_text", pa.string()),
+        ("concept_ids", pa.list_(pa.string())),
+        ("concepts", pa.list_(pa.string())),
+        ("intent", pa.string()),
+        ("fingerprint", pa.string()),
+        ("need_queries", pa.list_(pa.string()))
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a query log")
+    parser.add_argument("input", help="Query log (text, or JSONL with --field)")
+    parser.add_argument("--field", help="JSONL field holding the query text")
+    parser.add_argument("--output", required=True, help="Output .jsonl or .parquet file")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="Output format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 uses every CPU)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Queries per chunk")
+    parser.add_argument("--top", type=int, default=20, help="Repeated fingerprints to list")
+    args = parser.parse_args()
+
+    processor = QueryProcessor()
+    agent = ReasoningAgent()
+
+    fingerprints = Counter()
+    examples = {}
+    unmatched = Counter()
+
+    # process_many feeds analyze_many; both stream, so keep the processed
+    # queries whose needs have not come back yet
+    processed_queries = deque()
+
+    def analysis_source():
+        for processed_query in processor.process_many(read_queries(args.input, args.field),
+                                                      args.chunk_size, args.workers):
+            processed_queries.append(processed_query)
+            yield processed_query
+
+    def records():
+        for needs in agent.analyze_many(analysis_source(), args.chunk_size, args.workers):
+            processed_query = processed_queries.popleft()
+            fingerprint = processed_query["fingerprint"]
+            fingerprints[fingerprint] += 1
+            examples.setdefault(fingerprint, processed_query["original_text"])
+            if not processed_query["concept_ids"]:
+                unmatched[processed_query["canonical_text"]] += 1
+            yield {
+                "query": processed_query["original_text"],
+                "canonical_text": processed_query["canonical_text"],
+                "concept_ids": processed_query["concept_ids"],
+                "concepts": needs[0]["concepts"] if needs else [],
+                "intent": processed_query["intent"],
+                "fingerprint": fingerprint,
+                "need_queries": [need["query"] for need in needs]
+            }
+
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    schema = parquet_schema() if output_format == "parquet" else None
+
+    start = time.perf_counter()
+    count = write_records(records(), args.output, output_format, chunk_size=args.chunk_size, schema=schema)
+    elapsed = time.perf_counter() - start
+
+    print(f"Analyzed {count} queries in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} queries/s) -> {args.output}")
+    print(f"Distinct fingerprints: {len(fingerprints)}")
+    print(f"Queries without lexicon concepts: {sum(unmatched.values())}")
+
+    print("\nMost repeated fingerprints (cache warm-up candidates):")
+    for fingerprint, hits in fingerprints.most_common(args.top):
+        if hits < 2:
+            break
+        print(f"  {hits:>7}  {fingerprint[:12]}  {examples[fingerprint]}")
+
+    print("\nMost frequent queries without concepts (lexicon gaps):")
+    for canonical_text, hits in unmatched.most_common(args.top):
+        print(f"  {hits:>7}  {canonical_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -403,6 +403,58 @@ def calculate_weighted_score(eval_results: Dict[str, Any]) -> Tuple[float, Dict[
     
     return weighted_score, scores
 
+def process_queries_batch(queries: List[str],
+                          query_processor,
+                          reasoning_agent,
+                          knowledge_router,
+                          max_parallel: int) -> List[Dict[str, Any]]:
+    """
+    Process many queries, summarizing them concurrently within the LLM rate limits.
+
+    Search and extraction run per query; all summaries are then generated in one
+    LLMSummarizer.summarize_many batch.
+    
+    Args:
+        queries: The queries to process
+        query_processor: The initialized QueryProcessor
+        reasoning_agent: The initialized ReasoningAgent
+        knowledge_router: The initialized KnowledgeRouter
+        max_parallel: Maximum concurrent LLM calls
+        
+    Returns:
+        List of result dictionaries in query order
+    """
+    outputs = []
+    items = []
+    owners = []
+    
+    for query in tqdm(queries, desc="Retrieving sources"):
+        try:
+            processed_query = query_processor.process(query)
+            information_needs = reasoning_agent.analyze(processed_query)
+            results = knowledge_router.retrieve(information_needs, summarize=False)
+        except Exception as e:
+            logger.error(f"Error processing query '{query}': {str(e)}")
+            outputs.append({"query": query, "summary": f"Error: {str(e)}", "sources": [], "error": str(e)})
+            continue
+        
+        outputs.append({"query": query, "summary": "No summary generated", "sources": [], "full_results": results})
+        # One merged summarization request per query, covering all of its needs
+        if results:
+            items.append(knowledge_router.summary_request(results))
+            owners.append(len(outputs) - 1)
+    
+    logger.info(f"Summarizing {len(items)} queries with up to {max_parallel} concurrent calls")
+    summaries = knowledge_router.summarizer.summarize_many(items, max_workers=max_parallel)
+    
+    for index, summary in zip(owners, summaries):
+        output = outputs[index]
+        knowledge_router.attach_summary(output["full_results"], summary)
+        output["summary"] = summary.get("summary") or output["summary"]
+        output["sources"] = summary.get("sources", [])
+    
+    return outputs
+
 def run_batch_test(test_cases: pd.DataFrame, 
                    query_processor, 
                    reasoning_agent, 
@@ -418,14 +470,20 @@ def run_batch_test(test_cases: pd.DataFrame,
         reasoning_agent: Initialized ReasoningAgent
         knowledge_router: Initialized KnowledgeRouter
         model: LLM model to use for evaluation
-        max_parallel: Maximum parallel requests (not implemented yet)
+        max_parallel: Maximum concurrent summarization calls; above 1 all queries
+            are retrieved first and summarized together in a rate-limited batch
         
     Returns:
         List of test results
     """
     results = []
     
-    for i, row in tqdm(test_cases.iterrows(), total=len(test_cases), desc="Processing test cases"):
+    precomputed = None
+    if max_parallel > 1 and knowledge_router is not None:
+        precomputed = process_queries_batch(
+            list(test_cases["Question"]), query_processor, reasoning_agent, knowledge_router, max_parallel)
+    
+    for position, (i, row) in enumerate(tqdm(test_cases.iterrows(), total=len(test_cases), desc="Processing test cases")):
         test_id = row.get("ID", f"test_{i+1}")
         query = row["Question"]
         expected_answer = row["Expected_Answer"]
@@ -433,7 +491,10 @@ def run_batch_test(test_cases: pd.DataFrame,
         logger.info(f"Processing test case {test_id}: {query}")
         
         # Step 1: Process query through GastroAssist
-        gastroassist_result = process_query(query, query_processor, reasoning_agent, knowledge_router)
+        if precomputed is not None:
+            gastroassist_result = precomputed[position]
+        else:
+            gastroassist_result = process_query(query, query_processor, reasoning_agent, knowledge_router)
         generated_summary = gastroassist_result["summary"]
         
         # Step 2: Evaluate using LLM
@@ -658,6 +719,7 @@ def parse_arguments():
     parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="LLM model for evaluation")
     parser.add_argument("--max-tests", type=int, default=None, help="Maximum number of tests to run (for debugging)")
     parser.add_argument("--run-gastroassist", action="store_true", help="Run queries through GastroAssist (otherwise use precomputed results)")
+    parser.add_argument("--max-parallel", type=int, default=1, help="Concurrent summarization calls (rate-limited by LLM_RPM_LIMIT/LLM_TPM_LIMIT)")
     
     return parser.parse_args()
 
@@ -702,7 +764,8 @@ def main():
         query_processor=query_processor,
         reasoning_agent=reasoning_agent,
         knowledge_router=knowledge_router,
-        model=args.model
+        model=args.model,
+        max_parallel=args.max_parallel
     )
     
     # Generate reports
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark for the local BM25 corpus index.
+
+Indexes synthetic pages with a Zipf-distributed vocabulary and reports
+indexing throughput, segment count, index size, query latency and whether
+the top-k scores match brute-force BM25 over every chunk
+(passage_selector.bm25_scores); ids can differ only between tied chunks:
+
+    python scripts/benchmark_corpus_index.py
+    python scripts/benchmark_corpus_index.py --pages 1000 10000 --flush-docs 500 --merge-factor 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import numpy as np
+from collections import Counter
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.knowledge.corpus_index import CorpusIndex
+from app.output.passage_selector import tokenize, bm25_scores
+
+
+def synthetic_pages(count, words_per_page, vocabulary, rng):
+    """Pages of Zipf-distributed words, roughly like natural text"""
+    ranks = np.minimum(rng.zipf(1.2, size=(count, words_per_page)), len(vocabulary)) - 1
+    return [" ".join(vocabulary[rank] for rank in row) for row in ranks]
+
+
+def directory_bytes(path):
+    """Total size of the files in a directory"""
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the corpus index")
+    parser.add_argument("--pages", type=int, nargs="+", default=[500, 5000], help="Corpus sizes in pages")
+    parser.add_argument("--words", type=int, default=600, help="Words per page")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Vocabulary size")
+    parser.add_argument("--flush-docs", type=int, default=200, help="Buffered chunks per commit")
+    parser.add_argument("--merge-factor", type=int, default=4, help="Segments per tier before merging")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = [f"w{i}" for i in range(args.vocabulary)]
+    print(f"{'pages':>6}  {'chunks':>7}  {'pages/s':>8}  {'segments':>8}  {'MB':>6}  {'B/posting':>9}  "
+          f"{'p50 us':>8}  {'p95 us':>8}  {'brute us':>9}  {'exact top-k':>11}")
+    for size in args.pages:
+        pages = synthetic_pages(size, args.words, vocabulary, rng)
+        # Queries mix common and rare words, as user questions do
+        queries = [" ".join(vocabulary[i] for i in rng.integers(0, 2000, 4)) for _ in range(args.queries)]
+
+        with tempfile.TemporaryDirectory() as path:
+            index = CorpusIndex(path, flush_docs=args.flush_docs, merge_factor=args.merge_factor,
+                                flush_interval=float("inf"))
+            start = time.perf_counter()
+            for i, text in enumerate(pages):
+                index.add_document(f"https://example.org/{i}", f"page {i}", text)
+            index.commit()
+            pages_per_s = size / (time.perf_counter() - start)
+
+            stats = index.stats()
+            postings = sum(entry[2] for segment in index._segments.values() for entry in segment.terms.values())
+            postings_bytes = sum(entry[1] for segment in index._segments.values()
+                                 for entry in segment.terms.values())
+
+            samples, indexed_scores = [], []
+            for query in queries:
+                start = time.perf_counter()
+                hits = index.search(query, args.k)
+                samples.append((time.perf_counter() - start) * 1e6)
+                indexed_scores.append([hit.score for hit in hits])
+
+            chunks = []
+            for segment in index._segments.values():
+                for position in range(len(segment)):
+                    document = segment.document(position)
+                    chunks.append(tokenize(document["title"]) + tokenize(document["content"]))
+            brute_samples, agreement = [], []
+            for query, scores_found in zip(queries[:20], indexed_scores):
+                start = time.perf_counter()
+                scores = bm25_scores(chunks, dict(Counter(tokenize(query))))
+                brute_samples.append((time.perf_counter() - start) * 1e6)
+                top = np.sort(scores[scores > 0])[::-1][:args.k]
+                agreement.append(len(top) == len(scores_found) and np.allclose(top, scores_found, rtol=1e-4))
+
+            samples.sort()
+            print(f"{size:>6}  {stats['chunks']:>7}  {pages_per_s:>8.0f}  {stats['segments']:>8}  "
+                  f"{directory_bytes(path) / 1e6:>6.1f}  {postings_bytes / max(postings, 1):>9.2f}  "
+                  f"{statistics.median(samples):>8.0f}  {samples[int(0.95 * len(samples))]:>8.0f}  "
+                  f"{statistics.median(brute_samples):>9.0f}  {np.mean(agreement):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Benchmark for intent detection in the ReasoningAgent.
+
+Compares the learned intent classifier with the keyword rules it replaces,
+both as the original any() substring scans and as the compiled keyword
+automaton, on throughput and on accuracy against labelled queries:
+
+    python scripts/benchmark_intent_classifier.py
+    python scripts/benchmark_intent_classifier.py --data logs/labelled_queries.jsonl --repeat 20
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.core.intent import INTENTS, INTENT_KEYWORDS, DEFAULT_INTENT, classify_intent, intent_flags, _matched_intents
+from app.core.intent_classifier import IntentClassifier, load_training_data, DEFAULT_TRAINING_DATA
+
+
+def naive_intent(query_lower):
+    """The keyword rules as substring scans over every keyword list"""
+    for intent in INTENTS:
+        if any(keyword in query_lower for keyword in INTENT_KEYWORDS[intent]):
+            return intent
+    return DEFAULT_INTENT
+
+
+def automaton_intent(query_lower):
+    """The keyword rules through the compiled automaton, without the query memo"""
+    _matched_intents.cache_clear()
+    return classify_intent(query_lower, intent_flags(query_lower))
+
+
+def time_per_query(fn, queries, repeat):
+    """Median microseconds per query over repeat passes"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            fn(query)
+        samples.append((time.perf_counter() - start) / len(queries) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent detection")
+    parser.add_argument("--data", nargs="+", default=[DEFAULT_TRAINING_DATA], help="Labelled queries (JSONL)")
+    parser.add_argument("--model", default=None, help="Trained model (trained on --data if omitted)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed passes")
+    parser.add_argument("--min-confidence", type=float, default=float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5")),
+                        help="Confidence at which the model overrides the keywords")
+    args = parser.parse_args()
+
+    texts, labels = load_training_data(args.data)
+    queries = [text.lower() for text in texts]
+    model = IntentClassifier.load(args.model) if args.model else IntentClassifier.train(texts, labels)
+
+    def combined(query):
+        prediction = model.predict(query)
+        return prediction.intent if prediction.confidence >= args.min_confidence else classify_intent(query)
+
+    methods = [
+        ("any() keyword scans", naive_intent),
+        ("keyword automaton", automaton_intent),
+        ("classifier", lambda q: model.predict(q).intent),
+        ("classifier + keyword fallback", combined),
+    ]
+
+    if not args.model:
+        print("Note: model trained on the benchmark data, so its accuracy is optimistic; "
+              "use scripts/train_intent_classifier.py for held-out accuracy\n")
+    print(f"{'method':<30}  {'us/query':>9}  {'accuracy':>8}")
+    for name, fn in methods:
+        micros = time_per_query(fn, queries, args.repeat)
+        accuracy = sum(fn(q) == label for q, label in zip(queries, labels)) / max(len(labels), 1)
+        print(f"{name:<30}  {micros:>9.1f}  {accuracy:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Latency benchmark for the GastroAssist pipeline.
+
+Runs a list of questions through QueryProcessor -> ReasoningAgent -> KnowledgeRouter
+and reports per-query and aggregate timings. Combine with the cassette layer for
+repeatable, offline runs:
+
+    # Record provider responses once (needs network and API keys)
+    CASSETTE_MODE=record python scripts/benchmark_pipeline.py
+
+    # Replay them offline with the original latencies, or with a fixed latency
+    CASSETTE_MODE=replay python scripts/benchmark_pipeline.py
+    CASSETTE_MODE=replay CASSETTE_LATENCY=0 python scripts/benchmark_pipeline.py
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from dotenv import load_dotenv
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.core.query_processor import QueryProcessor
+from app.core.reasoning_agent import ReasoningAgent
+from app.core.knowledge_router import KnowledgeRouter
+from app.utils.cassette import get_cassette
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_benchmark(questions, repeat=1):
+    """Run every question through the pipeline and collect timings"""
+    query_processor = QueryProcessor()
+    reasoning_agent = ReasoningAgent()
+    knowledge_router = KnowledgeRouter()
+
+    timings = []
+    for _ in range(repeat):
+        for question in questions:
+            start = time.perf_counter()
+            processed_query = query_processor.process(question)
+            information_needs = reasoning_agent.analyze(processed_query)
+            knowledge_router.retrieve(information_needs)
+            elapsed = time.perf_counter() - start
+            timings.append({"question": question, "seconds": elapsed})
+            print(f"{elapsed:7.3f}s  {question}")
+
+    return timings
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark GastroAssist pipeline latency.")
+    parser.add_argument("--questions-file", type=str, default="manual_testing/questions_manual.txt",
+                        help="Text file with one question per line")
+    parser.add_argument("--max-questions", type=int, default=None, help="Only run the first N questions")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of passes over the question list")
+    parser.add_argument("--output-file", type=str, default=None, help="Write timings as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    """Run the benchmark and print a summary"""
+    load_dotenv()
+    args = parse_arguments()
+
+    with open(args.questions_file, "r", encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    if args.max_questions:
+        questions = questions[:args.max_questions]
+
+    cassette = get_cassette()
+    print(f"Cassette mode: {cassette.mode} (latency: {cassette.latency})")
+    print(f"Running {len(questions)} questions x {args.repeat}\n")
+
+    timings = run_benchmark(questions, repeat=args.repeat)
+    seconds = [t["seconds"] for t in timings]
+
+    summary = {
+        "cassette_mode": cassette.mode,
+        "runs": len(seconds),
+        "mean": statistics.mean(seconds) if seconds else 0.0,
+        "p50": percentile(seconds, 50),
+        "p95": percentile(seconds, 95),
+        "max": max(seconds) if seconds else 0.0
+    }
+
+    print("\n=== Summary ===")
+    for key, value in summary.items():
+        print(f"{key:>14}: {value:.3f}" if isinstance(value, float) else f"{key:>14}: {value}")
+
+    if args.output_file:
+        with open(args.output_file, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "timings": timings}, f, indent=2)
+        print(f"\nTimings written to {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Benchmark for lexicon matching in the ReasoningAgent.
+
+Compares the compiled Aho-Corasick TermMatcher with naive substring scans
+while the lexicon grows by orders of magnitude (synthetic terms are added to
+the real condition/procedure/medication lists):
+
+    python scripts/benchmark_term_matcher.py
+    python scripts/benchmark_term_matcher.py --sizes 150 1500 15000 150000 --repeat 200
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import argparse
+import statistics
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.core.reasoning_agent import ReasoningAgent
+from app.utils.term_matcher import TermMatcher
+
+QUERIES = [
+    "What is the first-line treatment for H. pylori infection?",
+    "How often should patients with Barrett's esophagus undergo endoscopy?",
+    "What are the diagnostic criteria for irritable bowel syndrome?",
+    "Is pseudo-obstruction managed differently from mechanical bowel obstruction?",
+    "When is EUS preferred over ERCP for suspected choledocholithiasis?",
+    "Compare infliximab and vedolizumab for moderate ulcerative colitis",
+]
+
+
+def build_lexicon(base_terms, size, seed=0):
+    """Pad the real lexicon with random multi-word terms up to size"""
+    rng = random.Random(seed)
+    terms = list(base_terms)
+    while len(terms) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(rng.randint(1, 3))]
+        terms.append(" ".join(words))
+    return terms
+
+
+def time_per_query(fn, queries, repeat):
+    """Median microseconds per query over repeat passes"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            fn(query)
+        samples.append((time.perf_counter() - start) / len(queries) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lexicon matching")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[150, 1500, 15000, 150000],
+                        help="Lexicon sizes to test")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed passes per size")
+    parser.add_argument("--skip-naive-above", type=int, default=20000,
+                        help="Skip the substring baseline for larger lexicons")
+    args = parser.parse_args()
+
+    agent = ReasoningAgent()
+    base_terms = agent.gi_conditions + agent.gi_procedures + agent.medications
+    queries = [q.lower() for q in QUERIES]
+
+    print(f"{'terms':>8}  {'compile ms':>10}  {'automaton us/query':>18}  {'substring us/query':>18}")
+    for size in args.sizes:
+        terms = build_lexicon(base_terms, size)
+
+        start = time.perf_counter()
+        matcher = TermMatcher(terms)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        automaton = time_per_query(matcher.found, queries, args.repeat)
+        if size <= args.skip_naive_above:
+            naive = time_per_query(lambda q: [t for t in terms if t in q], queries, args.repeat)
+            naive_text = f"{naive:18.1f}"
+        else:
+            naive_text = f"{'skipped':>18}"
+        print(f"{size:>8}  {compile_ms:>10.1f}  {automaton:>18.1f}  {naive_text}")
+
+    print("\nMatches (automaton):")
+    full = TermMatcher(base_terms)
+    for query in QUERIES:
+        print(f"  {query}\n    -> {[(m.term, m.start, m.end) for m in full.find(query)]}")
+
+
+if __name__ == "__main__":
+    main()
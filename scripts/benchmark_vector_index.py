@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Benchmark for the knowledge base vector index.
+
+Measures insert time, query latency and recall@k of the HNSW index against
+exact NumPy search on clustered random vectors, plus save and load time:
+
+    python scripts/benchmark_vector_index.py
+    python scripts/benchmark_vector_index.py --sizes 1000 10000 100000 --dim 256 --ef 32 64 128
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import numpy as np
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.knowledge.vector_index import VectorIndex
+
+
+def clustered_vectors(n, centres, rng):
+    """Vectors drawn around the given centres, closer to real embeddings than uniform noise"""
+    noise = 0.5 * rng.normal(size=(n, centres.shape[1]))
+    return (centres[rng.integers(0, len(centres), n)] + noise).astype(np.float32)
+
+
+def timed_queries(index, queries, k):
+    """Median query latency in microseconds and the returned labels"""
+    samples, labels = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.query(query, k)
+        samples.append((time.perf_counter() - start) * 1e6)
+        labels.append({hit.label for hit in hits})
+    return statistics.median(samples), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vector index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Index sizes")
+    parser.add_argument("--dim", type=int, default=256, help="Vector dimension")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size")
+    parser.add_argument("--ef", type=int, nargs="+", default=[64], help="HNSW ef_search values to test")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'items':>7}  {'insert s':>8}  {'save ms':>8}  {'load ms':>8}  {'exact us':>9}  "
+          f"{'ef':>4}  {'hnsw us':>8}  {'recall@' + str(args.k):>9}")
+    for size in args.sizes:
+        centres = rng.normal(size=(100, args.dim))
+        vectors = clustered_vectors(size, centres, rng)
+        queries = clustered_vectors(args.queries, centres, rng)
+        metadata = [{"id": i} for i in range(size)]
+
+        with tempfile.TemporaryDirectory() as path:
+            start = time.perf_counter()
+            index = VectorIndex(args.dim, path)
+            index.add(vectors, metadata)
+            insert_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index.save()
+            save_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            index = VectorIndex(args.dim, path)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            exact_index = VectorIndex(args.dim, path, use_hnsw=False)
+            exact_us, exact_labels = timed_queries(exact_index, queries, args.k)
+
+            for ef in args.ef:
+                index.ef_search = ef
+                hnsw_us, hnsw_labels = timed_queries(index, queries, args.k)
+                recall = np.mean([len(a & b) / args.k for a, b in zip(hnsw_labels, exact_labels)])
+                print(f"{size:>7}  {insert_s:>8.2f}  {save_ms:>8.1f}  {load_ms:>8.1f}  {exact_us:>9.1f}  "
+                      f"{ef:>4}  {hnsw_us:>8.1f}  {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Load curated documents into the local knowledge base vector index.
+
+Documents are JSONL with title, content, url, source_type and
+publication_date. Long documents can be split into passages so each
+result is a focused excerpt:
+
+    python scripts/build_kb_index.py guidelines.jsonl
+    python scripts/build_kb_index.py guidelines.jsonl --chunk-words 200 --rebuild
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+from app.knowledge.kb_connector import GastroKnowledgeBase, load_documents
+from app.output.passage_selector import chunk_text
+
+
+def passages(documents, chunk_words):
+    """Split each document's content into passages that keep the document's other fields"""
+    for document in documents:
+        chunks = chunk_text(document.get("content", ""), chunk_words) if chunk_words else []
+        if len(chunks) <= 1:
+            yield document
+            continue
+        for number, chunk in enumerate(chunks):
+            yield dict(document, content=chunk, passage=number)
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Build the knowledge base vector index")
+    parser.add_argument("documents", nargs="+", help="JSONL document files")
+    parser.add_argument("--index-path", default=os.getenv("KB_INDEX_PATH", "cache/kb_index"),
+                        help="Directory of the vector index")
+    parser.add_argument("--chunk-words", type=int, default=0,
+                        help="Split documents into passages of about this many words (0 keeps them whole)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Start from an empty index instead of adding to the existing one")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.index_path):
+        shutil.rmtree(args.index_path)
+
+    # Seeding is skipped so the index holds exactly the given documents
+    kb = GastroKnowledgeBase(index_path=args.index_path, seed_documents="")
+
+    start = time.perf_counter()
+    added = 0
+    for path in args.documents:
+        added += len(kb.add_documents(passages(load_documents(path), args.chunk_words)))
+    kb.index.save()
+    elapsed = time.perf_counter() - start
+
+    stats = kb.index.stats()
+    print(f"Added {added} entries in {elapsed:.1f}s; index at {stats['path']} holds {stats['items']} "
+          f"({stats['deleted']} deleted, {stats['backend']} search)")
+
+
+if __name__ == "__main__":
+    main()
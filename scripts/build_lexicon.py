@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Compile the GI medical lexicon into a memory-mappable automaton and its
+spelling-correction index.
+
+Run at build/deploy time so workers only map the compiled file at startup:
+
+    python scripts/build_lexicon.py
+    python scripts/build_lexicon.py --source app/knowledge/data/gi_lexicon.json --output cache/gi_lexicon.automaton
+
+Running workers pick up rebuilt files within LEXICON_RELOAD_INTERVAL seconds.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+from app.knowledge.lexicon import compile_lexicon, compile_spelling_index, spelling_index_path, DEFAULT_LEXICON_SOURCE, DEFAULT_KNOWN_WORDS
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Compile the medical lexicon")
+    parser.add_argument("--source", default=os.getenv("LEXICON_SOURCE", DEFAULT_LEXICON_SOURCE),
+                        help="JSON lexicon to compile")
+    parser.add_argument("--output", default=os.getenv("LEXICON_PATH", "cache/gi_lexicon.automaton"),
+                        help="Path of the compiled automaton")
+    parser.add_argument("--spelling-output", default=os.getenv("LEXICON_SPELLING_PATH"),
+                        help="Path of the spelling index (defaults to one next to the automaton)")
+    parser.add_argument("--known-words", default=os.getenv("LEXICON_KNOWN_WORDS", DEFAULT_KNOWN_WORDS),
+                        help="Words the spelling corrector never changes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = compile_lexicon(args.source, args.output)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Compiled {summary['concepts']} concepts / {summary['terms']} terms "
+          f"into {args.output} ({summary['bytes']} bytes, {elapsed_ms:.1f} ms)")
+
+    start = time.perf_counter()
+    spelling_output = args.spelling_output or spelling_index_path(args.output)
+    summary = compile_spelling_index(args.source, spelling_output, args.known_words)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Indexed {summary['words']} words / {summary['deletes']} deletes "
+          f"into {spelling_output} ({summary['bytes']} bytes, {elapsed_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Calibrate the knowledge base routing threshold.
+
+Runs labelled queries through the query processor and reasoning agent, then
+scores each against the knowledge base the way KnowledgeRouter does: a
+query is answered from the knowledge base only when every need has a result
+that covers its concepts and intent, so its score is the lowest of its
+needs' best cosine similarities. Prints precision and recall per threshold
+and the lowest threshold that reaches the target precision:
+
+    python scripts/calibrate_kb_routing.py
+    python scripts/calibrate_kb_routing.py --data labelled.jsonl --index-path cache/kb_index --precision 0.98
+
+Each line of the data file is {"query": ..., "kb_answerable": true|false}.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from app.core.query_processor import QueryProcessor
+from app.core.reasoning_agent import ReasoningAgent
+from app.knowledge.kb_connector import GastroKnowledgeBase
+
+DEFAULT_DATA = os.path.join(parent_dir, "app", "knowledge", "data", "kb_routing_calibration.jsonl")
+
+
+def query_score(knowledge_base, processor, agent, query):
+    """Lowest best-covering score over the query's needs (0 if a need has none)"""
+    scores = []
+    for need in agent.analyze(processor.process(query)):
+        results = knowledge_base.covering_results(
+            need.get("original_query") or need["query"], need.get("covers") or need.get("concepts") or [],
+            need.get("intent"), top_k=need.get("max_extractions", 3))
+        scores.append(results[0]["relevance_score"] if results else 0.0)
+    return min(scores) if scores else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate KB_ROUTING_MIN_SCORE")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="Labelled queries (JSONL)")
+    parser.add_argument("--index-path", default=None, help="Knowledge base index (defaults to KB_INDEX_PATH)")
+    parser.add_argument("--precision", type=float, default=1.0, help="Target precision of knowledge base answers")
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    knowledge_base = GastroKnowledgeBase(index_path=args.index_path)
+    processor, agent = QueryProcessor(), ReasoningAgent()
+    scores = np.array([query_score(knowledge_base, processor, agent, record["query"]) for record in records])
+    labels = np.array([bool(record["kb_answerable"]) for record in records])
+
+    print(f"{'threshold':>9}  {'answered':>8}  {'precision':>9}  {'recall':>6}")
+    chosen = None
+    # Candidate thresholds sit just above each observed score, plus the lowest score itself
+    candidates = sorted({round(float(score) + 0.001, 3) for score in scores if score > 0} | {float(scores[scores > 0].min())})
+    for threshold in candidates:
+        answered = scores >= threshold
+        if not answered.any():
+            continue
+        precision = float(labels[answered].mean())
+        recall = float((answered & labels).sum() / max(labels.sum(), 1))
+        print(f"{threshold:>9.3f}  {int(answered.sum()):>8}  {precision:>9.3f}  {recall:>6.3f}")
+        if chosen is None and precision >= args.precision:
+            chosen = (threshold, precision, recall)
+
+    if chosen is None:
+        print(f"\nNo threshold reaches precision {args.precision}")
+        return
+    threshold, precision, recall = chosen
+    print(f"\nKB_ROUTING_MIN_SCORE={threshold:.3f}  (precision {precision:.3f}, recall {recall:.3f})")
+
+    misses = [record["query"] for record, score, label in zip(records, scores, labels) if label and score < threshold]
+    if misses:
+        print("Answerable queries sent to the web: " + "; ".join(misses))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Train the hashed-feature intent classifier used by the ReasoningAgent.
+
+Training data is JSONL with "query" and "intent" fields: the bundled seed
+set (including the manual_testing questions) plus any labelled query logs.
+
+    python scripts/train_intent_classifier.py
+    python scripts/train_intent_classifier.py --labelled logs/labelled_queries.jsonl --output cache/intent_model.npz
+
+The default output is the model shipped in app/core/data, which the server
+loads; rerun this whenever the training data changes.
+
+A held-out split reports accuracy of the model, the keyword rules and the
+combination used at runtime (keywords when they match, else the model above
+INTENT_MIN_CONFIDENCE)
+before the final model is fitted on all data.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add parent directory to path to import app modules
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+from app.core.intent import classify_intent, DEFAULT_INTENT
+from app.core.intent_classifier import IntentClassifier, load_training_data, DEFAULT_TRAINING_DATA, DEFAULT_MODEL_PATH
+
+
+def evaluate(texts, labels, holdout, min_confidence, train_args, seed=0):
+    """Accuracy of the model, the keyword rules and their combination on a random split"""
+    order = list(range(len(texts)))
+    random.Random(seed).shuffle(order)
+    split = int(len(order) * (1 - holdout))
+    train, test = order[:split], order[split:]
+
+    model = IntentClassifier.train([texts[i] for i in train], [labels[i] for i in train], **train_args)
+
+    model_hits = keyword_hits = combined_hits = confident = 0
+    for i in test:
+        prediction = model.predict(texts[i].lower())
+        keyword = classify_intent(texts[i].lower())
+        # Same rule as detect_intent: keywords win, the model fills in where none match
+        use_model = prediction.intent == keyword or (keyword == DEFAULT_INTENT and prediction.confidence >= min_confidence)
+        combined = prediction.intent if use_model else keyword
+        model_hits += prediction.intent == labels[i]
+        keyword_hits += keyword == labels[i]
+        combined_hits += combined == labels[i]
+        confident += use_model
+
+    n = max(len(test), 1)
+    print(f"Held-out queries: {len(test)}")
+    print(f"  model accuracy:    {model_hits / n:.3f}")
+    print(f"  keyword accuracy:  {keyword_hits / n:.3f}")
+    print(f"  combined accuracy: {combined_hits / n:.3f} (model used for {confident / n:.0%} of queries)")
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Train the intent classifier")
+    parser.add_argument("--data", default=os.getenv("INTENT_TRAINING_DATA", DEFAULT_TRAINING_DATA),
+                        help="Seed training data (JSONL)")
+    parser.add_argument("--labelled", nargs="*", default=[], help="Additional labelled query logs (JSONL)")
+    parser.add_argument("--output", default=os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH),
+                        help="Model output path")
+    parser.add_argument("--features", type=int, default=2 ** 13, help="Hash buckets")
+    parser.add_argument("--epochs", type=int, default=200, help="Training epochs")
+    parser.add_argument("--learning-rate", type=float, default=5.0, help="Gradient step size")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation (0 to skip)")
+    args = parser.parse_args()
+
+    texts, labels = load_training_data([args.data] + args.labelled)
+    print(f"Loaded {len(texts)} labelled queries across {len(set(labels))} intents")
+
+    train_args = {"n_features": args.features, "epochs": args.epochs, "learning_rate": args.learning_rate}
+    if args.holdout > 0:
+        evaluate(texts, labels, args.holdout, float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5")), train_args)
+
+    start = time.perf_counter()
+    model = IntentClassifier.train(texts, labels, **train_args)
+    model.save(args.output)
+    print(f"Trained on all data in {time.perf_counter() - start:.1f}s -> {args.output} "
+          f"({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
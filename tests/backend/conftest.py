@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import MagicMock
+from app.output import llm_router
+from app.output.llm_router import LLMRouter, LLMProvider
+from app.output.llm_summarizer import LLMSummarizer
+from app.utils.rate_limiter import RequestTokenScheduler
+from app.utils.provider_stub import StubProfile, run_stub_server
+
+@pytest.fixture(scope="module")
+def provider_stub():
+    """Local stand-in for Tavily and the LLM API; yields its base URL"""
+    with run_stub_server(StubProfile(seed=0)) as base_url:
+        yield base_url
+
+@pytest.fixture(autouse=True)
+def disable_completion_cache(monkeypatch):
+    """Keep tests independent of completions cached on disk by earlier runs"""
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+
+@pytest.fixture(autouse=True)
+def disable_corpus_index(monkeypatch):
+    """Keep tests from reading or growing the corpus index on disk"""
+    monkeypatch.setenv("CORPUS_INDEX_ENABLED", "false")
+
+@pytest.fixture(autouse=True)
+def disable_kb_routing(monkeypatch):
+    """Keep router tests from answering out of the knowledge base on disk"""
+    monkeypatch.setenv("KB_ROUTING_ENABLED", "false")
+
+@pytest.fixture(autouse=True)
+def fresh_provider_stats(monkeypatch):
+    """Keep provider latency and error history from leaking between tests"""
+    monkeypatch.setattr(llm_router, "_provider_stats", {})
+
+@pytest.fixture
+def completion():
+    """Factory for a chat completion response carrying one message"""
+    def make(content):
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content=content))]
+        return response
+    return make
+
+@pytest.fixture
+def make_summarizer(monkeypatch):
+    """Factory for an LLMSummarizer whose only provider is a mocked OpenAI client
+
+    Takes the side effect of chat.completions.create and extra environment
+    variables; returns (summarizer, client).
+    """
+    def make(create=None, **env):
+        monkeypatch.setenv("LLM_SERVICE", "openai")
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_ROUTER_EXPLORE_RATE", "0")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        summarizer = LLMSummarizer()
+        client = MagicMock()
+        client.chat.completions.create.side_effect = create
+        summarizer.router = LLMRouter("openai", [LLMProvider("openai", client, "test-model")])
+        summarizer.scheduler = RequestTokenScheduler(rpm=6000, tpm=10_000_000)
+        return summarizer, client
+    return make
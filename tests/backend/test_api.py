@@ -91,3 +91,23 @@ class TestAPI:
         
         assert response.status_code == 422  # Validation error
 
+
+class TestQueryUsage:
+    def test_process_query_returns_usage(self):
+        knowledge_results = {"need_0": {"summarized_response": {
+            "summary": "PPIs are first line.", "sources": [],
+            "usage": {"calls": [{"model": "m", "stage": "summarize", "prompt_tokens": 100,
+                                 "completion_tokens": 20, "total_tokens": 120, "cached_tokens": 0}]}
+        }}}
+        with patch("app.main.QueryProcessor"), patch("app.main.ReasoningAgent"), \
+             patch("app.main.KnowledgeRouter") as mock_kr, patch("app.main.QualityAssurance") as mock_qa:
+            mock_kr.return_value.retrieve.return_value = knowledge_results
+            mock_qa.return_value.check.return_value = {"confidence_score": 0.9}
+            
+            response = client.post("/api/query", json={"text": "How is GERD treated?", "user_id": "test-user"})
+        
+        assert response.status_code == 200
+        usage = response.json()["usage"]
+        assert usage["prompt_tokens"] == 100
+        assert usage["completion_tokens"] == 20
+        assert usage["by_model_stage"]["m/summarize"]["total_tokens"] == 120
@@ -0,0 +1,56 @@
+import json
+import pytest
+from app.utils.batch import chunked, map_chunks, write_records
+from app.core.query_processor import QueryProcessor
+from app.core.reasoning_agent import ReasoningAgent
+
+
+def double_chunk(chunk):
+    return [value * 2 for value in chunk]
+
+
+class TestBatchHelpers:
+    def test_chunked_streams(self):
+        assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    
+    def test_map_chunks_keeps_order_across_processes(self):
+        assert list(map_chunks(double_chunk, range(25), chunk_size=4, workers=2)) == [v * 2 for v in range(25)]
+    
+    def test_write_jsonl(self, tmp_path):
+        path = tmp_path / "out" / "rows.jsonl"
+        
+        count = write_records(({"i": i} for i in range(3)), str(path))
+        
+        assert count == 3
+        assert [json.loads(line) for line in path.read_text().splitlines()] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    
+    def test_write_parquet(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "rows.parquet"
+        
+        write_records(({"i": i, "tags": ["a"] * i} for i in range(5)), str(path), chunk_size=2)
+        
+        assert pq.read_table(str(path)).column("i").to_pylist() == [0, 1, 2, 3, 4]
+    
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_records([{"i": 1}], str(tmp_path / "rows.csv"), output_format="csv")
+
+
+class TestBatchPipeline:
+    QUERIES = ["What is the treatment for H. pylori?", "infliximab in crohn's disease", "is fodmap diet useful"]
+    
+    def test_process_many_matches_process(self):
+        processor = QueryProcessor()
+        
+        streamed = list(processor.process_many(iter(self.QUERIES), chunk_size=2, workers=2))
+        
+        assert streamed == [processor.process(query) for query in self.QUERIES]
+    
+    def test_analyze_many_matches_analyze(self):
+        processed = [QueryProcessor().process(query) for query in self.QUERIES]
+        agent = ReasoningAgent()
+        
+        streamed = list(agent.analyze_many(iter(processed), chunk_size=2, workers=2))
+        
+        assert streamed == [agent.analyze(p) for p in processed]
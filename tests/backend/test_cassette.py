@@ -0,0 +1,122 @@
+import json
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from app.utils.cassette import Cassette, CassetteMissError, RecordedError
+from app.output.llm_router import is_failover_error, retry_after_seconds
+
+class APIStatusError(Exception):
+    """SDK-style error whose constructor needs more than a message"""
+    def __init__(self, message, *, response, body):
+        super().__init__(message)
+        self.response = response
+        self.status_code = response.status_code
+        self.body = body
+
+class TestCassette:
+    @pytest.fixture
+    def mock_response(self):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"Content-Type": "application/json"}
+        response.text = json.dumps({"results": [{"title": "GERD", "url": "https://example.com/gerd"}]})
+        return response
+
+    def test_off_mode_passes_through(self, tmp_path, mock_response):
+        cassette = Cassette(mode="off", directory=str(tmp_path))
+
+        with patch("requests.post", return_value=mock_response) as mock_post:
+            response = cassette.http("post", "https://api.tavily.com/search", json={"query": "gerd"})
+
+        assert response is mock_response
+        mock_post.assert_called_once_with("https://api.tavily.com/search", json={"query": "gerd"})
+        assert list(tmp_path.iterdir()) == []
+
+    def test_record_then_replay_http(self, tmp_path, mock_response):
+        recorder = Cassette(mode="record", directory=str(tmp_path))
+        with patch("requests.post", return_value=mock_response):
+            recorder.http("post", "https://api.tavily.com/search", provider=True,
+                          headers={"Authorization": "Bearer secret"},
+                          json={"query": "gerd", "api_key": "secret"})
+
+        replayer = Cassette(mode="replay", directory=str(tmp_path), latency="none")
+        with patch("requests.post") as mock_post:
+            # Provider calls replay against any base URL and ignore secrets
+            response = replayer.http("post", "http://127.0.0.1:8765/search", provider=True,
+                                     json={"query": "gerd", "api_key": "other"})
+            mock_post.assert_not_called()
+
+        assert response.status_code == 200
+        assert response.json()["results"][0]["title"] == "GERD"
+
+        # Secrets are never written to disk
+        stored = "".join(p.read_text() for p in tmp_path.rglob("*.json"))
+        assert "secret" not in stored
+
+    def test_replay_miss_raises(self, tmp_path):
+        cassette = Cassette(mode="replay", directory=str(tmp_path))
+
+        with pytest.raises(CassetteMissError):
+            cassette.http("get", "https://example.com/unknown")
+
+    def test_record_then_replay_llm(self, tmp_path):
+        completion = MagicMock()
+        completion.model_dump.return_value = {
+            "choices": [{"message": {"role": "assistant", "content": "PPIs are first line [SOURCE 1]"}}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 9}
+        }
+        create = MagicMock(return_value=completion)
+        request = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "GERD?"}], "max_tokens": 50}
+
+        Cassette(mode="record", directory=str(tmp_path)).llm(create, **request)
+        replayed = Cassette(mode="replay", directory=str(tmp_path), latency="none").llm(MagicMock(), **request)
+
+        assert replayed.choices[0].message.content == "PPIs are first line [SOURCE 1]"
+        assert replayed.usage.prompt_tokens == 120
+
+    def test_replay_fixed_latency(self, tmp_path):
+        Cassette(mode="record", directory=str(tmp_path)).call("duckduckgo", {"query": "ibs"}, lambda: [])
+        cassette = Cassette(mode="replay", directory=str(tmp_path), latency="250")
+
+        with patch("app.utils.cassette.time.sleep") as mock_sleep:
+            assert cassette.call("duckduckgo", {"query": "ibs"}, lambda: None) == []
+
+        mock_sleep.assert_called_once_with(0.25)
+
+    def test_replayed_errors_keep_type_and_status(self, tmp_path):
+        throttled = requests.Response()
+        throttled.status_code = 429
+        throttled.headers["Retry-After"] = "7"
+        errors = {
+            "http": requests.exceptions.HTTPError("429 Too Many Requests", response=throttled),
+            "llm": APIStatusError("Service unavailable", response=MagicMock(status_code=503, headers={}), body=None)
+        }
+        for kind, error in errors.items():
+            with pytest.raises(type(error)):
+                Cassette(mode="record", directory=str(tmp_path)).call(kind, {"q": 1}, MagicMock(side_effect=error))
+        replayer = Cassette(mode="replay", directory=str(tmp_path), latency="none")
+
+        with pytest.raises(requests.exceptions.HTTPError) as http_error:
+            replayer.call("http", {"q": 1}, MagicMock())
+        with pytest.raises(APIStatusError) as llm_error:
+            replayer.call("llm", {"q": 1}, MagicMock())
+
+        assert http_error.value.response.status_code == 429
+        assert retry_after_seconds(http_error.value) == 7.0
+        assert llm_error.value.status_code == 503
+        assert str(llm_error.value) == "Service unavailable"
+        assert is_failover_error(llm_error.value)
+
+    def test_unknown_error_class_replays_with_status(self, tmp_path):
+        cassette = Cassette(mode="replay", directory=str(tmp_path), latency="none")
+        key = cassette.request_key("llm", {"q": 1})
+        cassette.store.save(key, {"kind": "llm", "request": {"q": 1}, "elapsed": 0, "error": {
+            "type": "GoneError", "class": "missing_sdk.GoneError", "message": "overloaded", "status_code": 529
+        }})
+
+        with pytest.raises(RecordedError) as error:
+            cassette.call("llm", {"q": 1}, MagicMock())
+
+        assert error.value.status_code == 529
+        assert error.value.error_type == "GoneError"
+        assert is_failover_error(error.value)
@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from app.output.completion_cache import CompletionCache
+from app.output.llm_summarizer import LLMSummarizer
+
+MESSAGES = [{"role": "system", "content": "You are a GI expert."}, {"role": "user", "content": "GERD?"}]
+
+class TestCompletionCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return CompletionCache(path=str(tmp_path / "completions.sqlite3"), max_entries=2, ttl=60)
+    
+    def test_key_depends_on_all_parameters(self):
+        base = CompletionCache.make_key("openai", "gpt-3.5-turbo", 0.3, 500, MESSAGES)
+        
+        assert base == CompletionCache.make_key("openai", "gpt-3.5-turbo", 0.3, 500, list(MESSAGES))
+        assert base != CompletionCache.make_key("groq", "gpt-3.5-turbo", 0.3, 500, MESSAGES)
+        assert base != CompletionCache.make_key("openai", "gpt-4o", 0.3, 500, MESSAGES)
+        assert base != CompletionCache.make_key("openai", "gpt-3.5-turbo", 0.0, 500, MESSAGES)
+        assert base != CompletionCache.make_key("openai", "gpt-3.5-turbo", 0.3, 200, MESSAGES)
+        assert base != CompletionCache.make_key("openai", "gpt-3.5-turbo", 0.3, 500, MESSAGES[:1])
+    
+    def test_hit_and_miss_metrics(self, cache):
+        assert cache.get("k1") is None
+        cache.set("k1", {"content": "PPIs"})
+        
+        assert cache.get("k1") == {"content": "PPIs"}
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+    
+    def test_lru_eviction(self, cache):
+        cache.set("k1", {"content": "a"})
+        cache.set("k2", {"content": "b"})
+        cache.get("k1")
+        cache.set("k3", {"content": "c"})
+        
+        assert cache.get("k2") is None
+        assert cache.get("k1") is not None
+        assert cache.stats()["evictions"] == 1
+    
+    def test_ttl_expiry(self, cache):
+        with patch("app.output.completion_cache.time.time", return_value=1000.0):
+            cache.set("k1", {"content": "a"})
+        with patch("app.output.completion_cache.time.time", return_value=1061.0):
+            assert cache.get("k1") is None
+    
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "completions.sqlite3")
+        CompletionCache(path=path).set("k1", {"content": "a"})
+        
+        assert CompletionCache(path=path).get("k1") == {"content": "a"}
+
+class TestSummarizerUsesCache:
+    def test_second_call_skips_llm(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LLM_SERVICE", "openai")
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        summarizer = LLMSummarizer()
+        summarizer.completion_cache = CompletionCache(path=str(tmp_path / "c.sqlite3"))
+        summarizer.client = MagicMock()
+        summarizer.client.chat.completions.create.return_value.choices = [
+            MagicMock(message=MagicMock(content="PPIs are first line [SOURCE 1]"))
+        ]
+        contents = [{"title": "GERD", "content": "PPIs are first line.", "source_url": "https://example.com",
+                     "extraction_success": True}]
+        
+        first = summarizer.summarize("gerd treatment", contents)
+        second = summarizer.summarize("gerd treatment", contents)
+        
+        assert summarizer.client.chat.completions.create.call_count == 1
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["summary"] == first["summary"]
@@ -0,0 +1,52 @@
+import pytest
+from app.output.context_builder import ContextBuilder
+
+class TestContextBuilder:
+    @pytest.fixture
+    def builder(self):
+        return ContextBuilder(budget=300)
+    
+    def test_allocate_gives_short_sources_everything(self):
+        grants = ContextBuilder.allocate(needs=[50, 1000, 1000], weights=[1.0, 1.0, 1.0], budget=650)
+        
+        assert grants[0] == 50
+        assert grants[1] == grants[2] == 300
+    
+    def test_allocate_follows_relevance(self):
+        grants = ContextBuilder.allocate(needs=[1000, 1000], weights=[0.9, 0.3], budget=400)
+        
+        assert grants[0] == 300
+        assert grants[1] == 100
+    
+    def test_build_respects_budget(self, builder):
+        contents = [
+            {"title": "Relevant", "source_url": "https://example.com/a", "content": "reflux " * 2000, "score": 0.9},
+            {"title": "Less relevant", "source_url": "https://example.com/b", "content": "ulcer " * 2000, "score": 0.3}
+        ]
+        
+        context = builder.build(contents, "gpt-3.5-turbo")
+        
+        assert "### SOURCE 1: Relevant" in context
+        assert "### SOURCE 2: Less relevant" in context
+        assert "[content truncated to fit context budget]" in context
+        # Header and marker overhead aside, the prompt stays near the budget
+        assert builder.count_tokens(context, "gpt-3.5-turbo") < 400
+        assert context.count("reflux") > context.count("ulcer")
+    
+    def test_short_content_untouched(self, builder):
+        contents = [{"title": "Short", "source_url": "https://example.com/s", "content": "PPIs are first line."}]
+        
+        context = builder.build(contents, "gpt-3.5-turbo")
+        
+        assert "PPIs are first line." in context
+        assert "truncated" not in context
+    
+    def test_token_counts_cached(self, builder):
+        from app.output import context_builder
+        text = "Helicobacter pylori eradication " * 10
+        
+        first = builder.count_tokens(text, "gpt-3.5-turbo")
+        hits = context_builder._token_counts.hits
+        
+        assert builder.count_tokens(text, "gpt-3.5-turbo") == first
+        assert context_builder._token_counts.hits == hits + 1
@@ -0,0 +1,135 @@
+import os
+import pytest
+from app.knowledge.corpus_index import CorpusIndex, encode_varints, decode_varints
+from app.knowledge.corpus_search import CorpusSearch
+
+FILLER = ("the stomach and the colon are parts of the digestive tract and patients may "
+          "report pain after meals or during the night with other symptoms")
+
+def page(topic: str, repeat: int = 3) -> str:
+    return " ".join([FILLER, topic] * repeat)
+
+class TestVarints:
+    def test_round_trip(self):
+        values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 40]
+        
+        assert decode_varints(encode_varints(values)).tolist() == values
+    
+    def test_small_values_take_one_byte(self):
+        assert len(encode_varints([0, 5, 127])) == 3
+        assert decode_varints(b"").tolist() == []
+
+class TestCorpusIndex:
+    @pytest.fixture
+    def index(self, tmp_path):
+        return CorpusIndex(str(tmp_path / "corpus"), chunk_words=40, flush_docs=1000, merge_factor=3)
+    
+    def test_buffered_documents_are_searchable(self, index):
+        index.add_document("https://a.org", "H. pylori", page("helicobacter pylori eradication therapy"))
+        index.add_document("https://b.org", "Colon cancer", page("colonoscopy screening interval"))
+        
+        hits = index.search("pylori eradication")
+        
+        assert hits[0].document["url"] == "https://a.org"
+        assert hits[0].relevance > 0.5
+        assert all(hit.document["url"] != "https://b.org" for hit in hits)
+        assert index.stats()["buffered"] > 0
+    
+    def test_partial_matches_score_below_full_matches(self, index):
+        index.add_document("https://a.org", "H. pylori", page("helicobacter pylori eradication therapy", repeat=6))
+        index.add_document("https://b.org", "Celiac", page("celiac serology biopsy"))
+        
+        full = index.search("helicobacter pylori therapy")[0]
+        partial = index.search("helicobacter pylori children")[0]
+        
+        assert full.coverage == 1.0
+        assert partial.coverage < 0.7
+        assert partial.relevance < full.relevance <= 1.0
+    
+    def test_commit_persists_segments(self, index, tmp_path):
+        index.add_document("https://a.org", "H. pylori", page("helicobacter pylori eradication therapy"))
+        index.commit()
+        
+        reopened = CorpusIndex(index.path)
+        
+        assert len(reopened) == len(index)
+        assert reopened.search("eradication")[0].document["title"] == "H. pylori"
+        assert any(name.endswith(".bin") for name in os.listdir(index.path))
+    
+    def test_readding_a_url_replaces_its_chunks(self, index):
+        index.add_document("https://a.org", "Old", page("sucralfate coating"))
+        index.commit()
+        index.add_document("https://a.org", "New", page("vonoprazan dual therapy"))
+        
+        assert index.search("sucralfate") == []
+        assert index.search("vonoprazan")[0].document["title"] == "New"
+        index.commit()
+        assert CorpusIndex(index.path).search("sucralfate") == []
+        assert index.stats()["urls"] == 1
+    
+    def test_delete_url(self, index):
+        index.add_document("https://a.org", "Ulcers", page("peptic ulcer bleeding"))
+        index.commit()
+        
+        assert index.delete_url("https://a.org") > 0
+        assert index.search("ulcer") == []
+        index.commit()
+        assert len(CorpusIndex(index.path)) == 0
+    
+    def test_merges_keep_rankings(self, index):
+        topics = ["achalasia manometry", "barrett esophagus surveillance", "celiac serology",
+                  "diverticulitis antibiotics", "eosinophilic esophagitis", "fecal calprotectin"]
+        for i, topic in enumerate(topics):
+            index.add_document(f"https://{i}.org", topic, page(topic))
+            index.commit()
+        before = [(hit.document["url"], round(hit.score, 6)) for hit in index.search("esophagus esophagitis", k=5)]
+        
+        # Six single-document commits at merge factor 3 leave fewer segments
+        assert index.stats()["segments"] < len(topics)
+        assert before[0][0] in ("https://1.org", "https://4.org")
+        assert [(hit.document["url"], round(hit.score, 6))
+                for hit in CorpusIndex(index.path).search("esophagus esophagitis", k=5)] == before
+    
+    def test_processes_share_an_index(self, index):
+        other = CorpusIndex(index.path, refresh_interval=0)
+        index.add_document("https://a.org", "Cirrhosis", page("cirrhosis varices banding"))
+        index.commit()
+        other.add_document("https://b.org", "Hepatitis", page("hepatitis b antiviral"))
+        other.commit()
+        index.add_document("https://c.org", "Pancreatitis", page("pancreatitis lipase"))
+        index.commit()
+        
+        assert {hit.document["url"] for hit in other.search("cirrhosis hepatitis pancreatitis", k=10)} == \
+            {"https://a.org", "https://b.org", "https://c.org"}
+        hits = other.search("digestive", k=50)
+        assert len({hit.doc_id for hit in hits}) == len(hits)
+
+class TestCorpusSearch:
+    @pytest.fixture
+    def corpus(self, tmp_path):
+        return CorpusSearch(CorpusIndex(str(tmp_path / "corpus"), chunk_words=40))
+    
+    def test_ingest_skips_failed_and_basic_extractions(self, corpus):
+        indexed = corpus.ingest([
+            {"title": "GERD", "content": page("reflux esophagitis ppi"), "source_url": "https://a.org",
+             "extraction_success": True},
+            {"title": "Failed", "content": "fallback", "source_url": "https://b.org", "extraction_success": False},
+            {"title": "Raw", "content": "<html>reflux</html>", "source_url": "https://c.org",
+             "extraction_success": True, "extraction_method": "basic"}
+        ])
+        
+        assert indexed == 1
+        assert {result["url"] for result in corpus.search("reflux")} == {"https://a.org"}
+    
+    def test_retrieve_returns_extracted_contents(self, corpus):
+        corpus.ingest([{"title": "GERD", "content": page("reflux esophagitis ppi", repeat=6),
+                        "source_url": "https://a.org", "extraction_success": True}])
+        
+        contents = corpus.retrieve("reflux esophagitis ppi", limit=3)
+        
+        assert len(contents) == 1
+        assert contents[0]["source_url"] == "https://a.org"
+        assert contents[0]["extraction_success"] is True
+        assert contents[0]["source"] == "local_corpus"
+        assert "reflux esophagitis ppi" in contents[0]["content"]
+        assert corpus.retrieve("hemorrhoid banding", limit=3) == []
@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import MagicMock
+from app.knowledge.search_engines import duckduckgo_search
+from app.knowledge.search_engines.duckduckgo_search import DuckDuckGoSearch, SharedDuckDuckGoClient
+from app.utils.rate_limiter import TokenBucket
+
+class TestTokenBucket:
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() > 0.0
+    
+    def test_acquire_timeout(self):
+        bucket = TokenBucket(rate=0.1, capacity=1)
+        bucket.drain()
+        
+        assert bucket.acquire(timeout=0.01) is False
+
+@pytest.mark.skipif(duckduckgo_search.DDGS is None, reason="duckduckgo-search not installed")
+class TestDuckDuckGoSearch:
+    @pytest.fixture
+    def ddgs(self):
+        mock = MagicMock()
+        mock.text.return_value = [
+            {"title": "GERD", "href": "https://example.com/gerd", "body": "Reflux..."}
+        ]
+        return mock
+    
+    @pytest.fixture
+    def search(self, ddgs, monkeypatch):
+        client = SharedDuckDuckGoClient()
+        client._ddgs = ddgs
+        monkeypatch.setattr(duckduckgo_search, "_shared_client", client)
+        return DuckDuckGoSearch()
+    
+    def test_instances_share_client(self, search):
+        assert DuckDuckGoSearch().client is search.client
+    
+    def test_results_are_cached(self, search, ddgs):
+        first = search.search("GERD treatment", max_results=5)
+        second = search.search("gerd treatment ", max_results=5)
+        
+        assert first == second
+        assert first[0]["url"] == "https://example.com/gerd"
+        ddgs.text.assert_called_once()
+    
+    def test_rate_limit_starts_cooldown(self, search, ddgs):
+        ddgs.text.side_effect = duckduckgo_search.RatelimitException("202 Ratelimit")
+        
+        results = search.search("ibs diet", max_results=5)
+        
+        assert search.client.is_throttled()
+        assert results == search._get_placeholder_results("ibs diet", 5)
+        
+        # No further calls are made while cooling down
+        search.search("crohn's disease", max_results=5)
+        assert ddgs.text.call_count == 1
+    
+    def test_async_search(self, search):
+        import asyncio
+        
+        results = asyncio.run(search.asearch("GERD", max_results=5))
+        
+        assert results[0]["title"] == "GERD"
@@ -0,0 +1,75 @@
+import re
+import numpy as np
+from app.output.extractive_summarizer import ExtractiveSummarizer, split_sentences, textrank
+
+class ServerError(Exception):
+    status_code = 503
+
+CONTENTS = [
+    {
+        "title": "GERD treatment",
+        "content": (
+            "Proton pump inhibitors are the most effective treatment for erosive GERD. "
+            "An eight week course of a proton pump inhibitor heals most cases of esophagitis. "
+            "The clinic is open on weekdays from nine until five.\n\n"
+            "Weight loss and raising the head of the bed reduce reflux symptoms."
+        ),
+        "source_url": "https://example.org/gerd",
+        "extraction_success": True
+    },
+    {
+        "title": "Surgery",
+        "content": "Fundoplication is an option for GERD treatment when medication fails. Short.",
+        "source_url": "https://example.org/surgery",
+        "extraction_success": True
+    }
+]
+
+class TestExtractiveSummarizer:
+    def test_split_sentences_drops_fragments(self):
+        sentences = split_sentences("Heading\n\nThis sentence is long enough to keep. Too short.")
+        
+        assert sentences == ["This sentence is long enough to keep."]
+    
+    def test_textrank_favours_central_nodes(self):
+        similarity = np.array([[0, 1, 1], [1, 0, 0.1], [1, 0.1, 0]], dtype=float)
+        
+        scores = textrank(similarity)
+        
+        assert abs(scores.sum() - 1.0) < 1e-6
+        assert scores.argmax() == 0
+    
+    def test_cited_summary_prefers_relevant_sentences(self):
+        summary = ExtractiveSummarizer().summarize("What is the treatment for GERD?", CONTENTS, ["GERD"])
+        lines = summary.splitlines()
+        
+        assert 3 <= len(lines) <= 7
+        assert all(re.search(r"\[SOURCE [12]\]$", line) for line in lines)
+        assert "Fundoplication is an option for GERD treatment when medication fails. [SOURCE 2]" in summary
+        assert "clinic" not in summary
+
+class TestSummarizerExtractiveModes:
+    def test_fast_mode_makes_no_llm_call(self, make_summarizer):
+        summarizer, client = make_summarizer()
+        
+        result = summarizer.summarize("GERD treatment", CONTENTS, mode="extractive")
+        
+        client.chat.completions.create.assert_not_called()
+        assert result["model_used"] == "extractive"
+        assert len(result["sources"]) == 2
+    
+    def test_falls_back_when_providers_fail(self, make_summarizer):
+        summarizer, _ = make_summarizer(ServerError("down"))
+        
+        result = summarizer.summarize("GERD treatment", CONTENTS)
+        
+        assert result["fallback"] is True
+        assert "[SOURCE 1]" in result["summary"]
+        assert "error" not in result
+    
+    def test_fallback_can_be_disabled(self, make_summarizer):
+        summarizer, _ = make_summarizer(ServerError("down"), EXTRACTIVE_FALLBACK_ENABLED="false")
+        
+        result = summarizer.summarize("GERD treatment", CONTENTS)
+        
+        assert "error" in result
@@ -0,0 +1,32 @@
+from app.core.intent import classify_intent, intent_profile, DEFAULT_INTENT
+from app.core.reasoning_agent import ReasoningAgent
+
+class TestIntent:
+    def test_classification(self):
+        assert classify_intent("what is the most likely cause of upper gi bleeding?") == "factoid"
+        assert classify_intent("how to treat gerd in pregnancy") == "treatment"
+        assert classify_intent("consensus on barrett's surveillance") == "guideline"
+        assert classify_intent("how often should colonoscopy be repeated") == "screening"
+        assert classify_intent("tell me about cirrhosis") == DEFAULT_INTENT
+    
+    def test_factoid_profile_is_shortest(self):
+        assert intent_profile("factoid")["max_tokens"] < intent_profile("guideline")["max_tokens"]
+        assert intent_profile("unknown") == intent_profile(DEFAULT_INTENT)
+    
+    def test_intent_carried_on_every_need(self):
+        needs = ReasoningAgent().analyze({"normalized_text": "what is the most common cause of gastritis?"})
+        
+        assert {need["intent"] for need in needs} == {"factoid"}
+
+class TestSummarizerIntentProfile:
+    def test_factoid_uses_short_generation(self, make_summarizer, completion):
+        summarizer, client = make_summarizer()
+        client.chat.completions.create.return_value = completion("H. pylori [SOURCE 1]")
+        contents = [{"title": "T", "content": "Text.", "source_url": "https://example.org", "extraction_success": True}]
+        
+        summarizer.summarize("most common cause of gastritis?", contents, intent="factoid")
+        
+        request = client.chat.completions.create.call_args.kwargs
+        assert request["max_tokens"] == intent_profile("factoid")["max_tokens"]
+        assert request["stop"] == intent_profile("factoid")["stop"]
+        assert intent_profile("factoid")["length_rule"] in request["messages"][0]["content"]
@@ -0,0 +1,120 @@
+import numpy as np
+from app.core import intent, intent_classifier
+from app.core.intent import detect_intent
+from app.core.intent_classifier import IntentClassifier, IntentPrediction, load_training_data, DEFAULT_TRAINING_DATA
+from app.core.query_processor import QueryProcessor
+from app.utils.hashing_vectorizer import HashingVectorizer
+
+TEXTS = [
+    "how to treat gerd", "treatment options for crohn's disease", "managing ulcerative colitis flares",
+    "how is celiac disease diagnosed", "tests to diagnose h. pylori", "diagnostic workup for dysphagia",
+    "when to start colon cancer screening", "how often is surveillance colonoscopy needed", "screening for varices"
+]
+LABELS = ["treatment"] * 3 + ["diagnosis"] * 3 + ["screening"] * 3
+
+
+class TestHashingVectorizer:
+    def test_deterministic_and_scaled(self):
+        vectorizer = HashingVectorizer(n_features=256)
+        
+        indexes, values = vectorizer.transform_one("Treatment of GERD")
+        again, _ = HashingVectorizer(n_features=256).transform_one("treatment of gerd")
+        
+        assert indexes.tolist() == again.tolist()
+        assert indexes.max() < 256
+        hashes = sum(len(vectorizer.unit_hashes(unit)) for unit in vectorizer.units("treatment of gerd"))
+        assert np.isclose(np.abs(values).sum() * np.sqrt(hashes), hashes)
+    
+    def test_units_cover_words_and_pairs(self):
+        assert HashingVectorizer().units("H. pylori test") == ["h", "pylori", "test", "h pylori", "pylori test"]
+
+
+class TestIntentClassifier:
+    def test_learns_training_data(self):
+        model = IntentClassifier.train(TEXTS, LABELS, n_features=1024)
+        
+        assert [model.predict(text).intent for text in TEXTS] == LABELS
+        assert np.isclose(model.predict_proba("treatment of gerd").sum(), 1.0)
+    
+    def test_memoized_scores_match_dense_features(self):
+        model = IntentClassifier.train(TEXTS, LABELS, n_features=1024)
+        matrix = model.vectorizer.transform(["screening colonoscopy interval"])
+        
+        scores = matrix[0] @ model.weights + model.bias
+        expected = np.exp(scores - scores.max()) / np.exp(scores - scores.max()).sum()
+        
+        assert np.allclose(model.predict_proba("screening colonoscopy interval"), expected, atol=1e-5)
+    
+    def test_save_and_load_round_trip(self, tmp_path):
+        model = IntentClassifier.train(TEXTS, LABELS, n_features=1024)
+        path = str(tmp_path / "model.npz")
+        
+        model.save(path)
+        loaded = IntentClassifier.load(path)
+        
+        assert loaded.classes == model.classes
+        assert loaded.vectorizer.n_features == 1024
+        assert np.allclose(loaded.predict_proba("how to treat gerd"), model.predict_proba("how to treat gerd"))
+    
+    def test_bundled_training_data(self):
+        texts, labels = load_training_data([DEFAULT_TRAINING_DATA])
+        
+        assert len(texts) == len(labels) > 100
+        assert set(labels) >= set(intent.INTENTS) | {intent.DEFAULT_INTENT}
+
+
+class TestDetectIntent:
+    def test_falls_back_to_keywords_when_disabled(self, monkeypatch):
+        monkeypatch.setenv("INTENT_CLASSIFIER_ENABLED", "false")
+        
+        assert detect_intent("how to treat gerd in pregnancy") == IntentPrediction("treatment", 0.0)
+    
+    def test_low_confidence_uses_keywords(self, monkeypatch):
+        model = IntentClassifier.train(TEXTS, LABELS, n_features=1024)
+        monkeypatch.setattr(intent, "get_intent_classifier", lambda: model)
+        monkeypatch.setenv("INTENT_MIN_CONFIDENCE", "1.01")
+        
+        assert detect_intent("what is the most common cause of gastritis?") == IntentPrediction("factoid", 0.0)
+    
+    def test_confident_prediction_wins(self, monkeypatch):
+        model = IntentClassifier.train(TEXTS, LABELS, n_features=1024)
+        monkeypatch.setattr(intent, "get_intent_classifier", lambda: model)
+        monkeypatch.setenv("INTENT_MIN_CONFIDENCE", "0.0")
+        
+        prediction = detect_intent("when should screening colonoscopy start")
+        
+        assert prediction.intent == "screening"
+        assert prediction.confidence > 0
+    
+    def test_keyword_intent_wins_on_disagreement(self, monkeypatch):
+        # A model that has learned to call treatment questions "diagnosis"
+        model = IntentClassifier.train(TEXTS, ["diagnosis"] * 6 + ["screening"] * 3, n_features=1024)
+        monkeypatch.setattr(intent, "get_intent_classifier", lambda: model)
+        monkeypatch.setenv("INTENT_MIN_CONFIDENCE", "0.0")
+        
+        assert model.predict("how to treat gerd").intent == "diagnosis"
+        assert detect_intent("how to treat gerd") == IntentPrediction("treatment", 0.0)
+        assert detect_intent("what is the most common cause of gastritis?") == IntentPrediction("factoid", 0.0)
+    
+    def test_shipped_model_keeps_treatment_questions(self):
+        processor = QueryProcessor()
+        
+        for query in ["what is the treatment for h. pylori?", "what is the treatment of gerd",
+                      "what is the best treatment for crohns disease"]:
+            assert processor.process(query)["intent"] == "treatment", query
+
+
+class TestGetIntentClassifier:
+    def test_missing_model_is_not_trained(self, monkeypatch, tmp_path):
+        path = tmp_path / "missing.npz"
+        monkeypatch.setattr(intent_classifier, "_default_classifier", None)
+        monkeypatch.setenv("INTENT_MODEL_PATH", str(path))
+        
+        assert intent_classifier.get_intent_classifier() is None
+        assert not path.exists()
+    
+    def test_loads_shipped_model(self, monkeypatch):
+        monkeypatch.setattr(intent_classifier, "_default_classifier", None)
+        monkeypatch.delenv("INTENT_MODEL_PATH", raising=False)
+        
+        assert intent_classifier.get_intent_classifier() is not None
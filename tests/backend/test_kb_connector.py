@@ -0,0 +1,64 @@
+from app.knowledge.kb_connector import GastroKnowledgeBase, load_documents, has_citable_source, DEFAULT_KB_DOCUMENTS
+
+
+class TestGastroKnowledgeBase:
+    def test_seeds_empty_index(self, tmp_path):
+        kb = GastroKnowledgeBase(index_path=str(tmp_path / "kb"))
+        
+        assert len(kb.index) == len(load_documents(DEFAULT_KB_DOCUMENTS))
+        assert (tmp_path / "kb" / "manifest.json").exists()
+    
+    def test_query_ranks_relevant_document_first(self, tmp_path):
+        kb = GastroKnowledgeBase(index_path=str(tmp_path / "kb"))
+        
+        response = kb.query("evaluation of chronic diarrhea")
+        
+        assert response["results"][0]["title"] == "Diagnostic Approach to Chronic Diarrhea"
+        assert response["results"][0]["relevance_score"] > 0
+        assert response["result_count"] == len(response["results"])
+    
+    def test_filters_still_apply(self, tmp_path):
+        kb = GastroKnowledgeBase(index_path=str(tmp_path / "kb"))
+        
+        response = kb.query("ibd management", filters={"category": "diagnosis"})
+        
+        assert all("diagnos" in result["title"].lower() for result in response["results"])
+        assert response["filters_applied"] == {"category": "diagnosis"}
+    
+    def test_covering_results_require_concepts_and_intent(self, tmp_path):
+        kb = GastroKnowledgeBase(index_path=str(tmp_path / "kb"))
+        
+        covered = kb.covering_results("how is gerd treated?", ["gastroesophageal reflux disease"], "treatment")
+        
+        assert [result["title"] for result in covered] == ["GERD Treatment Guidelines"]
+        assert "gastroesophageal reflux disease" in covered[0]["concepts"]
+        assert kb.covering_results("how is gerd diagnosed?", ["gastroesophageal reflux disease"], "diagnosis") == []
+        assert kb.covering_results("acute pancreatitis management", ["pancreatitis"], "treatment") == []
+        assert kb.covering_results("how is gerd treated?", ["gastroesophageal reflux disease"], "treatment",
+                                   min_score=0.99) == []
+    
+    def test_added_and_deleted_documents_persist(self, tmp_path):
+        kb = GastroKnowledgeBase(index_path=str(tmp_path / "kb"), seed_documents="")
+        labels = kb.add_documents([
+            {"title": "Celiac Disease Diagnosis", "content": "Tissue transglutaminase IgA serology while on gluten.",
+             "url": "https://example.org/celiac", "source_type": "clinical_guidelines", "publication_date": "2023-01-01"},
+            {"title": "Barrett's Esophagus Surveillance", "content": "Endoscopic surveillance intervals depend on dysplasia.",
+             "url": "https://example.org/barrett", "source_type": "clinical_guidelines", "publication_date": "2022-01-01"}
+        ])
+        kb.delete_document(labels[1])
+        kb.index.save()
+        
+        reloaded = GastroKnowledgeBase(index_path=str(tmp_path / "kb"), seed_documents="")
+        
+        assert reloaded.query("celiac serology")["results"][0]["url"] == "https://example.org/celiac"
+        results = reloaded.query("barrett's esophagus surveillance")["results"]
+        assert all(result["kb_id"] != labels[1] for result in results)
+    
+    def test_placeholder_sources_are_not_citable(self):
+        assert has_citable_source({"url": "https://gi.org/guidelines/gerd"})
+        assert has_citable_source({"url": "https://www.ncbi.nlm.nih.gov/books/NBK441938/"})
+        assert not has_citable_source({"url": "https://example.com/gerd-guidelines"})
+        assert not has_citable_source({"url": "https://docs.example.org/ibd"})
+        assert not has_citable_source({"url": ""})
+        assert not has_citable_source({"url": "kb://3"})
+        assert not any(has_citable_source(document) for document in load_documents(DEFAULT_KB_DOCUMENTS))
@@ -1,6 +1,11 @@
+import json
 import pytest
 from unittest.mock import MagicMock, patch
-from app.core.knowledge_router import KnowledgeRouter
+from app.core.knowledge_router import KnowledgeRouter, tier_counts
+from app.knowledge.corpus_index import CorpusIndex
+from app.knowledge.corpus_search import CorpusSearch
+from app.knowledge.kb_connector import GastroKnowledgeBase, load_documents, DEFAULT_KB_DOCUMENTS
+from app.utils.ttl_cache import TTLCache
 
 class TestKnowledgeRouter:
     @pytest.fixture
@@ -79,4 +84,228 @@ class TestKnowledgeRouter:
             search_type="combined"
         )
         assert "kb_results" in results
-        assert "search_results" in results
\ No newline at end of file
+        assert "search_results" in results
+class TestMergedSummarization:
+    @pytest.fixture
+    def router(self):
+        with patch("app.core.knowledge_router.DynamicSearch") as search_cls, \
+             patch("app.core.knowledge_router.LLMSummarizer") as summarizer_cls:
+            router = KnowledgeRouter()
+        router.negative_cache = MagicMock(is_blocked=MagicMock(return_value=False))
+        router.retrieval_cache = TTLCache()
+        
+        results_by_query = {
+            "gerd treatment guidelines": [
+                {"url": "https://a.org", "score": 0.4},
+                {"url": "https://shared.org", "score": 0.9}
+            ],
+            "how is gerd treated?": [
+                {"url": "https://shared.org", "score": 0.7},
+                {"url": "https://c.org", "score": 0.99}
+            ]
+        }
+        router.dynamic_search.search.side_effect = lambda query, search_type: {"medical": results_by_query[query]}
+        router.dynamic_search.extract_content.side_effect = lambda url, extractor: {
+            "title": url, "content": f"content of {url}", "source_url": url, "extraction_success": True
+        }
+        router.summarizer.summarize.return_value = {"summary": "merged", "sources": []}
+        return router
+    
+    def test_single_summary_call_over_all_needs(self, router):
+        needs = [
+            {"type": "medical", "query": "gerd treatment guidelines", "priority": 1.0,
+             "concepts": ["gerd"], "intent": "treatment", "original_query": "how is gerd treated?"},
+            {"type": "medical", "query": "how is gerd treated?", "priority": 0.8,
+             "concepts": ["gerd"], "intent": "treatment", "original_query": "how is gerd treated?"}
+        ]
+        
+        results = router.retrieve(needs)
+        
+        router.summarizer.summarize.assert_called_once()
+        args, kwargs = router.summarizer.summarize.call_args
+        query, contents = args
+        assert query == "how is gerd treated?"
+        assert kwargs["intent"] == "treatment"
+        # Deduplicated by URL, ordered by need priority and then score
+        assert [c["source_url"] for c in contents] == ["https://shared.org", "https://a.org", "https://c.org"]
+        assert contents[0]["needs"] == ["need_0", "need_1"]
+        
+        assert results["need_0"]["summarized_response"]["summary"] == "merged"
+        assert results["need_1"]["summarized_response"] is None
+        assert results["need_1"]["summarized_in"] == "need_0"
+    
+    def test_paraphrases_share_cached_results(self, router):
+        router.summarizer.summarize.return_value = {
+            "summary": "merged", "sources": [],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "calls": [{"model": "m"}]}
+        }
+        needs = [{"type": "medical", "query": "gerd treatment guidelines", "priority": 1.0,
+                  "original_query": "how is gerd treated?", "fingerprint": "abc"}]
+        
+        first = router.retrieve(needs)
+        paraphrase = [dict(needs[0], original_query="How is acid reflux treated?")]
+        second = router.retrieve(paraphrase)
+        
+        router.summarizer.summarize.assert_called_once()
+        assert router.dynamic_search.search.call_count == 1
+        assert second["need_0"]["summarized_response"]["summary"] == "merged"
+        assert second["need_0"]["summarized_response"]["cached"] is True
+        assert second["need_0"]["summarized_response"]["usage"]["calls"] == []
+        assert "cached" not in first["need_0"]["summarized_response"]
+    
+    def test_errors_are_not_cached(self, router):
+        router.summarizer.summarize.return_value = {"summary": "failed", "sources": [], "error": "timeout"}
+        needs = [{"type": "medical", "query": "gerd treatment guidelines", "fingerprint": "abc"}]
+        
+        router.retrieve(needs)
+        router.retrieve(needs)
+        
+        assert router.summarizer.summarize.call_count == 2
+    
+    def test_fallback_answers_are_not_cached(self, router):
+        router.summarizer.summarize.side_effect = [
+            {"summary": "extractive", "sources": [], "fallback": True, "llm_error": "rate limited"},
+            {"summary": "full answer", "sources": []}
+        ]
+        needs = [{"type": "medical", "query": "gerd treatment guidelines", "fingerprint": "abc"}]
+        
+        first = router.retrieve(needs)
+        second = router.retrieve(needs)
+        
+        assert router.summarizer.summarize.call_count == 2
+        assert first["need_0"]["summarized_response"]["summary"] == "extractive"
+        assert second["need_0"]["summarized_response"]["summary"] == "full answer"
+        assert router.retrieve(needs)["need_0"]["summarized_response"]["cached"] is True
+
+class TestLocalCorpusTier:
+    @pytest.fixture
+    def router(self, tmp_path):
+        with patch("app.core.knowledge_router.DynamicSearch"), \
+             patch("app.core.knowledge_router.LLMSummarizer"):
+            router = KnowledgeRouter()
+        router.negative_cache = MagicMock(is_blocked=MagicMock(return_value=False))
+        router.retrieval_cache = None
+        router.corpus_search = CorpusSearch(CorpusIndex(str(tmp_path / "corpus")))
+        
+        pages = {
+            "https://a.org": "Vonoprazan dual therapy eradicates helicobacter pylori infection in most patients.",
+            "https://b.org": "Bismuth quadruple therapy remains first line for helicobacter pylori infection."
+        }
+        router.dynamic_search.search.return_value = {"medical": [{"url": url, "score": 0.8} for url in pages]}
+        router.dynamic_search.extract_content.side_effect = lambda url, extractor: {
+            "title": url, "content": pages[url], "source_url": url, "extraction_success": True
+        }
+        router.summarizer.summarize.return_value = {"summary": "answer", "sources": []}
+        return router
+    
+    def test_extractions_answer_later_requests(self, router):
+        needs = [{"type": "medical", "query": "h pylori treatment guidelines", "max_extractions": 2,
+                  "original_query": "helicobacter pylori infection therapy",
+                  "covers": ["Helicobacter pylori infection"], "intent": "treatment"}]
+        
+        first = router.retrieve(needs)
+        second = router.retrieve(needs)
+        
+        assert first["need_0"]["answered_by"] == "web"
+        assert second["need_0"]["answered_by"] == "local_corpus"
+        assert router.dynamic_search.search.call_count == 1
+        assert router.dynamic_search.extract_content.call_count == 2
+        assert {c["source_url"] for c in second["need_0"]["extracted_contents"]} == {"https://a.org", "https://b.org"}
+    
+    def test_weak_local_matches_go_to_the_web(self, router):
+        router.corpus_search.ingest([{"title": "Other", "content": "Colonoscopy screening starts at 45.",
+                                      "source_url": "https://c.org", "extraction_success": True}])
+        needs = [{"type": "medical", "query": "pylori therapy", "original_query": "helicobacter pylori therapy"}]
+        
+        results = router.retrieve(needs)
+        
+        assert results["need_0"]["answered_by"] == "web"
+        router.dynamic_search.search.assert_called_once()
+    
+    def test_pages_on_another_question_go_to_the_web(self, router):
+        router.corpus_search.ingest([{"title": f"H. pylori treatment {i}", "content": " ".join(
+            ["Helicobacter pylori treatment is bismuth quadruple therapy or vonoprazan dual therapy."] * 3),
+            "source_url": f"https://t{i}.org", "extraction_success": True} for i in range(2)])
+        for question, intent in [("how is helicobacter pylori diagnosed", "diagnosis"),
+                                 ("helicobacter pylori screening", "screening"),
+                                 ("helicobacter pylori in children", "general")]:
+            needs = [{"type": "medical", "query": question, "original_query": question,
+                      "covers": ["Helicobacter pylori infection"], "intent": intent}]
+            
+            assert router.retrieve(needs)["need_0"]["answered_by"] == "web", question
+    
+    def test_pages_must_cover_concepts_and_intent(self, router):
+        page = {"title": "H. pylori", "content": "Helicobacter pylori treatment is bismuth quadruple therapy."}
+        
+        assert router.corpus_search.covers(page, ["Helicobacter pylori infection"], "treatment")
+        assert not router.corpus_search.covers(page, ["Helicobacter pylori infection", "celiac disease"], "treatment")
+        assert not router.corpus_search.covers(page, ["Helicobacter pylori infection"], "diagnosis")
+
+class TestKnowledgeBaseTier:
+    @pytest.fixture
+    def router(self, tmp_path):
+        with patch("app.core.knowledge_router.DynamicSearch"), \
+             patch("app.core.knowledge_router.LLMSummarizer"):
+            router = KnowledgeRouter()
+        router.negative_cache = MagicMock(is_blocked=MagicMock(return_value=False))
+        router.retrieval_cache = None
+        # The bundled seed documents with real sources in place of their placeholder URLs
+        seed = tmp_path / "kb_documents.jsonl"
+        seed.write_text("".join(json.dumps(dict(document, url=f"https://gi.org/kb/{i}")) + "\n"
+                                for i, document in enumerate(load_documents(DEFAULT_KB_DOCUMENTS))))
+        router.knowledge_base = GastroKnowledgeBase(index_path=str(tmp_path / "kb"), seed_documents=str(seed))
+        router.dynamic_search.search.return_value = {"medical": [{"url": "https://web.org", "score": 0.8}]}
+        router.dynamic_search.extract_content.return_value = {
+            "title": "Web", "content": "web page", "source_url": "https://web.org", "extraction_success": True
+        }
+        router.summarizer.summarize.return_value = {"summary": "answer", "sources": []}
+        return router
+    
+    def test_confident_match_skips_the_web(self, router):
+        needs = [{"type": "medical", "query": "current treatment guidelines for gastroesophageal reflux disease",
+                  "covers": ["gastroesophageal reflux disease"], "intent": "treatment",
+                  "original_query": "how is gerd treated?"}]
+        before = tier_counts()["knowledge_base"]
+        
+        results = router.retrieve(needs)
+        
+        assert results["need_0"]["answered_by"] == "knowledge_base"
+        router.dynamic_search.search.assert_not_called()
+        router.dynamic_search.extract_content.assert_not_called()
+        contents = router.summarizer.summarize.call_args[0][1]
+        assert contents[0]["source_url"] == "https://gi.org/kb/0"
+        assert contents[0]["source"] == "knowledge_base"
+        assert tier_counts()["knowledge_base"] == before + 1
+    
+    def test_uncovered_need_falls_back_to_the_web(self, router):
+        needs = [{"type": "medical", "query": "diagnosis approach for gastroesophageal reflux disease",
+                  "covers": ["gastroesophageal reflux disease"], "intent": "diagnosis",
+                  "original_query": "how is gerd diagnosed?"}]
+        before = tier_counts()["web"]
+        
+        results = router.retrieve(needs)
+        
+        assert results["need_0"]["answered_by"] == "web"
+        router.dynamic_search.search.assert_called_once()
+        assert tier_counts()["web"] == before + 1
+    
+    def test_placeholder_documents_are_not_routable(self, router, tmp_path):
+        router.knowledge_base = GastroKnowledgeBase(index_path=str(tmp_path / "placeholder_kb"))
+        needs = [{"type": "medical", "query": "current treatment guidelines for gastroesophageal reflux disease",
+                  "covers": ["gastroesophageal reflux disease"], "intent": "treatment",
+                  "original_query": "how is gerd treated?"}]
+        
+        results = router.retrieve(needs)
+        
+        assert results["need_0"]["answered_by"] == "web"
+        router.dynamic_search.search.assert_called_once()
+    
+    def test_routing_is_off_by_default(self, monkeypatch):
+        monkeypatch.delenv("KB_ROUTING_ENABLED", raising=False)
+        with patch("app.core.knowledge_router.DynamicSearch"), \
+             patch("app.core.knowledge_router.LLMSummarizer"), \
+             patch("app.core.knowledge_router.get_knowledge_base") as get_knowledge_base:
+            router = KnowledgeRouter()
+        
+        assert router.knowledge_base is None
+        get_knowledge_base.assert_not_called()
@@ -0,0 +1,127 @@
+import json
+import os
+from app.knowledge.lexicon import Lexicon, compile_lexicon, get_lexicon
+
+
+def write_source(path, concepts):
+    path.write_text(json.dumps({"version": 1, "concepts": concepts}), encoding="utf-8")
+
+
+class TestLexicon:
+    def test_synonyms_resolve_to_concepts(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        write_source(source, [
+            {"id": "gerd", "category": "condition", "name": "gastroesophageal reflux disease",
+             "abbreviations": ["gerd"], "synonyms": ["acid reflux"]},
+            {"id": "esomeprazole", "category": "medication", "name": "esomeprazole", "brands": ["nexium"]}
+        ])
+        lexicon = Lexicon(source=str(source), path=str(tmp_path / "lexicon.automaton"))
+        
+        found = lexicon.found("is nexium better than esomeprazole for acid reflux or gerd?")
+        
+        assert found == {"condition": ["gastroesophageal reflux disease"], "procedure": [],
+                         "medication": ["esomeprazole"]}
+        assert [m.term for m in lexicon.find("Nexium")] == ["nexium"]
+        assert lexicon.find("Nexium")[0].concept_id == "esomeprazole"
+    
+    def test_compiles_missing_automaton(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        path = tmp_path / "compiled" / "lexicon.automaton"
+        write_source(source, [{"id": "ercp", "category": "procedure", "name": "ercp"}])
+        
+        lexicon = Lexicon(source=str(source), path=str(path))
+        
+        assert path.exists()
+        assert lexicon.names("procedure") == ["ercp"]
+    
+    def test_hot_reload(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        path = tmp_path / "lexicon.automaton"
+        write_source(source, [{"id": "ercp", "category": "procedure", "name": "ercp"}])
+        lexicon = Lexicon(source=str(source), path=str(path), reload_interval=0)
+        
+        # Rebuild from a new source, as scripts/build_lexicon.py would
+        write_source(source, [{"id": "eus", "category": "procedure", "name": "endoscopic ultrasound",
+                               "abbreviations": ["eus"]}])
+        compile_lexicon(str(source), str(path))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert lexicon.found("eus or ercp?")["procedure"] == ["endoscopic ultrasound"]
+        assert lexicon.stats()["reloads"] == 1
+    
+    def test_failed_reload_keeps_previous_version(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        path = tmp_path / "lexicon.automaton"
+        write_source(source, [{"id": "ercp", "category": "procedure", "name": "ercp"}])
+        lexicon = Lexicon(source=str(source), path=str(path), reload_interval=0)
+        
+        source.write_text('{"version": 1, "concepts": [{"id": "eus"', encoding="utf-8")
+        stat = os.stat(path)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert lexicon.found("eus or ercp?")["procedure"] == ["ercp"]
+        assert lexicon.correct("ercp") == ("ercp", [])
+        assert lexicon.stats()["reloads"] == 0
+        
+        # Retried once the source is fixed
+        write_source(source, [{"id": "eus", "category": "procedure", "name": "eus"}])
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        
+        assert lexicon.found("eus or ercp?")["procedure"] == ["eus"]
+        assert lexicon.stats()["reloads"] == 1
+    
+    def test_rebuilds_when_source_is_newer(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        path = tmp_path / "lexicon.automaton"
+        write_source(source, [{"id": "ercp", "category": "procedure", "name": "ercp"}])
+        compile_lexicon(str(source), str(path))
+        
+        write_source(source, [{"id": "emr", "category": "procedure", "name": "emr"}])
+        stat = os.stat(path)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert Lexicon(source=str(source), path=str(path)).names("procedure") == ["emr"]
+    
+    def test_spelling_index_built_next_to_automaton(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        known = tmp_path / "known.txt"
+        write_source(source, [{"id": "gastroparesis", "category": "condition", "name": "gastroparesis"},
+                              {"id": "dysphagia", "category": "condition", "name": "dysphagia"}])
+        known.write_text("# never corrected\ndysplasia\n", encoding="utf-8")
+        
+        lexicon = Lexicon(source=str(source), path=str(tmp_path / "lexicon.automaton"), known_words=str(known))
+        
+        assert (tmp_path / "lexicon.spelling.json").exists()
+        assert lexicon.correct("gastroparisis or dysplasia") == ("gastroparesis or dysplasia",
+                                                                 [("gastroparisis", "gastroparesis")])
+    
+    def test_brands_and_abbreviations_are_not_correction_targets(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        write_source(source, [{"id": "pancrelipase", "category": "medication", "name": "pancrelipase",
+                               "brands": ["pancreaze"], "abbreviations": ["perts"]}])
+        
+        lexicon = Lexicon(source=str(source), path=str(tmp_path / "lexicon.automaton"),
+                          dictionary=str(tmp_path / "missing.txt"))
+        
+        assert lexicon.correct("pancreas or pancrelipse") == ("pancreas or pancrelipase",
+                                                             [("pancrelipse", "pancrelipase")])
+        assert lexicon.correct("pancreaze") == ("pancreaze", [])
+    
+    def test_dictionary_words_are_not_corrected(self, tmp_path):
+        source = tmp_path / "lexicon.json"
+        dictionary = tmp_path / "words.txt"
+        write_source(source, [{"id": "resection", "category": "procedure", "name": "resection"}])
+        dictionary.write_text("retention\n", encoding="utf-8")
+        
+        lexicon = Lexicon(source=str(source), path=str(tmp_path / "lexicon.automaton"), dictionary=str(dictionary))
+        
+        assert lexicon.correct("urinary retention") == ("urinary retention", [])
+        assert lexicon.correct("resecton") == ("resection", [("resecton", "resection")])
+    
+    def test_bundled_lexicon(self):
+        lexicon = get_lexicon()
+        
+        assert lexicon is get_lexicon()
+        assert "Crohn's disease" in lexicon.names("condition")
+        assert lexicon.found("pill camera after a gi bleed")["procedure"] == ["capsule endoscopy"]
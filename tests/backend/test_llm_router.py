@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import MagicMock
+from app.output.llm_router import LLMRouter, LLMProvider, is_failover_error
+from app.output.llm_summarizer import LLMSummarizer
+
+class ServerError(Exception):
+    status_code = 503
+
+class BadRequest(Exception):
+    status_code = 400
+
+class APITimeoutError(Exception):
+    pass
+
+def make_provider(name, content="ok", error=None):
+    client = MagicMock()
+    if error is not None:
+        client.chat.completions.create.side_effect = error
+    else:
+        client.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content=content))]
+    return LLMProvider(name, client, f"{name}-model")
+
+class TestLLMRouter:
+    @pytest.fixture(autouse=True)
+    def no_exploration(self, monkeypatch):
+        monkeypatch.setenv("LLM_ROUTER_EXPLORE_RATE", "0")
+    
+    def test_failover_classification(self):
+        assert is_failover_error(ServerError())
+        assert is_failover_error(APITimeoutError())
+        assert not is_failover_error(BadRequest())
+    
+    def test_preferred_provider_used_first(self):
+        router = LLMRouter("openai", [make_provider("openai"), make_provider("groq")])
+        
+        _, provider = router.complete(messages=[])
+        
+        assert provider.name == "openai"
+    
+    def test_fails_over_within_request(self):
+        router = LLMRouter("openai", [make_provider("openai", error=ServerError()), make_provider("groq", "from groq")])
+        
+        response, provider = router.complete(messages=[], max_tokens=10)
+        
+        assert provider.name == "groq"
+        assert response.choices[0].message.content == "from groq"
+        router.providers["groq"].client.chat.completions.create.assert_called_once_with(
+            model="groq-model", messages=[], max_tokens=10)
+    
+    def test_client_errors_do_not_fail_over(self):
+        router = LLMRouter("openai", [make_provider("openai", error=BadRequest()), make_provider("groq")])
+        
+        with pytest.raises(BadRequest):
+            router.complete(messages=[])
+        router.providers["groq"].client.chat.completions.create.assert_not_called()
+    
+    def test_routes_to_fastest_healthy(self):
+        router = LLMRouter("openai", [make_provider("openai"), make_provider("groq")])
+        for _ in range(3):
+            router._stats_for(router.providers["openai"]).record(2.0, success=True)
+            router._stats_for(router.providers["groq"]).record(0.4, success=True)
+        
+        assert router.ranked()[0].name == "groq"
+    
+    def test_degraded_provider_ranked_last(self):
+        router = LLMRouter("openai", [make_provider("openai"), make_provider("groq")])
+        router._stats_for(router.providers["groq"]).record(0.1, success=True)
+        for _ in range(3):
+            router._stats_for(router.providers["groq"]).record(5.0, success=False)
+        router._stats_for(router.providers["openai"]).record(3.0, success=True)
+        
+        assert [p.name for p in router.ranked()] == ["openai", "groq"]
+        assert router.health()["groq/groq-model"]["error_rate"] == 0.75
+
+class TestSummarizerService:
+    def test_set_service_keeps_state(self, monkeypatch):
+        monkeypatch.setenv("LLM_SERVICE", "openai")
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("GROQ_API_KEY", "test-key")
+        summarizer = LLMSummarizer()
+        router = summarizer.router
+        
+        summarizer.set_service("groq")
+        
+        assert summarizer.router is router
+        assert summarizer.llm_service == "groq"
+        assert router.preferred == "groq"
+        assert summarizer.model == router.providers["groq"].model
+    
+    def test_stats_carry_over_between_summarizers(self, monkeypatch):
+        monkeypatch.setenv("LLM_SERVICE", "openai")
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("LLM_ROUTER_SERVICES", "openai")
+        first = LLMSummarizer()
+        stats = first.router._stats_for(first.router.providers["openai"])
+        stats.record(30.0, success=False)
+        stats.record(30.0, success=False)
+        
+        second = LLMSummarizer()
+        
+        assert second.router is not first.router
+        assert second.router._stats_for(second.router.providers["openai"]) is stats
+        assert second.router.health()[f"openai/{second.model}"]["error_rate"] == 1.0
+        assert not stats.is_healthy(second.router.max_error_rate)
@@ -0,0 +1,52 @@
+import threading
+
+CONTENTS = [
+    {"title": f"Source {i}", "content": f"Fact number {i} about GERD.", "source_url": f"https://example.org/{i}",
+     "extraction_success": True}
+    for i in range(1, 4)
+]
+
+class TestMapReduce:
+    def test_maps_sources_with_fast_model_and_reduces_notes(self, make_summarizer, completion):
+        requests = []
+        lock = threading.Lock()
+        def create(**request):
+            with lock:
+                requests.append(request)
+            user = request["messages"][-1]["content"]
+            if "EVIDENCE NOTES" in user:
+                return completion("GERD facts [SOURCE 1][SOURCE 3]")
+            if "Fact number 2" in user:
+                return completion("NO RELEVANT INFORMATION")
+            # Map output without a citation gets one attached
+            return completion("- a relevant fact")
+        summarizer, _ = make_summarizer(create, OPENAI_FAST_MODEL="fast-model")
+        
+        result = summarizer.summarize("GERD facts", CONTENTS, mode="map_reduce")
+        
+        map_requests = [r for r in requests if "EVIDENCE NOTES" not in r["messages"][-1]["content"]]
+        reduce_requests = [r for r in requests if "EVIDENCE NOTES" in r["messages"][-1]["content"]]
+        assert len(map_requests) == 3 and all(r["model"] == "fast-model" for r in map_requests)
+        assert len(reduce_requests) == 1 and reduce_requests[0]["model"] == "test-model"
+        
+        notes = reduce_requests[0]["messages"][-1]["content"]
+        assert "- a relevant fact [SOURCE 1]" in notes
+        assert "- a relevant fact [SOURCE 3]" in notes
+        assert "[SOURCE 2]" not in notes
+        
+        assert result["mode"] == "map_reduce"
+        assert result["summary"] == "GERD facts [SOURCE 1][SOURCE 3]"
+        assert len(result["sources"]) == 3
+    
+    def test_map_source_numbering_matches_sources(self, make_summarizer, completion):
+        seen = []
+        def create(**request):
+            seen.append(request["messages"][-1]["content"])
+            return completion("merged")
+        summarizer, _ = make_summarizer(create, OPENAI_FAST_MODEL="fast-model")
+        
+        summarizer.summarize("GERD", CONTENTS, mode="map_reduce")
+        
+        third = next(prompt for prompt in seen if "Fact number 3" in prompt)
+        assert "CITATION: [SOURCE 3]" in third
+        assert "### SOURCE 3: Source 3" in third
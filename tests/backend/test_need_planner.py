@@ -0,0 +1,81 @@
+from app.core.need_planner import NeedPlanner, join_concepts
+from app.core.reasoning_agent import ReasoningAgent
+from app.core.query_processor import QueryProcessor
+
+NO_FLAGS = {"treatment": False, "diagnosis": False, "medication": False, "guideline": False, "screening": False}
+
+
+class TestNeedPlanner:
+    def test_combines_all_concepts_into_one_need(self):
+        needs = NeedPlanner(max_searches=3, max_extractions=6).plan(
+            "infliximab in crohn's disease with hepatitis b",
+            ["Crohn's disease", "hepatitis B"], [], ["infliximab"], NO_FLAGS)
+        
+        assert len(needs) == 1
+        assert needs[0]["query"] == "Crohn's disease and hepatitis B with infliximab gastroenterology clinical overview"
+        assert needs[0]["covers"] == ["Crohn's disease", "hepatitis B", "infliximab"]
+        assert needs[0]["max_extractions"] == 3
+    
+    def test_intent_picks_template(self):
+        flags = dict(NO_FLAGS, treatment=True)
+        
+        needs = NeedPlanner().plan("how to treat gerd", ["gastroesophageal reflux disease"], [], [], flags)
+        
+        assert needs[0]["query"] == "current treatment guidelines for gastroesophageal reflux disease in gastroenterology"
+    
+    def test_respects_search_and_extraction_budget(self):
+        planner = NeedPlanner(max_searches=2, max_extractions=3)
+        
+        needs = planner.plan("many concepts", ["a", "b", "c", "d"], ["p1", "p2"], ["m1", "m2"], NO_FLAGS)
+        
+        assert len(needs) == 2
+        assert [need["priority"] for need in needs] == [1.0, 0.9]
+        assert sum(need["max_extractions"] for need in needs) == 3
+        assert all(need["max_extractions"] >= 1 for need in needs)
+    
+    def test_interventions_without_conditions(self):
+        needs = NeedPlanner().plan("colonoscopy and ppi", [], ["colonoscopy"], ["proton pump inhibitor"], NO_FLAGS)
+        
+        assert needs[0]["query"] == "colonoscopy and proton pump inhibitor in gastroenterology indications techniques evidence-based"
+    
+    def test_no_concepts_gives_single_need(self):
+        needs = NeedPlanner().plan("when to get screened", [], [], [], dict(NO_FLAGS, screening=True))
+        
+        assert [need["query"] for need in needs] == ["gastroenterology screening guidelines when to get screened"]
+    
+    def test_join_concepts(self):
+        assert join_concepts(["a"]) == "a"
+        assert join_concepts(["a", "b", "c"]) == "a, b and c"
+    
+    def test_confident_intent_steers_template_and_depth(self):
+        needs = NeedPlanner(max_searches=3, max_extractions=6).plan(
+            "who needs varices screening", ["cirrhosis"], [], [], NO_FLAGS, intent="screening", confidence=0.9)
+        
+        assert needs[0]["query"] == "screening and surveillance recommendations for cirrhosis in gastroenterology"
+        assert needs[0]["max_extractions"] == 2
+    
+    def test_unconfident_intent_uses_flags(self):
+        flags = dict(NO_FLAGS, treatment=True)
+        
+        needs = NeedPlanner().plan("how to treat cirrhosis", ["cirrhosis"], [], [], flags, intent="screening", confidence=0.0)
+        
+        assert needs[0]["query"] == "current treatment guidelines for cirrhosis in gastroenterology"
+        assert needs[0]["max_extractions"] == 3
+
+
+class TestReasoningAgentPlanning:
+    def test_every_concept_is_covered(self):
+        needs = ReasoningAgent().analyze({"normalized_text": "infliximab in crohn's disease with hepatitis b"})
+        
+        covered = {concept for need in needs for concept in need["covers"]}
+        assert covered == {"Crohn's disease", "hepatitis B", "infliximab"}
+        assert needs[0]["concepts"] == ["Crohn's disease", "hepatitis B", "infliximab"]
+        assert all(need["original_query"] == "infliximab in crohn's disease with hepatitis b" for need in needs)
+    
+    def test_original_query_keeps_the_users_wording(self):
+        processed = QueryProcessor().process("Is gastroparisis treated with omeprazol?")
+        
+        needs = ReasoningAgent().analyze(processed)
+        
+        assert needs[0]["concepts"] == ["gastroparesis", "omeprazole"]
+        assert needs[0]["original_query"] == "Is gastroparisis treated with omeprazol?"
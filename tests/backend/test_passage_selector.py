@@ -0,0 +1,41 @@
+import pytest
+from app.output.passage_selector import PassageSelector, chunk_text, bm25_scores, tokenize
+
+class TestPassageSelector:
+    @pytest.fixture
+    def page(self):
+        preamble = "Welcome to our patient portal. Sign in to manage appointments and billing. " * 12
+        relevant = "Helicobacter pylori eradication uses bismuth quadruple therapy for 14 days. " * 6
+        footer = "Copyright notice and accessibility statement for this website. " * 12
+        return f"{preamble}\n\n{relevant}\n\n{footer}"
+    
+    def test_chunking_respects_target_length(self, page):
+        chunks = chunk_text(page, target_words=60)
+        
+        assert len(chunks) > 3
+        assert all(len(c.split()) <= 60 for c in chunks)
+    
+    def test_bm25_prefers_matching_passage(self):
+        passages = [tokenize("billing and appointments"), tokenize("pylori eradication therapy"), tokenize("")]
+        scores = bm25_scores(passages, {"pylori": 1.0, "therapy": 1.0})
+        
+        assert scores.argmax() == 1
+        assert scores[2] == 0
+    
+    def test_select_keeps_relevant_passages(self, page):
+        selector = PassageSelector(chunk_words=60, top_k=1)
+        contents = [{"title": "H. pylori", "content": page, "source_url": "https://example.com/hp"}]
+        
+        selected = selector.select("how is h. pylori treated", contents, concepts=["helicobacter"])
+        
+        assert "bismuth quadruple therapy" in selected[0]["content"]
+        assert "patient portal" not in selected[0]["content"]
+        assert selected[0]["passages_total"] > 1
+        # The input is left untouched
+        assert contents[0]["content"] == page
+    
+    def test_short_content_passes_through(self):
+        selector = PassageSelector(top_k=4)
+        contents = [{"content": "PPIs are first-line therapy for GERD."}]
+        
+        assert selector.select("gerd treatment", contents) == contents
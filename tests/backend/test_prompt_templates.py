@@ -0,0 +1,22 @@
+from app.output.prompt_templates import MEDICAL_SUMMARY_PROMPT, PromptTemplate
+
+class TestPromptTemplate:
+    def test_static_prefix_is_identical_across_requests(self):
+        first = MEDICAL_SUMMARY_PROMPT.messages(query="What causes GERD?", context="### SOURCE 1: A")
+        second = MEDICAL_SUMMARY_PROMPT.messages(query="How is H. pylori treated?", context="### SOURCE 1: B")
+        
+        assert first[0] == second[0]
+        assert first[0]["role"] == "system"
+        assert "[SOURCE X]" in first[0]["content"]
+    
+    def test_query_and_sources_come_last(self):
+        messages = MEDICAL_SUMMARY_PROMPT.messages(query="What causes GERD?", context="### SOURCE 1: A")
+        user = messages[1]["content"]
+        
+        assert user.index("### SOURCE 1: A") < user.index("QUERY: What causes GERD?")
+        assert "INSTRUCTIONS" not in user
+    
+    def test_field_values_are_not_interpreted(self):
+        template = PromptTemplate(system="static", user="$context")
+        
+        assert template.messages(context="costs $5 ${x}")[1]["content"] == "costs $5 ${x}\n"
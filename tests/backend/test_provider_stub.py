@@ -0,0 +1,72 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.utils.provider_stub import LatencyProfile, StubProfile, create_stub_app
+from app.knowledge.search_engines.tavily_search import TavilySearch
+from app.output.llm_summarizer import LLMSummarizer
+
+class TestLatencyProfile:
+    def test_fixed(self):
+        assert LatencyProfile("fixed:250").sample() == 0.25
+    
+    def test_invalid_spec(self):
+        with pytest.raises(ValueError):
+            LatencyProfile("gamma:1")
+
+class TestStubEndpoints:
+    def test_search_shape(self):
+        client = TestClient(create_stub_app(StubProfile(seed=1)))
+        response = client.post("/search", json={"query": "gerd", "max_results": 3, "include_raw_content": True})
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 3
+        assert {"title", "url", "content", "score", "raw_content"} <= set(results[0])
+    
+    def test_throttling_returns_429(self):
+        client = TestClient(create_stub_app(StubProfile(rate_limit=0.01, burst=1)))
+        
+        assert client.post("/search", json={"query": "ibs"}).status_code == 200
+        response = client.post("/search", json={"query": "ibs"})
+        assert response.status_code == 429
+        assert float(response.headers["Retry-After"]) > 0
+    
+    def test_error_rate(self):
+        client = TestClient(create_stub_app(StubProfile(error_rate=1.0)))
+        
+        assert client.post("/chat/completions", json={"messages": []}).status_code == 503
+    
+    def test_streaming_chat(self):
+        client = TestClient(create_stub_app(StubProfile()))
+        response = client.post("/v1/chat/completions", json={
+            "model": "stub", "stream": True, "max_tokens": 20,
+            "messages": [{"role": "user", "content": "GERD"}]
+        })
+        
+        events = [line[6:] for line in response.text.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(e) for e in events[:-1]]
+        assert chunks[0]["object"] == "chat.completion.chunk"
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+class TestPipelineAgainstStub:
+    def test_tavily_search_uses_configured_base(self, provider_stub, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_BASE", provider_stub)
+        
+        results = TavilySearch().search("celiac disease")
+        
+        assert len(results) == 5
+        assert results[0]["url"].startswith("https://stub.example.org/")
+    
+    def test_summarizer_uses_configured_base(self, provider_stub, monkeypatch):
+        monkeypatch.setenv("LLM_SERVICE", "openai")
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("OPENAI_BASE_URL", f"{provider_stub}/v1")
+        
+        summary = LLMSummarizer().summarize("celiac disease", [{
+            "title": "Celiac", "content": "Gluten-free diet is the treatment.",
+            "source_url": "https://example.com/celiac", "extraction_success": True
+        }])
+        
+        assert "error" not in summary
+        assert "[SOURCE 1]" in summary["summary"]
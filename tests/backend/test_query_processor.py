@@ -0,0 +1,74 @@
+from app.core.query_processor import QueryProcessor, strip_punctuation
+
+
+class TestQueryFingerprint:
+    def test_synonyms_share_a_fingerprint(self):
+        processor = QueryProcessor()
+        
+        fingerprints = {processor.process(query)["fingerprint"] for query in [
+            "What is the treatment for H. pylori?",
+            "what is the treatment for helicobacter pylori",
+            "What is the TREATMENT for Helicobacter?!"
+        ]}
+        
+        assert len(fingerprints) == 1
+    
+    def test_abbreviation_and_synonym_map_to_concept_id(self):
+        processor = QueryProcessor()
+        
+        gerd = processor.process("Treatment of GERD")
+        reflux = processor.process("treatment of acid reflux")
+        
+        assert gerd["canonical_text"] == reflux["canonical_text"] == "treatment of gerd"
+        assert gerd["concept_ids"] == ["gerd"]
+        assert gerd["fingerprint"] == reflux["fingerprint"]
+    
+    def test_different_questions_differ(self):
+        processor = QueryProcessor()
+        
+        treatment = processor.process("treatment of gerd")
+        diagnosis = processor.process("diagnosis of gerd")
+        
+        assert treatment["intent"] == "treatment"
+        assert treatment["fingerprint"] != diagnosis["fingerprint"]
+    
+    def test_longest_term_wins(self):
+        canonical, concept_ids = QueryProcessor().canonicalize("Capsule endoscopy for Crohn’s disease")
+        
+        assert canonical == "capsule_endoscopy for crohns_disease"
+        assert concept_ids == ["capsule_endoscopy", "crohns_disease"]
+    
+    def test_strip_punctuation(self):
+        assert strip_punctuation("what's   the “best” test?") == "what s the best test"
+
+
+class TestSpellingCorrection:
+    def test_misspelled_query_shares_fingerprint(self):
+        processor = QueryProcessor()
+        
+        misspelled = processor.process("Treatment of gastroparisis?")
+        correct = processor.process("treatment of gastroparesis?")
+        
+        assert misspelled["corrections"] == [("gastroparisis", "gastroparesis")]
+        assert misspelled["concept_ids"] == correct["concept_ids"] == ["gastroparesis"]
+        assert misspelled["fingerprint"] == correct["fingerprint"]
+    
+    def test_known_words_are_not_corrected(self):
+        processed = QueryProcessor().process("dysplasia near the pylorus")
+        
+        assert processed["corrections"] == []
+        assert processed["corrected_text"] == "dysplasia near the pylorus"
+    
+    def test_dictionary_words_are_not_corrected(self):
+        processed = QueryProcessor().process("alcohol and pancreas damage with diabetes stages")
+        
+        assert processed["corrections"] == []
+        assert processed["concept_ids"] == []
+    
+    def test_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("SPELLING_CORRECTION_ENABLED", "false")
+        
+        processed = QueryProcessor().process("omeprazol dosing")
+        
+        assert processed["corrected_text"] == "omeprazol dosing"
+        assert processed["concept_ids"] == []
@@ -0,0 +1,69 @@
+from app.utils.spelling import SpellingIndex, edit_distance, deletes, vocabulary_words, is_variant
+
+VOCABULARY = vocabulary_words([
+    "gastroparesis", "omeprazole", "colonoscopy", "dysphagia", "helicobacter pylori", "pseudo-obstruction", "ileus"
+])
+
+
+class TestEditDistance:
+    def test_counts_transpositions_as_one_edit(self):
+        assert edit_distance("colonoscopy", "colonoscopy", 2) == 0
+        assert edit_distance("colonscopy", "colonoscopy", 2) == 1
+        assert edit_distance("omperazole", "omeprazole", 2) == 1
+    
+    def test_caps_at_max_distance(self):
+        assert edit_distance("gastritis", "colonoscopy", 2) == 3
+    
+    def test_deletes_include_word(self):
+        assert deletes("ileus", 1) == {"ileus", "leus", "ieus", "ilus", "iles", "ileu"}
+
+
+class TestSpellingIndex:
+    def test_corrects_within_length_guards(self):
+        index = SpellingIndex.build(VOCABULARY)
+        
+        assert index.correct_word("gastroparisis") == "gastroparesis"
+        assert index.correct_word("omeprazol") == "omeprazole"
+        assert index.correct_word("colonscopy") == "colonoscopy"
+        assert index.correct_word("pyloir") == "pylori"
+    
+    def test_leaves_short_known_and_distant_words(self):
+        index = SpellingIndex.build(VOCABULARY, known_words=["dysplasia"])
+        
+        # Under 5 letters, on the known-word list, and 2 edits away at 7 letters
+        assert index.correct_word("ilus") == "ilus"
+        assert index.correct_word("dysplasia") == "dysplasia"
+        assert index.correct_word("pylorus") == "pylorus"
+        assert index.correct_word("obstruction") == "obstruction"
+    
+    def test_leaves_dictionary_words_and_their_inflections(self):
+        index = SpellingIndex.build(vocabulary_words(["resection", "pancrelipase"]),
+                                    dictionary=frozenset(["retention", "stage"]))
+        
+        assert index.correct_word("retention") == "retention"
+        assert index.correct_word("stages") == "stages"
+        assert index.correct_word("retentions") == "retentions"
+    
+    def test_never_corrects_to_another_form_of_the_word(self):
+        index = SpellingIndex.build(vocabulary_words(["diabetic gastroparesis"]))
+        
+        assert is_variant("diabetes", "diabetic")
+        assert is_variant("stages", "stage")
+        assert not is_variant("omeprazol", "omeprazole")
+        assert index.correct_word("diabetes") == "diabetes"
+    
+    def test_correct_keeps_surrounding_text(self):
+        index = SpellingIndex.build(VOCABULARY)
+        
+        text, corrections = index.correct("is gastroparisis treated with omeprazol?")
+        
+        assert text == "is gastroparesis treated with omeprazole?"
+        assert corrections == [("gastroparisis", "gastroparesis"), ("omeprazol", "omeprazole")]
+    
+    def test_round_trip(self):
+        index = SpellingIndex.build(VOCABULARY, known_words=["dysplasia"])
+        
+        loaded = SpellingIndex.from_dict(index.to_dict())
+        
+        assert loaded.correct_word("colonscopy") == "colonoscopy"
+        assert "dysplasia" in loaded.known
@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import MagicMock
+from app.utils.rate_limiter import RequestTokenScheduler
+from app.output.llm_router import retry_after_seconds
+
+class RateLimited(Exception):
+    status_code = 429
+    
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers={"retry-after": str(retry_after)})
+
+def item(query):
+    return {
+        "query": query,
+        "extracted_contents": [{
+            "title": "Source", "content": f"Content about {query}.",
+            "source_url": "https://example.org", "extraction_success": True
+        }]
+    }
+
+class TestRequestTokenScheduler:
+    def test_token_budget_limits_admission(self):
+        scheduler = RequestTokenScheduler(rpm=100, tpm=600)
+        
+        assert scheduler.try_acquire(500) == 0.0
+        wait = scheduler.try_acquire(500)
+        
+        # 400 more tokens at 10 tokens per second
+        assert wait == pytest.approx(40.0, abs=0.5)
+    
+    def test_refused_call_keeps_tokens(self):
+        scheduler = RequestTokenScheduler(rpm=1, tpm=1000)
+        
+        assert scheduler.try_acquire(100) == 0.0
+        assert scheduler.try_acquire(100) > 0
+        
+        # The second call took no tokens while it waited for a request slot
+        assert scheduler.tokens.try_acquire(900) == 0.0
+    
+    def test_pause_holds_every_caller(self):
+        scheduler = RequestTokenScheduler(rpm=100, tpm=1000)
+        scheduler.pause(5)
+        
+        assert scheduler.try_acquire(1) > 4
+
+class TestSummarizeMany:
+    def test_results_in_input_order(self, make_summarizer, completion):
+        def create(**request):
+            prompt = request["messages"][-1]["content"]
+            return completion("alpha summary" if "alpha" in prompt else "beta summary")
+        summarizer, _ = make_summarizer(create)
+        
+        results = summarizer.summarize_many([item("alpha"), item("beta"), {"query": "empty", "extracted_contents": []}])
+        
+        assert [r["summary"] for r in results[:2]] == ["alpha summary", "beta summary"]
+        assert results[2]["sources"] == []
+    
+    def test_retries_throttled_calls_after_retry_after(self, make_summarizer, completion):
+        calls = []
+        def create(**request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise RateLimited(retry_after=0.05)
+            return completion("done")
+        summarizer, _ = make_summarizer(create)
+        
+        results = summarizer.summarize_many([item("alpha")])
+        
+        assert results[0]["summary"] == "done"
+        assert len(calls) == 2
+    
+    def test_retry_after_header(self):
+        assert retry_after_seconds(RateLimited(retry_after=3)) == 3.0
+        assert retry_after_seconds(Exception()) is None
@@ -0,0 +1,78 @@
+import pytest
+from app.utils.term_matcher import TermMatcher, MappedTermMatcher, get_term_matcher, _AutomatonMatcher
+from app.core.intent import intent_flags
+from app.core.reasoning_agent import ReasoningAgent
+
+class TestTermMatcher:
+    def test_word_boundaries(self):
+        matcher = TermMatcher(["eus", "emr", "ibs"])
+        
+        assert matcher.found("pseudo-obstruction after emergency surgery") == []
+        assert matcher.found("eus-guided drainage and emr") == ["eus", "emr"]
+    
+    def test_spans_and_overlaps(self):
+        matcher = TermMatcher(["capsule endoscopy", "endoscopy"])
+        text = "Is capsule endoscopy safe?"
+        
+        matches = matcher.find(text)
+        
+        assert [(m.term, text[m.start:m.end]) for m in matches] == [
+            ("capsule endoscopy", "capsule endoscopy"), ("endoscopy", "endoscopy")]
+    
+    def test_mixed_case_terms_and_apostrophes(self):
+        matcher = TermMatcher(["Barrett's esophagus", "H. pylori"])
+        
+        assert matcher.found("surveillance in barrett’s esophagus after h. pylori") == [
+            "Barrett's esophagus", "H. pylori"]
+    
+    def test_found_keeps_lexicon_order(self):
+        matcher = TermMatcher(["gerd", "ppi"])
+        
+        assert matcher.found("ppi for gerd") == ["gerd", "ppi"]
+    
+    def test_prefix_mode(self):
+        matcher = TermMatcher(["screen", "test"], prefix=True)
+        
+        assert matcher.found("latest screening") == ["screen"]
+    
+    def test_compiled_once(self):
+        assert get_term_matcher(["a", "b"]) is get_term_matcher(["a", "b"])
+    
+    def test_mapped_matches_in_memory(self, tmp_path):
+        terms = ["capsule endoscopy", "endoscopy", "eus", "Crohn's disease", "h. pylori"]
+        matcher = TermMatcher(terms)
+        path = tmp_path / "terms.automaton"
+        path.write_bytes(matcher.serialize({"source": "test"}))
+        
+        mapped = MappedTermMatcher(str(path))
+        text = "Capsule endoscopy or EUS in Crohn’s disease with H. pylori? pseudo-obstruction"
+        
+        assert mapped.find(text) == matcher.find(text)
+        assert mapped.terms == terms
+        assert mapped.metadata == {"source": "test"}
+    
+    def test_mapped_rejects_other_files(self, tmp_path):
+        path = tmp_path / "bad.automaton"
+        path.write_bytes(b"not an automaton" * 4)
+        
+        with pytest.raises(ValueError):
+            MappedTermMatcher(str(path))
+    
+    def test_incomplete_matcher_cannot_be_created(self):
+        class NoOutputs(_AutomatonMatcher):
+            def _next_state(self, state, char):
+                return 0
+        
+        with pytest.raises(TypeError):
+            NoOutputs()
+
+class TestReasoningAgentMatching:
+    def test_no_false_procedure_match(self):
+        needs = ReasoningAgent().analyze({"normalized_text": "what causes pseudo-obstruction?"})
+        
+        assert needs[0]["concepts"] == ["colonic pseudo-obstruction"]
+    
+    def test_intent_keywords_respect_word_starts(self):
+        flags = intent_flags("latest consensus on barrett's surveillance")
+        
+        assert flags["guideline"] and not flags["diagnosis"]
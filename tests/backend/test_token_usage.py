@@ -0,0 +1,65 @@
+from datetime import date
+from types import SimpleNamespace
+from app.output.token_usage import TokenUsageTracker, usage_from_response, request_usage
+
+def response_with_usage(content="summary", prompt=120, completion=30, cached=64):
+    usage = SimpleNamespace(
+        prompt_tokens=prompt, completion_tokens=completion, total_tokens=prompt + completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached)
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+class TestUsageFromResponse:
+    def test_reads_cached_tokens(self):
+        usage = usage_from_response(response_with_usage())
+        
+        assert usage == {"prompt_tokens": 120, "completion_tokens": 30, "cached_tokens": 64, "total_tokens": 150}
+    
+    def test_missing_details_count_as_zero(self):
+        response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+        
+        assert usage_from_response(response) == {
+            "prompt_tokens": 10, "completion_tokens": 5, "cached_tokens": 0, "total_tokens": 15}
+        assert usage_from_response(SimpleNamespace()) is None
+
+class TestTokenUsageTracker:
+    def test_aggregates_per_day_model_and_stage(self, tmp_path):
+        tracker = TokenUsageTracker(log_path=str(tmp_path / "usage.jsonl"))
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "cached_tokens": 50, "total_tokens": 120}
+        
+        tracker.record("gpt-4o-mini", "summarize", usage, day=date(2026, 1, 2))
+        tracker.record("gpt-4o-mini", "summarize", usage, day=date(2026, 1, 2))
+        tracker.record("llama3-70b-8192", "summarize", usage, day=date(2026, 1, 3))
+        
+        report = tracker.daily(date(2026, 1, 2))
+        assert report["totals"]["prompt_tokens"] == 200
+        assert report["totals"]["calls"] == 2
+        assert report["by_model_stage"]["gpt-4o-mini/summarize"]["cached_tokens"] == 100
+        assert tracker.days() == ["2026-01-02", "2026-01-03"]
+        assert len((tmp_path / "usage.jsonl").read_text().splitlines()) == 3
+    
+    def test_retention_window(self):
+        tracker = TokenUsageTracker(log_path="", retention_days=2)
+        for day in range(1, 5):
+            tracker.record("m", "summarize", {"prompt_tokens": 1}, day=date(2026, 1, day))
+        
+        assert tracker.days() == ["2026-01-03", "2026-01-04"]
+
+class TestSummarizerUsage:
+    def test_summary_reports_provider_usage(self, make_summarizer):
+        summarizer, client = make_summarizer()
+        summarizer.usage_tracker = TokenUsageTracker(log_path="")
+        client.chat.completions.create.return_value = response_with_usage()
+        
+        result = summarizer.summarize("query", [{
+            "title": "T", "content": "Some content.", "source_url": "https://example.org", "extraction_success": True
+        }])
+        
+        assert result["token_count"] == 30
+        assert result["usage"]["cached_tokens"] == 64
+        assert result["usage"]["calls"][0]["stage"] == "summarize"
+        assert summarizer.usage_tracker.daily()["by_model_stage"]["test-model/summarize"]["calls"] == 1
+        
+        per_request = request_usage({"need_0": {"summarized_response": result}, "need_1": {"summarized_response": None}})
+        assert per_request["total_tokens"] == 150
+        assert per_request["by_model_stage"]["test-model/summarize"]["prompt_tokens"] == 120
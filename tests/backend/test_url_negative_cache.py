@@ -0,0 +1,136 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from app.knowledge.url_negative_cache import BloomFilter, URLNegativeCache
+from app.core.knowledge_router import KnowledgeRouter
+from app.knowledge.search_engines.tavily_extract import TavilyExtract
+
+class TestBloomFilter:
+    def test_membership(self):
+        bloom = BloomFilter(capacity=100)
+        bloom.add("https://example.com/a")
+        
+        assert "https://example.com/a" in bloom
+        assert "https://example.com/b" not in bloom
+
+class TestURLNegativeCache:
+    @pytest.fixture
+    def cache(self):
+        return URLNegativeCache(base_ttl=10, max_ttl=25, capacity=100)
+    
+    def test_unknown_url_not_blocked(self, cache):
+        assert not cache.is_blocked("https://example.com/ok")
+    
+    def test_failure_blocks_url(self, cache):
+        cache.record_failure("https://example.com/dead", reason="404")
+        
+        assert cache.is_blocked("https://example.com/dead")
+        # Trailing slashes and fragments share the same entry
+        assert cache.is_blocked("https://example.com/dead/#section")
+    
+    def test_backoff_doubles_and_caps(self, cache):
+        assert cache.record_failure("https://example.com/slow") == 10
+        assert cache.record_failure("https://example.com/slow") == 20
+        assert cache.record_failure("https://example.com/slow") == 25
+    
+    def test_expired_entry_not_blocked(self, cache):
+        with patch("app.knowledge.url_negative_cache.time.time", return_value=1000.0):
+            cache.record_failure("https://example.com/flaky")
+        with patch("app.knowledge.url_negative_cache.time.time", return_value=1011.0):
+            assert not cache.is_blocked("https://example.com/flaky")
+    
+    def test_success_clears_history(self, cache):
+        cache.record_failure("https://example.com/back")
+        cache.record_success("https://example.com/back")
+        
+        assert not cache.is_blocked("https://example.com/back")
+        assert cache.record_failure("https://example.com/back") == 10
+    
+    def test_only_scheme_and_host_are_case_insensitive(self, cache):
+        cache.record_failure("HTTPS://Example.com/Guidelines/GERD.pdf")
+        
+        assert cache.is_blocked("https://example.com/Guidelines/GERD.pdf")
+        assert not cache.is_blocked("https://example.com/guidelines/gerd.pdf")
+        assert not cache.is_blocked("https://example.com/Guidelines/GERD.pdf?page=2")
+
+class TestRouterSkipsBlockedURLs:
+    def test_blocked_url_replaced_by_next_result(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        router = KnowledgeRouter()
+        router.negative_cache = URLNegativeCache(base_ttl=60, capacity=100)
+        router.negative_cache.record_failure("https://example.com/dead")
+        
+        router.dynamic_search = MagicMock()
+        router.dynamic_search.search.return_value = {"medical": [
+            {"title": "Dead", "url": "https://example.com/dead"},
+            {"title": "Alive", "url": "https://example.com/alive"}
+        ]}
+        router.dynamic_search.extract_content.return_value = {
+            "title": "Alive", "content": "text", "source_url": "https://example.com/alive",
+            "extraction_success": True
+        }
+        router.summarizer = MagicMock()
+        router.summarizer.summarize.return_value = {"summary": "ok", "sources": []}
+        
+        results = router.retrieve([{"type": "medical", "query": "gerd"}])
+        
+        router.dynamic_search.extract_content.assert_called_once_with("https://example.com/alive", extractor="tavily")
+        assert len(results["need_0"]["extracted_contents"]) == 1
+    
+    @pytest.fixture
+    def router(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        router = KnowledgeRouter()
+        router.negative_cache = URLNegativeCache(base_ttl=60, capacity=100)
+        router.dynamic_search = MagicMock()
+        router.summarizer = MagicMock()
+        router.summarizer.summarize.return_value = {"summary": "ok", "sources": []}
+        return router
+    
+    def test_provider_failures_do_not_block_urls(self, router):
+        router.dynamic_search.extract_content.return_value = {
+            "title": "Page", "content": "Unable to extract", "source_url": "https://a.org/page",
+            "extraction_success": False, "fallback": True, "url_error": None
+        }
+        
+        router._extract_top_results([{"url": "https://a.org/page"}])
+        
+        assert not router.negative_cache.is_blocked("https://a.org/page")
+    
+    def test_url_failures_block_urls(self, router):
+        router.dynamic_search.extract_content.return_value = {
+            "title": "Page", "content": "Unable to extract", "source_url": "https://a.org/page",
+            "extraction_success": False, "fallback": True, "url_error": "HTTP 404"
+        }
+        
+        router._extract_top_results([{"url": "https://a.org/page"}])
+        
+        assert router.negative_cache.is_blocked("https://a.org/page")
+
+class TestExtractFailureScope:
+    @pytest.fixture
+    def extractor(self, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        extractor = TavilyExtract()
+        extractor.cassette = MagicMock()
+        return extractor
+    
+    def test_rejected_api_key_is_not_a_url_error(self, extractor):
+        extractor.cassette.http.side_effect = lambda method, url, **kwargs: MagicMock(
+            status_code=401 if method == "post" else 200, text="")
+        
+        result = extractor.extract("https://a.org/page")
+        
+        assert result["extraction_success"] is False
+        assert result["url_error"] is None
+    
+    def test_missing_page_is_a_url_error(self, extractor):
+        responses = {"post": MagicMock(status_code=500, text="outage"), "get": MagicMock(status_code=404),
+                     "head": MagicMock(status_code=404)}
+        responses["post"].raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        extractor.cassette.http.side_effect = lambda method, url, **kwargs: responses[method]
+        
+        result = extractor.extract("https://a.org/page")
+        
+        assert result["extraction_success"] is False
+        assert result["url_error"] == "HTTP 404"
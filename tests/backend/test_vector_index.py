@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from app.knowledge.vector_index import VectorIndex, hnswlib
+
+
+def vectors(n=40, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+@pytest.fixture(params=[True, False], ids=["hnsw", "exact"])
+def use_hnsw(request):
+    if request.param and hnswlib is None:
+        pytest.skip("hnswlib not installed")
+    return request.param
+
+
+class TestVectorIndex:
+    def test_query_returns_nearest_with_metadata(self, use_hnsw):
+        data = vectors()
+        index = VectorIndex(16, use_hnsw=use_hnsw)
+        
+        labels = index.add(data, [{"n": i} for i in range(40)])
+        hits = index.query(data[7], k=3)
+        
+        assert labels == list(range(40))
+        assert hits[0].label == 7
+        assert hits[0].metadata == {"n": 7}
+        assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+        assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+    
+    def test_deleted_items_are_skipped(self, use_hnsw):
+        data = vectors()
+        index = VectorIndex(16, use_hnsw=use_hnsw)
+        index.add(data, [{"n": i} for i in range(40)])
+        
+        assert index.delete(7)
+        assert not index.delete(7)
+        assert 7 not in [hit.label for hit in index.query(data[7], k=5)]
+        assert len(index) == 39
+    
+    def test_filter(self, use_hnsw):
+        data = vectors()
+        index = VectorIndex(16, use_hnsw=use_hnsw)
+        index.add(data, [{"n": i} for i in range(40)])
+        
+        hits = index.query(data[7], k=4, filter=lambda label: label % 2 == 0)
+        
+        assert len(hits) == 4
+        assert all(hit.label % 2 == 0 for hit in hits)
+    
+    def test_persists_and_accepts_inserts_after_load(self, tmp_path, use_hnsw):
+        data = vectors(60)
+        index = VectorIndex(16, str(tmp_path / "index"), use_hnsw=use_hnsw)
+        index.add(data[:40], [{"n": i} for i in range(40)])
+        index.delete(3)
+        index.save()
+        
+        loaded = VectorIndex(16, str(tmp_path / "index"), use_hnsw=use_hnsw)
+        added = loaded.add(data[40:], [{"n": i} for i in range(40, 60)])
+        
+        assert added == list(range(40, 60))
+        assert loaded.query(data[50], k=1)[0].metadata == {"n": 50}
+        assert loaded.query(data[10], k=1)[0].metadata == {"n": 10}
+        assert 3 not in [hit.label for hit in loaded.query(data[3], k=5)]
+        
+        loaded.save()
+        reloaded = VectorIndex(16, str(tmp_path / "index"), use_hnsw=use_hnsw)
+        assert len(reloaded) == 59
+        assert reloaded.stats()["pending"] == 0
+        assert reloaded.query(data[55], k=1)[0].label == 55
+    
+    def test_rebuilds_missing_graph(self, tmp_path):
+        if hnswlib is None:
+            pytest.skip("hnswlib not installed")
+        data = vectors()
+        index = VectorIndex(16, str(tmp_path), use_hnsw=False)
+        index.add(data, [{"n": i} for i in range(40)])
+        index.save()
+        
+        rebuilt = VectorIndex(16, str(tmp_path), use_hnsw=True)
+        
+        assert rebuilt.stats()["backend"] == "hnsw"
+        assert rebuilt.query(data[5], k=1)[0].label == 5
+    
+    def test_rejects_wrong_dimension(self):
+        with pytest.raises(ValueError):
+            VectorIndex(16).add(np.zeros((1, 8)), [{}])